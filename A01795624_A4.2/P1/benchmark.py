@@ -0,0 +1,234 @@
+"""
+Benchmark Script
+
+This Python script measures how the statistics engines of computeStatistics.py scale
+with the size of the input, using randomly generated data.
+
+Usage:
+    python benchmark.py median [max_exponent]
+    python benchmark.py files [shard_count]
+    python benchmark.py parse [megabytes]
+    python benchmark.py incremental [value_count]
+    python benchmark.py sqrt [repeats]
+"""
+
+import contextlib
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+from computeStatistics import (  # pylint: disable=import-error
+    accumulate_file, compute_files, compute_incremental, compute_median, compute_std_dev,
+    read_numbers
+)
+
+
+def generate_numbers(count: int, seed: int = 42):
+    """Generates a reproducible list of random floats similar to the TC files."""
+    rng = random.Random(seed)
+    return [rng.uniform(0, 500) for _ in range(count)]
+
+
+def write_numbers(file_path: str, numbers: list):
+    """Writes numbers to a file, one per line, like the TC files."""
+    with open(file_path, 'w', encoding="utf-8") as file:
+        file.write("\n".join(repr(num) for num in numbers) + "\n")
+
+
+def bench_median(max_exponent: int = 7):
+    """
+    Times compute_median on inputs from 10^3 up to 10^max_exponent values.
+
+    Args:
+        max_exponent (int): Largest power of ten to benchmark.
+    """
+    print(f"{'Values':>12} {'Seconds':>10} {'ns/value':>10}")
+    for exponent in range(3, max_exponent + 1):
+        data = generate_numbers(10 ** exponent)
+        start_time = time.perf_counter()
+        median = compute_median(data)
+        elapsed_time = time.perf_counter() - start_time
+        expected = sorted(data)
+        mid = len(data) // 2
+        if median != (expected[mid - 1] + expected[mid]) / 2:
+            print(f"Error: wrong median for 10^{exponent} values.")
+        print(f"{len(data):>12} {elapsed_time:>10.4f} "
+              f"{elapsed_time * 1e9 / len(data):>10.1f}")
+
+
+def bench_files(shard_count: int = 32, shard_size: int = 200_000):
+    """
+    Times compute_files on generated shard files with a growing number of workers.
+
+    The time covers the whole reduction, up to the median and mode of all the
+    shards, and every run must give the same statistics as the single worker.
+
+    Args:
+        shard_count (int): Number of shard files to generate.
+        shard_size (int): Numbers per shard file.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_paths = []
+        for shard in range(shard_count):
+            file_path = os.path.join(directory, f"shard{shard}.txt")
+            write_numbers(file_path, generate_numbers(shard_size, seed=shard))
+            file_paths.append(file_path)
+
+        print(f"{'Workers':>8} {'Seconds':>10} {'Speedup':>8}")
+        baseline = None
+        expected = None
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start_time = time.perf_counter()
+            statistics, _ = compute_files(file_paths, workers)
+            elapsed_time = time.perf_counter() - start_time
+            baseline = baseline or elapsed_time
+            expected = expected or statistics
+            if statistics != expected:
+                print(f"Error: different statistics with {workers} workers.")
+            print(f"{workers:>8} {elapsed_time:>10.4f} {baseline / elapsed_time:>8.2f}")
+            workers *= 2
+
+
+def read_numbers_by_line(file_path: str):
+    """Reference parser: the line-by-line loop that read_numbers used to run."""
+    numbers = []
+    with open(file_path, 'r', encoding="utf-8") as file:
+        for line in file:
+            for value in line.split():
+                try:
+                    numbers.append(float(value))
+                except ValueError:
+                    print(f"Warning: Invalid data '{value}' ignored.")
+    return numbers
+
+
+def time_parser(parser, file_path: str):
+    """Runs a parser with its console output discarded and returns the elapsed time."""
+    with open(os.devnull, 'w', encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start_time = time.perf_counter()
+            numbers = parser(file_path)
+            elapsed_time = time.perf_counter() - start_time
+    return len(numbers), elapsed_time
+
+
+def bench_parse(megabytes: int = 100):
+    """
+    Compares read_numbers with the line-by-line parser on TC7 and on a generated
+    file of the given size where one token in a thousand is invalid.
+
+    Args:
+        megabytes (int): Approximate size of the generated file.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        generated = os.path.join(directory, "generated.txt")
+        rng = random.Random(42)
+        with open(generated, 'w', encoding="utf-8") as file:
+            while file.tell() < megabytes * 1_000_000:
+                file.write("\n".join(
+                    "ERROR" if rng.random() < 0.001 else repr(rng.uniform(0, 500))
+                    for _ in range(100_000)) + "\n")
+
+        print(f"{'File':>10} {'Values':>12} {'Line loop':>10} {'Bulk':>10} {'Speedup':>8}")
+        tc7 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TC7.txt")
+        for name, file_path in (("TC7", tc7), (f"{megabytes} MB", generated)):
+            count, line_time = time_parser(read_numbers_by_line, file_path)
+            bulk_count, bulk_time = time_parser(read_numbers, file_path)
+            if bulk_count != count:
+                print(f"Error: parsers disagree on {name}.")
+            print(f"{name:>10} {count:>12} {line_time:>10.4f} {bulk_time:>10.4f} "
+                  f"{line_time / bulk_time:>8.2f}")
+
+
+def bench_incremental(value_count: int = 2_000_000):
+    """
+    Compares a full single-pass run with an incremental run after the file grew by 1%.
+
+    Both times cover reading and the statistics. The numbers are random floats,
+    nearly all distinct, so the saved table is as large as the data: the
+    incremental run reads only the new values, but it still loads, merges and
+    saves the whole table, in C.
+
+    Args:
+        value_count (int): Number of values in the file before it grows.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "growing.txt")
+        write_numbers(file_path, generate_numbers(value_count))
+        compute_incremental(file_path, file_path + ".state")
+        with open(file_path, 'a', encoding="utf-8") as file:
+            file.write("\n".join(repr(num) for num in
+                                 generate_numbers(value_count // 100, seed=7)) + "\n")
+
+        start_time = time.perf_counter()
+        full = accumulate_file(file_path).statistics()
+        full_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        incremental = compute_incremental(file_path, file_path + ".state").statistics()
+        incremental_time = time.perf_counter() - start_time
+        # Chunks split differently, so the variance may differ in the last bits.
+        if incremental[:3] != full[:3] or not math.isclose(incremental[3], full[3]):
+            print("Error: incremental and full runs disagree.")
+        print(f"{'Full run':>12} {full_time:>10.4f} seconds")
+        print(f"{'Incremental':>12} {incremental_time:>10.4f} seconds "
+              f"({incremental_time / full_time:.1%} of the full run)")
+
+
+def std_dev_reference(variance: float):
+    """Reference root: Newton's method from x / 2 with an absolute tolerance of 1e-6."""
+    if variance == 0:
+        return 0
+    guess = variance / 2
+    while True:
+        new_guess = (guess + variance / guess) / 2
+        if abs(new_guess - guess) < 1e-6:
+            return new_guess
+        guess = new_guess
+
+
+def bench_sqrt(repeats: int = 10_000):
+    """
+    Compares compute_std_dev with the reference Newton loop on variances from 1e-12
+    to 1e15, timing both and measuring their relative error against a Decimal root.
+
+    Args:
+        repeats (int): Number of times each variance is computed.
+    """
+    print(f"{'Variance':>10} {'Reference ns':>13} {'New ns':>8} "
+          f"{'Reference error':>16} {'New error':>10}")
+    for exponent in range(-12, 16, 3):
+        variance = 2.5 * 10.0 ** exponent
+        exact = float(compute_std_dev(variance, exact=True))
+        timings = []
+        for root in (std_dev_reference, compute_std_dev):
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                root(variance)
+            timings.append((time.perf_counter() - start_time) * 1e9 / repeats)
+        errors = [abs(root(variance) - exact) / exact
+                  for root in (std_dev_reference, compute_std_dev)]
+        print(f"{variance:>10.1e} {timings[0]:>13.0f} {timings[1]:>8.0f} "
+              f"{errors[0]:>16.1e} {errors[1]:>10.1e}")
+    if any(compute_std_dev(x) != math.sqrt(x) for x in (1e-300, 0.3, 7.0, 1e300)):
+        print("Error: compute_std_dev is not correctly rounded.")
+
+
+BENCHMARKS = {
+    "median": bench_median,
+    "files": bench_files,
+    "parse": bench_parse,
+    "incremental": bench_incremental,
+    "sqrt": bench_sqrt,
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmark.py <{'|'.join(BENCHMARKS)}> [size]")
+        sys.exit(1)
+
+    BENCHMARKS[sys.argv[1]](*(int(arg) for arg in sys.argv[2:]))
@@ -6,32 +6,152 @@ and saves the results to a file. The computations use only basic algorithms with
 statistical functions or libraries.
 """
 
+import argparse
+import glob
+import math
+import os
 import sys
-import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Context, Decimal
+from functools import partial as partial_function
+from itertools import accumulate, chain
 
+from quantile_sketch import KLLSketch  # pylint: disable=import-error
+from statistics_accumulator import (  # pylint: disable=import-error
+    StatisticsAccumulator, exact_sums, exact_variance, load_state, mode_of_range, save_state,
+    select_tables
+)
+from windowed_statistics import WindowedStatistics  # pylint: disable=import-error
 
-def read_numbers(file_path: str):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from instrumentation import (  # pylint: disable=import-error,wrong-import-position
+    WorkerTask, count_records, elapsed_time, phase, start_run, worker_results
+)
+
+DECIMAL_PRECISION = 50
+SAMPLE_SIZE = 5  # Invalid tokens shown in the warning of each input.
+
+
+def parse_tokens(tokens: list, invalid: list):
     """
-    Reads numbers from a file and returns a list of valid numbers.
+    Converts a list of byte tokens into an array of floats.
 
     Args:
-        file_path (str): Path to the input file.
+        tokens (list): Tokens split from the input file.
+        invalid (list): Receives the tokens that are not valid numbers.
 
     Returns:
-        list: A list of valid numbers.
+        array: The valid numbers, in order.
+    """
+    numbers = array('d')
+    remaining = iter(tokens)
+    skipped = 0
+    while True:
+        try:
+            numbers.extend(map(float, remaining))
+            return numbers
+        except ValueError:
+            # extend keeps the values parsed before the bad token, and map has
+            # consumed that token, so parsing resumes right after it.
+            invalid.append(tokens[len(numbers) + skipped])
+            skipped += 1
+
+
+def report_invalid(invalid_count: int, samples: list):
+    """Prints a single warning that summarizes the invalid data of a file."""
+    if invalid_count == 0:
+        return
+    shown = ", ".join(f"'{value.decode('utf-8', 'replace')}'" for value in samples)
+    more = ", ..." if invalid_count > len(samples) else ""
+    print(f"Warning: {invalid_count} invalid data ignored: {shown}{more}")
+
+
+def read_chunks(file_path: str, chunk_size: int = 1 << 20, sample_size: int = SAMPLE_SIZE,
+                start: int = 0, stop: int = None):
     """
-    numbers = []
+    Reads numbers from a file in large blocks and yields them in chunks.
+
+    Invalid tokens are counted and only the first few are kept as samples for
+    a single warning, printed once the whole file has been read.
+
+    Args:
+        file_path (str): Path to the input file.
+        chunk_size (int): Number of bytes read per block.
+        sample_size (int): Number of invalid tokens shown in the warning.
+        start (int): Byte offset where reading starts.
+        stop (int, optional): Byte offset where reading stops; defaults to the end.
+
+    Yields:
+        array: The valid numbers found in each block.
+    """
+    invalid_count = 0
+    samples = []
     try:
-        with open(file_path, 'r', encoding="utf-8") as file:
-            for line in file:
-                for value in line.split():
-                    try:
-                        numbers.append(float(value))
-                    except ValueError:
-                        print(f"Warning: Invalid data '{value}' ignored.")
+        with open(file_path, 'rb') as file:
+            file.seek(start)
+            position = start
+            remainder = b""
+            while True:
+                with phase("read"):
+                    if stop is None:
+                        block = file.read(chunk_size)
+                    else:
+                        block = file.read(max(0, min(chunk_size, stop - position)))
+                position += len(block)
+                invalid = []
+                with phase("parse"):
+                    if not block:
+                        tokens = remainder.split()
+                    elif block[-1:].isspace():
+                        tokens = (remainder + block).split()
+                        remainder = b""
+                    else:
+                        # The last token may continue in the next block.
+                        tokens = (remainder + block).split()
+                        remainder = tokens.pop() if tokens else b""
+                    chunk = parse_tokens(tokens, invalid)
+                count_records(len(chunk))
+                invalid_count += len(invalid)
+                samples.extend(invalid[:sample_size - len(samples)])
+                if chunk:
+                    yield chunk
+                if not block:
+                    break
     except OSError as error:
         print(f"Error reading file: {error}")
         sys.exit(1)
+    report_invalid(invalid_count, samples)
+
+
+def read_stdin_chunks():
+    """Yields the valid numbers of each line of standard input as soon as it arrives."""
+    invalid_count = 0
+    samples = []
+    for line in sys.stdin.buffer:
+        invalid = []
+        chunk = parse_tokens(line.split(), invalid)
+        invalid_count += len(invalid)
+        samples.extend(invalid[:SAMPLE_SIZE - len(samples)])
+        if chunk:
+            yield chunk
+    report_invalid(invalid_count, samples)
+
+
+def read_numbers(file_path: str):
+    """
+    Reads numbers from a file and returns an array of valid numbers.
+
+    Args:
+        file_path (str): Path to the input file.
+
+    Returns:
+        array: A compact array of valid numbers.
+    """
+    numbers = array('d')
+    for chunk in read_chunks(file_path):
+        numbers.extend(chunk)
     return numbers
 
 
@@ -45,21 +165,95 @@ def compute_mean(data: list):
     return total / count if count > 0 else 0
 
 
+def _insertion_sort(data: list):
+    """Sorts a short list in place; used on groups of at most five values."""
+    for i in range(1, len(data)):
+        value = data[i]
+        j = i - 1
+        while j >= 0 and data[j] > value:
+            data[j + 1] = data[j]
+            j -= 1
+        data[j + 1] = value
+    return data
+
+
+def _median_of_medians(data: list):
+    """Returns a pivot that is guaranteed to leave at least 30% on each side."""
+    while len(data) > 5:
+        medians = []
+        for i in range(0, len(data), 5):
+            group = _insertion_sort(data[i:i + 5])
+            medians.append(group[(len(group) - 1) // 2])
+        data = medians
+    group = _insertion_sort(data[:])
+    return group[(len(group) - 1) // 2]
+
+
+def _select(data: list, k: int):
+    """
+    Returns the values of rank k - 1 and k (0-based) without sorting the data;
+    the first is None when k is 0.
+
+    Uses introselect: quickselect with a median-of-three pivot, which runs in
+    expected linear time, switching to a median-of-medians pivot once it has
+    partitioned about 2 * log2(n) times, so the worst case stays linear as well.
+    """
+    if not 0 <= k < len(data):
+        raise IndexError(f"Rank {k} out of range for {len(data)} values.")
+    work = data
+    depth = 2 * len(data).bit_length()
+    below = None  # Largest value left out below work, which holds the ranks from k up.
+    while len(work) > 5:
+        n = len(work)
+        if depth > 0:
+            depth -= 1
+            pivot = _insertion_sort([work[0], work[n // 2], work[-1]])[1]
+        else:
+            pivot = _median_of_medians(work)
+
+        lows = [num for num in work if num < pivot]
+        if k < len(lows):
+            work = lows
+            continue
+        highs = [num for num in work if num > pivot]
+        pivots = n - len(lows) - len(highs)
+        if k < len(lows) + pivots:
+            if k > len(lows):
+                return pivot, pivot
+            return (max(lows) if lows else below), pivot
+        k -= len(lows) + pivots
+        below = pivot
+        work = highs
+    work = _insertion_sort(work[:])
+    return (work[k - 1] if k else below), work[k]
+
+
+def select_kth(data: list, k: int):
+    """
+    Returns the k-th smallest value (0-based) without sorting the data.
+
+    Args:
+        data (list): Values to select from. The list is not modified.
+        k (int): Rank of the wanted value, from 0 to len(data) - 1.
+
+    Returns:
+        float: The value that would be at index k if the data were sorted.
+    """
+    return _select(data, k)[1]
+
+
 def compute_median(data: list):
-    """Calculates the median by sorting and selecting the middle value."""
+    """
+    Calculates the median by selecting the middle value in linear time; for an
+    even count, the lower middle value comes out of the same partitions.
+    """
     n = len(data)
     if n == 0:
         return 0
-    sorted_data = data[:]
-    for i in range(n - 1):  # We use simple bubble sort
-        for j in range(n - i - 1):
-            if sorted_data[j] > sorted_data[j + 1]:
-                sorted_data[j], sorted_data[j + 1] = sorted_data[j + 1], sorted_data[j]
-
-    mid = n // 2
+    lower, upper = _select(data, n // 2)
     if n % 2 == 0:
-        return (sorted_data[mid - 1] + sorted_data[mid]) / 2
-    return sorted_data[mid]
+        return (lower + upper) / 2
+    return upper
 
 
 def compute_mode(data: list):
@@ -79,29 +273,136 @@ def compute_mode(data: list):
 
 
 def compute_variance(data: list, mean: float):
-    """Computes variance."""
+    """
+    Computes variance.
+
+    The squared deviations from mean are added up exactly and rounded once, so
+    the result is the same as in the streaming and incremental modes.
+    """
     if len(data) < 2:
         return 0
-    variance_sum = 0
-    for num in data:
-        variance_sum += (num - mean) ** 2
-    return variance_sum / len(data)
+    return exact_variance(len(data), *exact_sums(data), mean)
+
+
+def compute_std_dev(variance: float, rel_tol: float = 2.0 ** -52, exact: bool = False):
+    """
+    Computes standard deviation as the square root of variance.
+
+    The variance is split into a mantissa in [0.5, 2) and an even power of two,
+    so Newton's method starts from a close linear guess and reaches full double
+    precision in at most five iterations, whatever the magnitude. The result is
+    correctly rounded, like math.sqrt.
 
+    Args:
+        variance (float): Variance, zero or positive.
+        rel_tol (float): Relative change at which the iterations stop.
+        exact (bool): Compute the root with Decimal to DECIMAL_PRECISION digits.
 
-def compute_std_dev(variance: float):
-    """Computes standard deviation as the square root of variance."""
+    Returns:
+        float: The standard deviation, or a Decimal when exact is True.
+    """
+    if variance < 0:
+        raise ValueError("Variance cannot be negative.")
     if variance == 0:
         return 0
-    x = variance
-    guess = x / 2
-    while True:  # We implement square root using Newton's method
-        new_guess = (guess + x / guess) / 2
-        if abs(new_guess - guess) < 1e-6:
-            return new_guess
+    if exact:
+        return Decimal(variance).sqrt(Context(prec=DECIMAL_PRECISION))
+    if variance != variance or variance == float("inf"):
+        return variance
+    mantissa, exponent = math.frexp(variance)
+    if exponent % 2:
+        mantissa *= 2
+        exponent -= 1
+    guess = 0.4714 * (mantissa + 1)  # Line through sqrt(0.5) and sqrt(2).
+    for _ in range(6):  # We implement square root using Newton's method
+        new_guess = (guess + mantissa / guess) / 2
+        if abs(new_guess - guess) <= rel_tol * new_guess:
+            guess = new_guess
+            break
         guess = new_guess
+    # One last step with the residual computed exactly (Dekker's product), which
+    # fixes the last bit Newton's method can leave wrong in floating point.
+    split = 134217729.0 * guess
+    high = split - (split - guess)
+    low = guess - high
+    square = guess * guess
+    residual = (mantissa - square) - (((high * high - square) + 2 * high * low) + low * low)
+    guess += residual / (2 * guess)
+    return math.ldexp(guess, exponent // 2)
+
+
+def resume_offset(file_path: str, header: dict):
+    """
+    Returns where reading can resume from a saved state, or 0 if the file was
+    replaced, truncated, or its last token was extended by the appended data.
+    """
+    offset = header["offset"]
+    tail = bytes.fromhex(header["tail"])
+    try:
+        with open(file_path, 'rb') as file:
+            file.seek(offset - len(tail))
+            if file.read(len(tail)) != tail:
+                return 0
+            following = file.read(1)
+    except (OSError, ValueError):
+        return 0
+    if tail[-1:] and not tail[-1:].isspace() and following and not following.isspace():
+        return 0
+    return offset
+
+
+def compute_incremental(file_path: str, state_path: str):
+    """
+    Computes the statistics of a file that only grows by appending.
+
+    Only the bytes added since the state was saved are read; the state is
+    then updated so the next run starts where this one stopped. The table of
+    distinct values in the state is still loaded, merged with the new values
+    and saved on every run. When values repeat the table is small, and a run
+    on a file that grew by 1% costs about 1% of a full run. When nearly all
+    values are distinct the table is as large as the file, and the same run
+    costs about 10 to 15% of a full run.
+
+    Args:
+        file_path (str): Path to the input file.
+        state_path (str): Path to the state file.
+
+    Returns:
+        StatisticsAccumulator: The statistics of the whole file.
+    """
+    saved = load_state(state_path)
+    offset = 0
+    if saved is not None:
+        accumulator, header = saved
+        offset = resume_offset(file_path, header)
+    if offset == 0:
+        accumulator = StatisticsAccumulator()
+    try:
+        size = os.path.getsize(file_path)
+    except OSError as error:
+        print(f"Error reading file: {error}")
+        sys.exit(1)
+    for chunk in read_chunks(file_path, start=offset, stop=size):
+        accumulator.update(chunk)
+    with open(file_path, 'rb') as file:
+        file.seek(max(0, size - 64))
+        tail = file.read(size - file.tell())
+    save_state(state_path, accumulator, size, tail)
+    return accumulator
+
 
+def format_results(mean, median, mode, variance, std_dev):
+    """Returns the lines that report the computed statistics."""
+    return [
+        f"Mean: {mean:.2f}",
+        f"Median: {median:.2f}",
+        f"Mode: {mode}" if mode == "N/A" else f"Mode: {mode:.2f}",
+        f"Variance: {variance:.2f}",
+        f"Standard Deviation: {std_dev:.2f}"
+    ]
 
-def write_results(mean, median, mode, variance, std_dev, elapsed_time):
+
+def write_results(mean, median, mode, variance, std_dev, elapsed_time, breakdown=None):
     """
     Writes the computed statistics to a file.
 
@@ -112,52 +413,395 @@ def write_results(mean, median, mode, variance, std_dev, elapsed_time):
         variance (float): Computed variance.
         std_dev (float): Computed standard deviation.
         elapsed_time (float): Execution time.
+        breakdown (list, optional): Pairs of file name and result lines of each file.
     """
     try:
         with open('StatisticsResults.txt', 'w', encoding="utf-8") as result_file:
-            result_file.write(f"Mean: {mean:.2f}\n")
-            result_file.write(f"Median: {median:.2f}\n")
-            if mode == "N/A":
-                result_file.write(f"Mode: {mode}\n")
-            else:
-                result_file.write(f"Mode: {mode:.2f}\n")
-            result_file.write(f"Variance: {variance:.2f}\n")
-            result_file.write(f"Standard Deviation: {std_dev:.2f}\n")
+            for line in format_results(mean, median, mode, variance, std_dev):
+                result_file.write(line + "\n")
             result_file.write(f"\nTime elapsed: {elapsed_time:.4f} seconds\n")
+            for file_name, lines in breakdown or []:
+                result_file.write(f"\nFile: {file_name}\n")
+                for line in lines:
+                    result_file.write(line + "\n")
     except OSError as error:
         print(f"Error writing results: {error}")
 
 
+BACKENDS = ("python", "numpy")
+
+
+def load_backend(name: str):
+    """
+    Returns the module that provides the compute functions of a backend.
+
+    The pure-Python functions of this module are the reference backend; the
+    NumPy backend is imported only when it is requested.
+    """
+    if name == "numpy":
+        try:
+            import numpy_backend  # pylint: disable=import-outside-toplevel,import-error
+        except ImportError as error:
+            print(f"Error: the numpy backend is not available: {error}")
+            sys.exit(1)
+        return numpy_backend
+    return sys.modules[__name__]
+
+
+def compute_statistics(numbers: list, backend=None):
+    """Computes mean, median, mode and variance of a list of numbers."""
+    backend = backend or sys.modules[__name__]
+    mean = backend.compute_mean(numbers)
+    return (mean, backend.compute_median(numbers), backend.compute_mode(numbers),
+            backend.compute_variance(numbers, mean))
+
+
+def accumulate_file(file_path: str):
+    """Computes the partial statistics of a file in a single pass."""
+    accumulator = StatisticsAccumulator()
+    for chunk in read_chunks(file_path):
+        accumulator.update(chunk)
+    return accumulator
+
+
+def summarize_file(file_path: str, per_file: bool = False):
+    """
+    Computes the partial statistics of a file with its table sorted, in a worker.
+
+    Returns:
+        tuple: The accumulator, the running counts of its table starting at 0,
+        and the statistics of the file when per_file is true, or None.
+    """
+    accumulator = accumulate_file(file_path)
+    accumulator.compact()
+    cumulative = array('q', accumulate(accumulator.counts, initial=0))
+    return accumulator, cumulative, accumulator.statistics() if per_file else None
+
+
+def sketch_file(file_path: str, k: int):
+    """Builds an approximate quantile sketch of a file in bounded memory."""
+    sketch = KLLSketch(k)
+    for chunk in read_chunks(file_path):
+        sketch.update(chunk)
+    return sketch
+
+
+def map_files(function, file_paths: list, workers: int):
+    """
+    Applies function to every file, in a process pool when there is more than one.
+    The phase times and records of the workers are added to the active run.
+
+    Returns:
+        list: The results in the same order as file_paths.
+    """
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+            return list(worker_results(executor.map(WorkerTask(function), file_paths)))
+    return [function(file_path) for file_path in file_paths]
+
+
+def compute_files(file_paths: list, workers: int, per_file: bool = False):
+    """
+    Computes the statistics of many files as if they were one concatenated file.
+
+    With one worker the files are merged into one accumulator whose values are
+    sorted once at the end. With more, every worker sorts the table of its files
+    and computes their own statistics; the parent then bisects the sorted tables
+    for the median, and the workers find the mode of separate ranges of values.
+    The parent only merges the running moments and slices the tables, so its
+    work does not grow with the number of values, but the tables are still
+    copied between the processes.
+
+    Args:
+        file_paths (list): Paths to the input files.
+        workers (int): Number of worker processes.
+        per_file (bool): Also compute the statistics of each file.
+
+    Returns:
+        tuple: The statistics of all the files, or None if there are no numbers,
+        and the statistics of each file when per_file is true.
+    """
+    combined = StatisticsAccumulator()
+    file_statistics = []
+    if workers <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            partial = accumulate_file(file_path)
+            if per_file:
+                file_statistics.append(partial.statistics())
+            combined.merge(partial)
+        return combined.statistics(), file_statistics
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+        summaries = list(worker_results(executor.map(
+            WorkerTask(partial_function(summarize_file, per_file=per_file)), file_paths)))
+        tables = []
+        for partial, cumulative, statistics in summaries:
+            file_statistics.append(statistics)
+            if partial.count:
+                tables.append((partial, cumulative, combined.count))
+            combined.merge_moments(partial)
+        if combined.count == 0:
+            return None, file_statistics
+
+        pairs = [(partial.values, cumulative) for partial, cumulative, _ in tables]
+        n = combined.count
+        median = select_tables(pairs, n // 2)
+        if n % 2 == 0:
+            median = (select_tables(pairs, n // 2 - 1) + median) / 2
+
+        # Split the values into one range per worker at evenly spaced ranks.
+        splits = [select_tables(pairs, n * part // workers) for part in range(1, workers)]
+        bounds = list(zip(chain((-math.inf,), splits), chain(splits, (math.inf,))))
+        ranges = []
+        for low, high in bounds:
+            if low == high:
+                continue
+            pieces = []
+            for partial, _, offset in tables:
+                part = slice(bisect_left(partial.values, low), bisect_left(partial.values, high))
+                pieces.append((partial.values[part], partial.counts[part], partial.last[part],
+                               offset))
+            ranges.append(pieces)
+        modes = list(worker_results(executor.map(WorkerTask(mode_of_range), ranges)))
+
+    max_count, mode, _ = min(modes, key=lambda entry: (-entry[0], entry[2]))
+    if max_count <= 1:
+        mode = "N/A"
+    return (combined.mean(), median, mode, combined.variance()), file_statistics
+
+
+def compute_sketch(file_paths: list, k: int, workers: int = 1, merge_files=()):
+    """
+    Builds an approximate quantile sketch of many files in bounded memory.
+
+    Args:
+        file_paths (list): Paths to the input files.
+        k (int): Sketch size parameter; larger values give smaller rank errors.
+        workers (int): Number of worker processes.
+        merge_files (list): Sketches saved from other files to merge into the result.
+
+    Returns:
+        KLLSketch: The sketch summarizing all the inputs.
+    """
+    sketch = KLLSketch(k)
+    for partial in map_files(partial_function(sketch_file, k=k), file_paths, workers):
+        sketch.merge(partial)
+    for merge_file in merge_files:
+        try:
+            sketch.merge(KLLSketch.load(merge_file))
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Error reading sketch '{merge_file}': {error}")
+            sys.exit(1)
+    return sketch
+
+
+def compute_windowed(file_path: str, windowed: WindowedStatistics, every: int, output):
+    """
+    Writes the statistics of a sliding window as the values of a stream arrive.
+
+    Args:
+        file_path (str): Path to the input file, or "-" to read standard input.
+        windowed (WindowedStatistics): Window that keeps the statistics.
+        every (int): Number of values between two result lines.
+        output: Text file or stream where the result lines are written.
+    """
+    chunks = read_stdin_chunks() if file_path == "-" else read_chunks(file_path)
+    for chunk in chunks:
+        for num in chunk:
+            windowed.add(num)
+            if windowed.position % every:
+                continue
+            mean, median, mode, variance = windowed.statistics()
+            lines = format_results(mean, median, mode, variance, compute_std_dev(variance))
+            output.write(f"Values {windowed.position}: {', '.join(lines)}\n")
+        output.flush()
+
+
+def save_quantiles(sketch, percentiles, elapsed_time):
+    """
+    Prints approximate quantiles and saves them to StatisticsResults.txt.
+
+    Args:
+        sketch (KLLSketch): Sketch of the input data.
+        percentiles (list): Percentiles to report, between 0 and 100.
+        elapsed_time (float): Execution time.
+    """
+    output = [f"Count: {sketch.count}", f"Median: {sketch.quantile(0.5):.2f}"]
+    output.extend(f"P{p:g}: {sketch.quantile(p / 100):.2f}" for p in percentiles)
+    output.append(f"Rank error: +/-{sketch.rank_error():.2%}")
+
+    print("\n".join(output))
+    print(f"\nElapsed time: {elapsed_time:.4f} seconds")
+
+    try:
+        with open('StatisticsResults.txt', 'w', encoding="utf-8") as result_file:
+            result_file.write("\n".join(output) + "\n")
+            result_file.write(f"\nTime elapsed: {elapsed_time:.4f} seconds\n")
+    except OSError as error:
+        print(f"Error writing results: {error}")
+
+
+def print_results(mean, median, mode, variance, std_dev, elapsed_time):
+    """Prints the computed statistics to the console."""
+    print("\n".join(format_results(mean, median, mode, variance, std_dev)))
+    print(f"\nElapsed time: {elapsed_time:.4f} seconds")
+
+
+def expand_inputs(patterns: list):
+    """Expands glob patterns into file paths; other arguments are kept as given."""
+    file_paths = []
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            file_paths.extend(sorted(glob.glob(pattern)))
+        else:
+            file_paths.append(pattern)
+    return file_paths
+
+
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python computeStatistics.py <file_with_data.txt>")
+    parser = argparse.ArgumentParser(
+        description="Computes descriptive statistics of files with numbers.")
+    parser.add_argument("input_files", nargs="+", metavar="input_file",
+                        help="files or glob patterns with one or more numbers per line")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the file in chunks in a single pass")
+    parser.add_argument("--backend", choices=BACKENDS, default="python",
+                        help="implementation of the in-memory computations of one file")
+    parser.add_argument("--exact-sqrt", action="store_true",
+                        help=f"compute the standard deviation with {DECIMAL_PRECISION} digits")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="worker processes used when there are several files "
+                             "(default: 1)")
+    parser.add_argument("--per-file", action="store_true",
+                        help="also write the statistics of each file")
+    parser.add_argument("--incremental", action="store_true",
+                        help="read only what was appended since the last run")
+    parser.add_argument("--state-file", metavar="FILE",
+                        help="state kept between incremental runs (default: <input_file>.state)")
+    parser.add_argument("--window", type=int, metavar="N",
+                        help="report rolling statistics of the last N values")
+    parser.add_argument("--window-seconds", type=float, metavar="T",
+                        help="report rolling statistics of the values of the last T seconds")
+    parser.add_argument("--every", type=int, default=1, metavar="K",
+                        help="values between two rolling result lines")
+    parser.add_argument("--output", metavar="FILE",
+                        help="file for the rolling result lines (default: standard output)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append the timings of the run to a JSON lines file")
+    parser.add_argument("--profile", action="store_true",
+                        help="run under cProfile and print the hot spots")
+    parser.add_argument("--sketch", action="store_true",
+                        help="report approximate quantiles using bounded memory")
+    parser.add_argument("--sketch-k", type=int, default=200, metavar="K",
+                        help="sketch size; the rank error shrinks roughly as 2.3/K")
+    parser.add_argument("--percentiles", type=float, nargs="+", default=[50, 90, 99],
+                        metavar="P", help="percentiles reported in sketch mode")
+    parser.add_argument("--save-sketch", metavar="FILE",
+                        help="save the sketch so it can be merged later")
+    parser.add_argument("--merge-sketch", nargs="+", default=[], metavar="FILE",
+                        help="merge sketches saved from other files")
+    args = parser.parse_args()
+    if any(not 0 <= p <= 100 for p in args.percentiles):
+        parser.error("percentiles must be between 0 and 100")
+    if args.sketch_k < 8:
+        parser.error("--sketch-k must be at least 8")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.backend != "python" and (args.stream or args.sketch or args.incremental
+                                     or args.window is not None
+                                     or args.window_seconds is not None):
+        parser.error("--backend only applies to the in-memory mode")
+    if args.incremental and (args.sketch or len(args.input_files) > 1):
+        parser.error("--incremental takes a single input file")
+    if args.every < 1:
+        parser.error("--every must be at least 1")
+
+    start_run("computeStatistics", args.metrics, args.profile)
+
+    if args.window is not None or args.window_seconds is not None:
+        if len(args.input_files) > 1 or args.sketch or args.incremental:
+            parser.error("rolling statistics take a single input file or -")
+        try:
+            log_windowed = WindowedStatistics(args.window, args.window_seconds)
+        except ValueError as error:
+            parser.error(str(error))
+        try:
+            with phase("compute"):
+                if args.output:
+                    with open(args.output, 'w', encoding="utf-8") as log_output:
+                        compute_windowed(args.input_files[0], log_windowed, args.every,
+                                         log_output)
+                else:
+                    compute_windowed(args.input_files[0], log_windowed, args.every,
+                                     sys.stdout)
+        except OSError as error:
+            print(f"Error writing results: {error}")
+            sys.exit(1)
+        sys.exit(0)
+
+    input_files = expand_inputs(args.input_files)
+    if not input_files:
+        print("Error: No input files match the given patterns.")
         sys.exit(1)
+    if args.backend != "python" and len(input_files) > 1:
+        parser.error("--backend only applies to a single input file")
+    log_backend = load_backend(args.backend)
 
-    input_file = sys.argv[1]
-    start_time = time.time()
+    if args.sketch:
+        with phase("compute"):
+            log_sketch = compute_sketch(input_files, args.sketch_k, args.workers,
+                                        args.merge_sketch)
+        if log_sketch.count == 0:
+            print("Error: No valid numbers found in the file.")
+            sys.exit(1)
+        with phase("write"):
+            if args.save_sketch:
+                try:
+                    log_sketch.save(args.save_sketch)
+                except OSError as error:
+                    print(f"Error writing sketch: {error}")
+            save_quantiles(log_sketch, args.percentiles, elapsed_time())
+        sys.exit(0)
 
-    log_numbers = read_numbers(input_file)
+    log_breakdown = None
+    with phase("compute"):
+        if len(input_files) > 1:
+            log_statistics, log_partials = compute_files(input_files, args.workers,
+                                                         args.per_file)
+            if args.per_file:
+                log_breakdown = []
+                for log_file, log_file_statistics in zip(input_files, log_partials):
+                    if log_file_statistics is None:
+                        log_breakdown.append((log_file, ["No valid numbers found."]))
+                        continue
+                    log_breakdown.append((log_file, format_results(
+                        *log_file_statistics, compute_std_dev(log_file_statistics[3]))))
+        elif args.incremental:
+            log_statistics = compute_incremental(
+                input_files[0], args.state_file or input_files[0] + ".state").statistics()
+        elif args.stream:
+            log_statistics = accumulate_file(input_files[0]).statistics()
+        else:
+            log_numbers = read_numbers(input_files[0])
+            log_statistics = None
+            if log_numbers:
+                log_statistics = compute_statistics(log_numbers, log_backend)
 
-    if not log_numbers:
+    if log_statistics is None:
         print("Error: No valid numbers found in the file.")
         sys.exit(1)
 
-    log_mean = compute_mean(log_numbers)
-    log_median = compute_median(log_numbers)
-    log_mode = compute_mode(log_numbers)
-    log_variance = compute_variance(log_numbers, log_mean)
-    log_std_dev = compute_std_dev(log_variance)
-
-    log_elapsed_time = time.time() - start_time
-
-    print(f"Mean: {log_mean:.2f}")
-    print(f"Median: {log_median:.2f}")
-    if log_mode == "N/A":
-        print(f"Mode: {log_mode}")
-    else:
-        print(f"Mode: {log_mode:.2f}")
-    print(f"Variance: {log_variance:.2f}")
-    print(f"Standard Deviation: {log_std_dev:.2f}")
-    print(f"\nElapsed time: {log_elapsed_time:.4f} seconds")
-
-    write_results(log_mean, log_median, log_mode, log_variance, log_std_dev, log_elapsed_time)
+    log_mean, log_median, log_mode, log_variance = log_statistics
+    with phase("compute"):
+        if args.exact_sqrt:
+            log_std_dev = compute_std_dev(log_variance, exact=True)
+        else:
+            log_std_dev = log_backend.compute_std_dev(log_variance)
+
+    log_elapsed_time = elapsed_time()
+
+    with phase("write"):
+        print_results(log_mean, log_median, log_mode, log_variance, log_std_dev,
+                      log_elapsed_time)
+        write_results(log_mean, log_median, log_mode, log_variance, log_std_dev,
+                      log_elapsed_time, log_breakdown)
@@ -0,0 +1,80 @@
+"""
+NumPy Backend Module
+
+This module provides vectorized versions of the compute functions of computeStatistics.py.
+They follow the same semantics as the pure-Python reference functions (sequential sum for
+the mean, exactly summed population variance, first value to reach the highest count as the
+mode) so both backends report the same results. NumPy is an optional dependency, only
+needed for this backend.
+"""
+
+from array import array
+
+import numpy as np
+
+from statistics_accumulator import exact_sums, exact_variance  # pylint: disable=import-error
+
+
+def _as_array(data):
+    """Views the data as a float64 NumPy array, without copying an array('d')."""
+    if isinstance(data, array) and data.typecode == 'd':
+        return np.frombuffer(data, dtype=np.float64)
+    return np.asarray(data, dtype=np.float64)
+
+
+def _sequential_sum(values):
+    """Adds the values left to right, like the reference loop, instead of pairwise."""
+    return float(np.cumsum(values)[-1])
+
+
+def compute_mean(data):
+    """Calculates the mean."""
+    values = _as_array(data)
+    if values.size == 0:
+        return 0
+    return _sequential_sum(values) / values.size
+
+
+def compute_median(data):
+    """Calculates the median with a partition around the middle value(s)."""
+    values = _as_array(data)
+    n = values.size
+    if n == 0:
+        return 0
+    mid = n // 2
+    if n % 2 == 0:
+        partitioned = np.partition(values, (mid - 1, mid))
+        return (float(partitioned[mid - 1]) + float(partitioned[mid])) / 2
+    return float(np.partition(values, mid)[mid])
+
+
+def compute_mode(data):
+    """Calculates the mode by counting occurrences of each unique value."""
+    values = _as_array(data)
+    if values.size == 0:
+        return None
+    unique, first_reversed, counts = np.unique(
+        values[::-1], return_index=True, return_counts=True)
+    max_count = counts.max()
+    if max_count == 1:
+        return "N/A"
+    # The reference returns the first value to reach the highest count, which
+    # is the one whose last occurrence comes first.
+    last_seen = values.size - 1 - first_reversed
+    candidates = np.flatnonzero(counts == max_count)
+    return float(unique[candidates[np.argmin(last_seen[candidates])]])
+
+
+def compute_variance(data, mean: float):
+    """Computes variance from the exact sums of the reference."""
+    values = _as_array(data)
+    if values.size < 2:
+        return 0
+    return exact_variance(values.size, *exact_sums(values.tolist()), mean)
+
+
+def compute_std_dev(variance: float):
+    """Computes standard deviation as the square root of variance."""
+    if variance == 0:
+        return 0
+    return float(np.sqrt(variance))
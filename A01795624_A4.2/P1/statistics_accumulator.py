@@ -0,0 +1,513 @@
+"""
+Statistics Accumulator Module
+
+This module keeps the exact mean, median, mode and variance of a stream of numbers that
+arrives in chunks. Repeated values are counted into a table of typed arrays sorted by
+value, so memory grows with the number of distinct values and not with the length of the
+stream. The variance comes from exact sums, so it does not depend on how the stream
+was split. Accumulators built on separate files merge exactly into one, and an accumulator
+can be saved to a state file and loaded again to continue where it stopped. The results
+follow the semantics of the compute_* functions of computeStatistics.py.
+"""
+
+import json
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from fractions import Fraction
+from functools import reduce
+from itertools import accumulate, islice, repeat
+from operator import add, mul
+
+FOLD_SIZE = 1 << 20  # Pending values that make an accumulator try to count them into its table.
+EXACT_BLOCK = 1 << 16  # Values turned into integers at a time by exact_sums.
+
+
+def _merge_tables(earlier: tuple, later: tuple) -> tuple:
+    """
+    Merges two tables of distinct values in increasing order, their counts and
+    the positions of their last occurrences, where every occurrence in later
+    comes after those in earlier.
+
+    The entries of the smaller table are inserted into the larger one, whose
+    runs between two insertions are copied whole, so the time spent in Python
+    grows with the size of the smaller table only.
+    """
+    if len(earlier[0]) > len(later[0]):
+        (values, counts, last), new = earlier, later
+    else:
+        (values, counts, last), new = later, earlier
+    if not new[0]:
+        return values, counts, last
+    merged_values, merged_counts, merged_last = array('d'), array('q'), array('q')
+    start = 0
+    for value, value_count, value_last in zip(*new):
+        position = bisect_left(values, value, start)
+        merged_values.extend(values[start:position])
+        merged_counts.extend(counts[start:position])
+        merged_last.extend(last[start:position])
+        start = position
+        if position < len(values) and values[position] == value:
+            value_count += counts[position]
+            if new is earlier:
+                # A value found in both tables keeps its last position from the later one.
+                value_last = last[position]
+            start += 1
+        merged_values.append(value)
+        merged_counts.append(value_count)
+        merged_last.append(value_last)
+    merged_values.extend(values[start:])
+    merged_counts.extend(counts[start:])
+    merged_last.extend(last[start:])
+    return merged_values, merged_counts, merged_last
+
+
+def _repetitive(values: array) -> bool:
+    """Tells whether the last sixteenth of an array repeats enough values that counting pays."""
+    sample = values[-max(1, len(values) // 16):]
+    return len(set(sample)) * 4 <= len(sample) * 3
+
+
+def _all_distinct(ordered: list) -> bool:
+    """Tells whether a sorted list has no value twice."""
+    return all(map(float.__ne__, ordered, islice(ordered, 1, None)))
+
+
+def exact_sums(values) -> tuple:
+    """
+    Returns the exact sum of some numbers and of their squares, as fractions.
+
+    Within a block, every value is a multiple of the unit in the last place of
+    the smallest one, so scaling them by the same power of two turns them into
+    integers, which add up and square without rounding. Both sums are NaN when
+    a value is infinite or NaN.
+    """
+    linear, square = Fraction(0), Fraction(0)
+    for start in range(0, len(values), EXACT_BLOCK):
+        block = values[start:start + EXACT_BLOCK]
+        try:
+            _, exponent = math.frexp(min(filter(None, map(abs, block)), default=1.0))
+            shift = 53 - exponent
+            integers = list(map(int, map(math.ldexp, block, repeat(shift))))
+        except (OverflowError, ValueError):
+            if not all(map(math.isfinite, block)):
+                return math.nan, math.nan
+            # The values span too many powers of two to share one scale.
+            linear += sum(map(Fraction, block))
+            square += sum(Fraction(num) ** 2 for num in block)
+            continue
+        scale = Fraction(2) ** -shift
+        linear += sum(integers) * scale
+        square += sum(map(mul, integers, integers)) * scale * scale
+    return linear, square
+
+
+def exact_variance(count: int, linear, square, mean: float):
+    """
+    Returns the population variance around mean of count numbers, given the
+    exact sums of the numbers and of their squares from exact_sums.
+
+    The result is the sum of the squared deviations from mean divided by count,
+    as in compute_variance, computed exactly and rounded once.
+    """
+    if count < 2:
+        return 0
+    if linear != linear:  # A value was infinite or NaN.
+        return math.nan
+    if math.isinf(mean):  # The total overflowed, and so do the squared deviations.
+        return math.inf
+    center = Fraction(mean)
+    spread = square - 2 * center * linear + count * center * center
+    try:
+        return float(spread / count)
+    except OverflowError:
+        return math.inf
+
+
+def _count_sorted(ordered: list, positions: list = None):
+    """
+    Counts the runs of equal values of a sorted list.
+
+    Args:
+        ordered (list): Values in increasing order.
+        positions (list, optional): Position of each value in the input; the
+            last position of each run is returned as well.
+
+    Returns:
+        tuple: The distinct values, their counts and, with positions, their last
+        positions, as typed arrays.
+    """
+    if _all_distinct(ordered):
+        return (array('d', ordered), array('q', [1]) * len(ordered),
+                array('q', positions or ()))
+    values, counts, last = array('d'), array('q'), array('q')
+    for index, value in enumerate(ordered):
+        if values and values[-1] == value:
+            counts[-1] += 1
+            if positions:
+                last[-1] = positions[index]
+        else:
+            values.append(value)
+            counts.append(1)
+            if positions:
+                last.append(positions[index])
+    return values, counts, last
+
+
+class StatisticsAccumulator:
+    """
+    Accumulates descriptive statistics in a single pass over chunks of numbers.
+
+    The mean adds the values up in order, like compute_mean. The variance
+    comes from the exact sums of the values and of their squares, so it is the
+    same however the values were split into chunks. An exact median and mode
+    need every distinct value and its count, so memory grows with the number
+    of distinct values. Values that repeat are counted into a table of typed
+    arrays sorted by value, 24 bytes per distinct value, which does not grow
+    with the file size. Values that are nearly all distinct cannot be reduced
+    that way: they are kept as read, 8 bytes each, and sorted once, in C, when
+    the results are asked for. For such data, the --sketch mode answers in
+    bounded memory instead.
+
+    New values wait in a pending array. Every FOLD_SIZE values, or twice as
+    many as the last time they were found to be mostly distinct, a sample of
+    them decides whether they are counted into the table. The position of the
+    last occurrence of each value, which breaks ties for the mode, is only
+    looked up among the pending values when the mode is tied. Accumulators
+    built on separate files merge exactly into one.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        # Exact sums of the values and of their squares, from which the variance
+        # is computed without rounding errors.
+        self.exact_sum = Fraction(0)
+        self.exact_square_sum = Fraction(0)
+        self.values = array('d')  # Distinct values, in increasing order.
+        self.counts = array('q')  # Occurrences of each value.
+        # Position of the last occurrence of each value, which decides ties for
+        # the mode and survives merging partial results.
+        self.last = array('q')
+        self.pending = array('d')  # Values not yet in the table, in order.
+        self.fold_size = FOLD_SIZE
+        # Table entry that held the median last time, and how many values come
+        # before it, so the next median is found by walking from there.
+        self.cursor = None
+
+    def update(self, chunk):
+        """Adds a chunk of numbers to the running statistics."""
+        size = len(chunk)
+        if size == 0:
+            return
+        # The total is added up in order, like compute_mean.
+        self.total = reduce(add, chunk, self.total)
+        linear, square = exact_sums(chunk)
+        self.exact_sum += linear
+        self.exact_square_sum += square
+        self.count += size
+        self.pending.extend(chunk)
+        if len(self.pending) >= self.fold_size:
+            if _repetitive(self.pending):
+                self.compact()
+            else:
+                self.fold_size = 2 * len(self.pending)
+
+    def compact(self):
+        """Counts the pending values into the table."""
+        pending = self.pending
+        if not pending:
+            return
+        start = self.count - len(pending)
+        if _repetitive(pending):
+            # Counting in a dict is cheaper than sorting when values repeat.
+            frequencies = Counter(pending)
+            # Later positions overwrite earlier ones, leaving the last occurrence.
+            last_seen = dict(zip(pending, range(start, start + len(pending))))
+            values = array('d', sorted(frequencies))
+            counts = array('q', [frequencies[value] for value in values])
+            last = array('q', [last_seen[value] for value in values])
+        else:
+            # Sorting the positions keeps equal values in order, so the last
+            # position of each run is the last occurrence of its value.
+            order = sorted(range(len(pending)), key=pending.__getitem__)
+            values, counts, last = _count_sorted([pending[index] for index in order],
+                                                 [start + index for index in order])
+        self.pending = array('d')
+        self._merge_into_table(values, counts, last)
+
+    def _merge_into_table(self, values: array, counts: array, last: array):
+        """Merges a table of later occurrences into the table and keeps the cursor on its value."""
+        if self.cursor is not None:
+            pivot = self.values[self.cursor[0]]
+            below = self.cursor[1] + sum(islice(counts, bisect_left(values, pivot)))
+        self.values, self.counts, self.last = _merge_tables(
+            (self.values, self.counts, self.last), (values, counts, last))
+        if self.cursor is not None:
+            self.cursor = (bisect_left(self.values, pivot), below)
+
+    def merge(self, other: "StatisticsAccumulator"):
+        """Merges the statistics of numbers that come after this accumulator's."""
+        if other.count == 0:
+            return
+        if other.values:
+            # The pending values must come after everything in the table.
+            self.compact()
+            self._merge_into_table(other.values, other.counts,
+                                   array('q', [position + self.count for position in other.last]))
+        self.merge_moments(other)
+        self.pending.extend(other.pending)
+
+    def merge_moments(self, other: "StatisticsAccumulator"):
+        """Merges the count, total and sums, but not the values, of numbers that come after."""
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.exact_sum += other.exact_sum
+        self.exact_square_sum += other.exact_square_sum
+
+    def _table(self):
+        """
+        Returns the table merged with the pending values, without changing the
+        accumulator. Values that occur among the pending ones get a last position
+        of -1, since it is only needed to break ties for the mode.
+        """
+        if not self.pending:
+            return self.values, self.counts, self.last
+        values, counts, _ = _count_sorted(sorted(self.pending))
+        return _merge_tables((self.values, self.counts, self.last),
+                             (values, counts, array('q', [-1]) * len(values)))
+
+    def _median(self, values: array, counts: array):
+        """Returns the median of a table, found by bisecting its running counts."""
+        n = self.count
+        if n == 0:
+            return 0
+        cumulative = array('q', accumulate(counts))
+        mid = n // 2
+        upper = values[bisect_right(cumulative, mid)]
+        if n % 2 == 0:
+            return (values[bisect_right(cumulative, mid - 1)] + upper) / 2
+        return upper
+
+    def _mode(self, values: array, counts: array, last: array):
+        """Returns the mode of a table, or "N/A" when no value repeats."""
+        max_count = max(counts, default=0)
+        if max_count <= 1:
+            return "N/A"
+        # Like compute_mode, the winner is the first value to reach the
+        # highest count, that is, the one whose last occurrence came first.
+        # array.index scans in C, which matters when the table holds millions of values.
+        winners = [counts.index(max_count)]
+        while winners[-1] + 1 < len(counts):
+            try:
+                winners.append(counts.index(max_count, winners[-1] + 1))
+            except ValueError:
+                break
+        settled = [index for index in winners if last[index] >= 0]
+        if len(winners) == 1 or settled:
+            # A value that does not occur among the pending ones last occurred
+            # before all of them.
+            return values[min(settled or winners, key=last.__getitem__)]
+        tied = {values[index] for index in winners}
+        last_seen = {}
+        for position, value in enumerate(self.pending):
+            if value in tied:
+                last_seen[value] = position
+        return min(tied, key=last_seen.__getitem__)
+
+    def _table_median(self):
+        """
+        Returns the median of the table, walking from the entry of the last
+        median, which has moved by at most half the values added since.
+        """
+        n = self.count
+        if n == 0:
+            return 0
+        if self.cursor is None:
+            cumulative = array('q', accumulate(self.counts))
+            index = bisect_right(cumulative, n // 2)
+            self.cursor = (index, cumulative[index] - self.counts[index])
+        upper = self._walk(n // 2)
+        if n % 2 == 0:
+            return (self._walk(n // 2 - 1) + upper) / 2
+        return upper
+
+    def _walk(self, rank: int):
+        """Moves the cursor to the table entry of the value with the given rank and returns it."""
+        index, below = self.cursor
+        counts = self.counts
+        while below > rank:
+            index -= 1
+            below -= counts[index]
+        while below + counts[index] <= rank:
+            below += counts[index]
+            index += 1
+        self.cursor = (index, below)
+        return self.values[index]
+
+    def mean(self):
+        """Returns the mean, computed like compute_mean."""
+        return self.total / self.count if self.count > 0 else 0
+
+    def median(self):
+        """Returns the median."""
+        if not self.pending:
+            return self._table_median()
+        return self._median(*self._table()[:2])
+
+    def mode(self):
+        """Returns the mode, or "N/A" when no value repeats."""
+        return self._mode(*self._table())
+
+    def variance(self):
+        """Returns the population variance around the mean, from the exact sums."""
+        return exact_variance(self.count, self.exact_sum, self.exact_square_sum, self.mean())
+
+    def statistics(self):
+        """Returns mean, median, mode and variance, or None if nothing was added."""
+        if self.count == 0:
+            return None
+        values, counts, last = self._table()
+        median = self._median(values, counts) if self.pending else self._table_median()
+        return self.mean(), median, self._mode(values, counts, last), self.variance()
+
+
+def select_tables(tables: list, k: int) -> float:
+    """
+    Returns the k-th smallest value (0-based) of several sorted tables.
+
+    Each table is a pair of distinct values in increasing order and their
+    running counts starting at 0. The first value of each table whose rank
+    passes k is found by bisection, and the smallest of them is the answer.
+    """
+    best = math.inf
+    for values, _ in tables:
+        low, high = 0, bisect_left(values, best)
+        bound = high
+        while low < high:
+            middle = (low + high) // 2
+            rank = 0
+            for other_values, other_cumulative in tables:
+                rank += other_cumulative[bisect_right(other_values, values[middle])]
+            if rank > k:
+                high = middle
+            else:
+                low = middle + 1
+        if low < bound:
+            best = values[low]
+    return best
+
+
+def mode_of_range(tables: list):
+    """
+    Finds the mode of one range of values of several sorted tables, in a worker.
+
+    Each table is a tuple of values, counts and last positions, as in
+    StatisticsAccumulator, and the offset to add to its positions; the tables
+    are given in the order of their files.
+
+    Returns:
+        tuple: The highest count, the first value to reach it and the position of
+        its last occurrence, or (0, None, 0) when the range is empty.
+    """
+    best = (0, None, 0)
+    if _all_distinct(sorted(value for table in tables for value in table[0])):
+        # No value is in two tables, so the counts of each table are final.
+        for table_values, table_counts, table_last, offset in tables:
+            top = max(table_counts, default=0)
+            if top == 0 or top < best[0]:
+                continue
+            index = None
+            for position, value_count in enumerate(table_counts):
+                if value_count != top:
+                    continue
+                if index is None or table_last[position] < table_last[index]:
+                    index = position
+            if top > best[0] or table_last[index] + offset < best[2]:
+                best = (top, table_values[index], table_last[index] + offset)
+        return best
+    totals, last_seen = {}, {}
+    for table_values, table_counts, table_last, offset in tables:
+        for value, value_count, value_last in zip(table_values, table_counts, table_last):
+            totals[value] = totals.get(value, 0) + value_count
+            # The tables follow the order of the files, so the last one to hold a
+            # value holds its last occurrence.
+            last_seen[value] = value_last + offset
+    for value, total in totals.items():
+        if total > best[0] or (total == best[0] and last_seen[value] < best[2]):
+            best = (total, value, last_seen[value])
+    return best
+
+
+def save_state(state_path: str, accumulator: StatisticsAccumulator, offset: int, tail: bytes):
+    """
+    Saves the statistics of the first offset bytes of a file to a state file.
+
+    The state file starts with a JSON header holding the exact sums, the
+    cursor on the median and where the input was read up to, followed by the
+    sorted table of values, counts and last positions as raw arrays, which load
+    much faster than parsing text. The next run only merges the values it reads
+    into the table and walks the cursor to the new median.
+
+    Args:
+        state_path (str): Path to the state file.
+        accumulator (StatisticsAccumulator): Statistics of the bytes read so far.
+        offset (int): Number of bytes of the input file already read.
+        tail (bytes): Last bytes before offset, used to detect a replaced file.
+    """
+    accumulator.compact()
+    accumulator.median()  # Places the cursor on the median before it is saved.
+    header = {
+        "version": 3,
+        "byteorder": sys.byteorder,
+        "offset": offset,
+        "tail": tail.hex(),
+        "count": accumulator.count,
+        "total": accumulator.total,
+        "sum": str(accumulator.exact_sum),
+        "square_sum": str(accumulator.exact_square_sum),
+        "cursor": accumulator.cursor,
+        "distinct": len(accumulator.values)
+    }
+    try:
+        with open(state_path, 'wb') as state_file:
+            state_file.write(json.dumps(header).encode("utf-8") + b"\n")
+            accumulator.values.tofile(state_file)
+            accumulator.counts.tofile(state_file)
+            accumulator.last.tofile(state_file)
+    except OSError as error:
+        print(f"Error writing state: {error}")
+
+
+def _load_sum(text: str):
+    """Reads back an exact sum written by save_state, a fraction or nan."""
+    return math.nan if text == "nan" else Fraction(text)
+
+
+def load_state(state_path: str):
+    """
+    Loads a state file saved with save_state.
+
+    Returns:
+        tuple: The accumulator and the header, or None if there is no usable state.
+    """
+    accumulator = StatisticsAccumulator()
+    try:
+        with open(state_path, 'rb') as state_file:
+            header = json.loads(state_file.readline())
+            if header.get("version") != 3 or header.get("byteorder") != sys.byteorder:
+                return None
+            for table in (accumulator.values, accumulator.counts, accumulator.last):
+                table.fromfile(state_file, header["distinct"])
+            accumulator.exact_sum = _load_sum(header["sum"])
+            accumulator.exact_square_sum = _load_sum(header["square_sum"])
+    except (OSError, EOFError, ValueError, KeyError):
+        return None
+    accumulator.count = header["count"]
+    accumulator.total = header["total"]
+    accumulator.cursor = tuple(header["cursor"]) if header["cursor"] else None
+    return accumulator, header
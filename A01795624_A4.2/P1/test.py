@@ -0,0 +1,484 @@
+"""
+Unit tests for the Compute Statistics Script.
+
+This module checks the statistics engines against the TC1-TC7 test case files.
+"""
+
+import importlib.util
+import io
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from array import array
+from fractions import Fraction
+from unittest import mock
+from computeStatistics import (  # pylint: disable=import-error
+    _median_of_medians, _select, accumulate_file, compute_files, compute_incremental,
+    compute_mean, compute_median, compute_mode, compute_statistics, compute_std_dev,
+    compute_variance, format_results, load_backend, read_chunks, read_numbers, read_stdin_chunks,
+    select_kth
+)
+from quantile_sketch import KLLSketch  # pylint: disable=import-error
+from statistics_accumulator import (  # pylint: disable=import-error
+    StatisticsAccumulator, _merge_tables
+)
+from windowed_statistics import WindowedStatistics  # pylint: disable=import-error
+
+TEST_CASES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), f"TC{i}.txt")
+    for i in range(1, 8)
+]
+
+
+def exact_rank_error(sorted_data: list, value: float, q: float) -> float:
+    """Returns how far, as a fraction of the data, value is from the q-quantile rank."""
+    n = len(sorted_data)
+    low = sum(1 for num in sorted_data if num < value)
+    high = sum(1 for num in sorted_data if num <= value)
+    target = q * n
+    if low <= target <= high:
+        return 0.0
+    return min(abs(low - target), abs(high - target)) / n
+
+
+class BaseTest(unittest.TestCase):
+    """Base test class that loads every test case file once."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Reads the numbers of every test case file."""
+        cls.test_data = {path: read_numbers(path) for path in TEST_CASES}
+
+
+class TestReading(unittest.TestCase):
+    """Unit tests for reading numbers in blocks and reporting invalid tokens."""
+
+    def setUp(self):
+        """Creates a temporary file with valid and invalid tokens of several lengths."""
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "numbers.txt")
+        self.content = (b"1 22 333.5\n-4e2 x1 5\n\n  66.25 bad 7 nan? 8\n"
+                        b"9e-1 0x10 10 ? 11 ERROR 12.0 twelve\n13")
+        with open(self.file_path, "wb") as file:
+            file.write(self.content)
+        self.expected = [1.0, 22.0, 333.5, -400.0, 5.0, 66.25, 7.0, 8.0, 0.9, 10.0, 11.0,
+                         12.0, 13.0]
+        self.warning = ("Warning: 7 invalid data ignored: "
+                        "'x1', 'bad', 'nan?', '0x10', '?', ...")
+
+    def tearDown(self):
+        """Removes the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def read(self, **kwargs):
+        """Returns the numbers read by read_chunks and what it printed."""
+        with mock.patch("builtins.print") as printed:
+            numbers = [num for chunk in read_chunks(self.file_path, **kwargs) for num in chunk]
+        return numbers, printed
+
+    def test_tokens_split_at_block_ends(self):
+        """Test that tokens cut by every small block size are read whole."""
+        for chunk_size in (1, 2, 3, 4, 7, 16, 1 << 20):
+            numbers, _ = self.read(chunk_size=chunk_size)
+            self.assertEqual(numbers, self.expected, chunk_size)
+
+    def test_range_of_bytes(self):
+        """Test that start and stop restrict reading to whole lines of the file."""
+        stop = self.content.index(b"\n9e-1")
+        for chunk_size in (1, 5, 1 << 20):
+            numbers, _ = self.read(chunk_size=chunk_size, stop=stop)
+            self.assertEqual(numbers, self.expected[:8])
+            numbers, _ = self.read(chunk_size=chunk_size, start=stop)
+            self.assertEqual(numbers, self.expected[8:])
+
+    def test_invalid_tokens_summarized(self):
+        """Test that invalid tokens give one warning with their count and first samples."""
+        for chunk_size in (3, 1 << 20):
+            _, printed = self.read(chunk_size=chunk_size)
+            printed.assert_called_once_with(self.warning)
+        _, printed = self.read(sample_size=2)
+        printed.assert_called_once_with("Warning: 7 invalid data ignored: 'x1', 'bad', ...")
+
+    def test_stdin_warning_matches_file(self):
+        """Test that standard input is reported with the same samples as a file."""
+        stdin = io.TextIOWrapper(io.BytesIO(self.content))
+        with mock.patch.object(sys, "stdin", stdin), mock.patch("builtins.print") as printed:
+            numbers = [num for chunk in read_stdin_chunks() for num in chunk]
+        self.assertEqual(numbers, self.expected)
+        printed.assert_called_once_with(self.warning)
+
+
+class TestSelection(unittest.TestCase):
+    """Unit tests for the introselect behind compute_median."""
+
+    def test_every_rank(self):
+        """Test select_kth against a sorted copy for every rank of small inputs."""
+        rng = random.Random(1)
+        for size in (1, 2, 5, 6, 7, 31, 200):
+            data = [float(rng.randint(0, size // 2)) for _ in range(size)]
+            original = list(data)
+            expected = sorted(data)
+            for k in range(size):
+                self.assertEqual(select_kth(data, k), expected[k])
+            self.assertEqual(data, original)
+
+    def test_unbalanced_inputs(self):
+        """Test orders that unbalance a median-of-three pivot, and repeated values."""
+        size = 3001
+        half = size // 2
+        for data in (list(range(size)), list(range(size, 0, -1)), [7.0] * size,
+                     list(range(half)) + list(range(half + 1, 0, -1)),
+                     [num % 3 for num in range(size)]):
+            self.assertEqual(compute_median(data), sorted(data)[half])
+
+    def test_lower_middle(self):
+        """Test that the value just below each rank comes out of the same partitions."""
+        rng = random.Random(2)
+        for size in (2, 6, 7, 40, 1000):
+            data = [float(rng.randint(0, size)) for _ in range(size)]
+            expected = sorted(data)
+            for k in range(1, size):
+                self.assertEqual(_select(data, k), (expected[k - 1], expected[k]))
+
+    def test_random_inputs_stay_in_quickselect(self):
+        """Test that random data never runs out of median-of-three partitions."""
+        rng = random.Random(3)
+        with mock.patch("computeStatistics._median_of_medians",
+                        side_effect=AssertionError("fallback used")):
+            for _ in range(5):
+                data = [rng.random() for _ in range(100_000)]
+                expected = sorted(data)
+                self.assertEqual(compute_median(data), (expected[49_999] + expected[50_000]) / 2)
+
+    def test_median_of_medians(self):
+        """Test that the fallback pivot leaves at least 30% of the values on each side."""
+        rng = random.Random(4)
+        for size in (6, 25, 1001, 5000):
+            data = [rng.random() for _ in range(size)]
+            pivot = _median_of_medians(data)
+            self.assertGreaterEqual(sum(num < pivot for num in data), size * 3 // 10 - 2)
+            self.assertGreaterEqual(sum(num > pivot for num in data), size * 3 // 10 - 2)
+
+    def test_rank_out_of_range(self):
+        """Test that a rank outside the data is rejected."""
+        for k in (-1, 3):
+            with self.assertRaises(IndexError):
+                select_kth([3.0, 1.0, 2.0], k)
+
+
+class TestMedian(BaseTest):
+    """Unit tests for the exact statistics engines."""
+
+    def test_median_matches_sorted(self):
+        """Test the selection-based median against a sorted copy."""
+        for path, data in self.test_data.items():
+            expected = sorted(data)
+            mid = len(data) // 2
+            if len(data) % 2 == 0:
+                median = (expected[mid - 1] + expected[mid]) / 2
+            else:
+                median = expected[mid]
+            self.assertEqual(compute_median(data), median, path)
+
+    def test_accumulator_matches_lists(self):
+        """Test that the streaming accumulator agrees with the list functions."""
+        for path, data in self.test_data.items():
+            accumulator = StatisticsAccumulator()
+            for start in range(0, len(data), 1000):
+                accumulator.update(data[start:start + 1000])
+            self.assertEqual(accumulator.median(), compute_median(data), path)
+            self.assertEqual(accumulator.mode(), compute_mode(data), path)
+
+    def test_merged_shards_match_whole_file(self):
+        """Test that merging per-shard accumulators equals processing all the data."""
+        data = [num for path in TEST_CASES[:5] for num in self.test_data[path]]
+        combined = StatisticsAccumulator()
+        for start in range(0, len(data), 997):
+            shard = StatisticsAccumulator()
+            shard.update(data[start:start + 997])
+            combined.merge(shard)
+        self.assertEqual(combined.count, len(data))
+        self.assertEqual(combined.mean(), compute_mean(data))
+        self.assertEqual(combined.median(), compute_median(data))
+        self.assertEqual(combined.mode(), compute_mode(data))
+        self.assertAlmostEqual(combined.variance(), compute_variance(data, compute_mean(data)))
+
+
+class TestAccumulator(unittest.TestCase):
+    """Unit tests for the table and pending values of the streaming accumulator."""
+
+    def check_against_lists(self, data: list, fold_size: int, chunk_size: int):
+        """Asserts that an accumulator fed in chunks agrees with the list functions."""
+        accumulator = StatisticsAccumulator()
+        accumulator.fold_size = fold_size
+        for start in range(0, len(data), chunk_size):
+            accumulator.update(data[start:start + chunk_size])
+        mean, median, mode, variance = accumulator.statistics()
+        self.assertEqual(mean, compute_mean(data))
+        self.assertEqual(median, compute_median(data))
+        self.assertEqual(mode, compute_mode(data))
+        self.assertAlmostEqual(variance, compute_variance(data, mean), delta=1e-9 * variance)
+
+    def test_distinct_and_repeated_values(self):
+        """Test data with distinct values, repeated values, and both, folded at any size."""
+        rng = random.Random(2)
+        distinct = [rng.uniform(-1e6, 1e6) for _ in range(3000)]
+        repeated = [float(rng.randint(0, 40)) for _ in range(3000)]
+        for data in (distinct, repeated, distinct + repeated, repeated + distinct):
+            for fold_size in (1, 100, 1 << 20):
+                for chunk_size in (7, 1000):
+                    self.check_against_lists(data, fold_size, chunk_size)
+
+    def test_tied_mode(self):
+        """Test that a tie goes to the first value to reach the highest count."""
+        for data in ([3.0, 1.0, 1.0, 3.0, 2.0, 2.0], [5.0, 4.0, 4.0, 5.0],
+                     [9.0, 8.0, 9.0, 8.0, 7.0, 7.0, 9.0, 8.0]):
+            for fold_size in (1, 2, 4, 1 << 20):
+                self.check_against_lists(data, fold_size, 2)
+
+    def test_merge_tables(self):
+        """Test that merged tables add the counts and keep the later last positions."""
+        earlier = (array('d', [1.0, 3.0, 5.0, 7.0]), array('q', [2, 1, 1, 3]),
+                   array('q', [4, 0, 1, 6]))
+        later = (array('d', [0.0, 3.0, 7.0]), array('q', [1, 2, 1]), array('q', [9, 8, 7]))
+        expected = ([0.0, 1.0, 3.0, 5.0, 7.0], [1, 2, 3, 1, 4], [9, 4, 8, 1, 7])
+        merged = _merge_tables(earlier, later)
+        self.assertEqual(tuple(map(list, merged)), expected)
+        small_earlier = tuple(table[1:3] for table in earlier)
+        merged = _merge_tables(small_earlier, later)
+        self.assertEqual(tuple(map(list, merged)),
+                         ([0.0, 3.0, 5.0, 7.0], [1, 3, 1, 1], [9, 8, 1, 7]))
+
+    def test_empty(self):
+        """Test that an accumulator without numbers has no statistics."""
+        accumulator = StatisticsAccumulator()
+        accumulator.update([])
+        self.assertIsNone(accumulator.statistics())
+
+
+class TestFiles(BaseTest):
+    """Unit tests for the statistics of many files, reduced in a process pool."""
+
+    def test_workers_match_lists(self):
+        """Test that any number of workers gives the statistics of the concatenated files."""
+        data = [num for path in TEST_CASES[:5] for num in self.test_data[path]]
+        mean = compute_mean(data)
+        for workers in (1, 2, 3):
+            statistics, file_statistics = compute_files(TEST_CASES[:5], workers, per_file=True)
+            self.assertEqual(statistics[:3], (mean, compute_median(data), compute_mode(data)))
+            self.assertAlmostEqual(statistics[3], compute_variance(data, mean))
+            for path, partial in zip(TEST_CASES[:5], file_statistics):
+                self.assertEqual(partial[1:3], (compute_median(self.test_data[path]),
+                                                compute_mode(self.test_data[path])))
+
+    def test_mode_tied_across_files(self):
+        """Test that a tie goes to the first value to reach the highest count in any file."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        file_paths = []
+        for index, content in enumerate(("5 1 2\n", "2 9\n", "1 5 7\n")):
+            file_paths.append(os.path.join(directory, f"part{index}.txt"))
+            with open(file_paths[-1], "w", encoding="utf-8") as file:
+                file.write(content)
+        for workers in (1, 2, 3):
+            statistics, _ = compute_files(file_paths, workers)
+            self.assertEqual(statistics[2], 2.0)
+
+
+class TestStdDev(unittest.TestCase):
+    """Unit tests for the square root behind the standard deviation."""
+
+    def test_correctly_rounded(self):
+        """Test the root against math.sqrt from tiny to huge variances."""
+        for exponent in range(-300, 301, 7):
+            for mantissa in (1.0, 2.0, 3.7, 9.99):
+                variance = mantissa * 10.0 ** exponent
+                self.assertEqual(compute_std_dev(variance), math.sqrt(variance))
+
+    def test_exact_mode(self):
+        """Test that the Decimal mode returns more digits than a float holds."""
+        self.assertEqual(str(compute_std_dev(2.0, exact=True))[:22], "1.41421356237309504880")
+
+    def test_negative_variance(self):
+        """Test that a negative variance is rejected."""
+        with self.assertRaises(ValueError):
+            compute_std_dev(-1.0)
+
+
+class TestIncremental(unittest.TestCase):
+    """Unit tests for incremental statistics with a saved state."""
+
+    def setUp(self):
+        """Creates a temporary directory for the growing file and its state."""
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "growing.txt")
+        self.state_path = self.file_path + ".state"
+
+    def tearDown(self):
+        """Removes the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_appended_file_matches_full_run(self):
+        """Test that reading only the appended lines gives the full-run statistics."""
+        with open(TEST_CASES[3], "rb") as file:
+            lines = file.readlines()
+        for end in (1000, 5000, len(lines)):
+            with open(self.file_path, "wb") as file:
+                file.writelines(lines[:end])
+            incremental = compute_incremental(self.file_path, self.state_path)
+            self.assertEqual(incremental.statistics(),
+                             accumulate_file(self.file_path).statistics())
+
+    def test_variance_does_not_depend_on_growth(self):
+        """Test that TC7 grown in three steps gives the in-memory and exact variance."""
+        with open(TEST_CASES[6], "rb") as file:
+            lines = file.readlines()
+        for end in (4000, 9000, len(lines)):
+            with open(self.file_path, "wb") as file:
+                file.writelines(lines[:end])
+            incremental = compute_incremental(self.file_path, self.state_path)
+        data = read_numbers(self.file_path)
+        expected = compute_statistics(data)
+        self.assertEqual(incremental.statistics(), expected)
+        mean = Fraction(expected[0])
+        exact = sum((Fraction(num) - mean) ** 2 for num in data) / len(data)
+        self.assertEqual(expected[3], float(exact))
+
+    def test_replaced_file_is_read_again(self):
+        """Test that a state saved for different content is not reused."""
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write("1 2 3\n")
+        compute_incremental(self.file_path, self.state_path)
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write("7 8 9\n10\n")
+        self.assertEqual(compute_incremental(self.file_path, self.state_path).count, 4)
+
+    def test_median_moves_with_appends(self):
+        """Test the saved median cursor when appended values move the median far."""
+        rng = random.Random(3)
+        for step, (low, high) in enumerate(((0, 100), (1000, 2000), (-500, -400), (50, 60))):
+            with open(self.file_path, "a" if step else "w", encoding="utf-8") as file:
+                file.write("\n".join(repr(rng.uniform(low, high)) for _ in range(300)) + "\n")
+            data = read_numbers(self.file_path)
+            statistics = compute_incremental(self.file_path, self.state_path).statistics()
+            self.assertEqual(statistics, compute_statistics(data))
+
+
+class TestWindowedStatistics(BaseTest):
+    """Unit tests for rolling statistics over sliding windows."""
+
+    def assert_window(self, windowed, window):
+        """Checks the rolling statistics against the compute functions of the window."""
+        mean, median, mode, variance = windowed.statistics()
+        self.assertAlmostEqual(mean, compute_mean(window), places=6)
+        self.assertEqual(median, compute_median(window))
+        self.assertEqual(mode, compute_mode(window))
+        self.assertAlmostEqual(variance, compute_variance(window, compute_mean(window)),
+                               places=4)
+
+    def test_count_window(self):
+        """Test a window of the last N values against recomputing it from scratch."""
+        data = self.test_data[TEST_CASES[1]]
+        windowed = WindowedStatistics(size=200)
+        for position, num in enumerate(data):
+            windowed.add(num)
+            if position % 37 == 0:
+                self.assert_window(windowed, data[max(0, position - 199):position + 1])
+
+    def test_time_window(self):
+        """Test a window of the last T seconds with explicit timestamps."""
+        data = self.test_data[TEST_CASES[0]]
+        windowed = WindowedStatistics(seconds=30)
+        for position, num in enumerate(data):
+            windowed.add(num, timestamp=position * 0.5)
+            if position % 23 == 0:
+                self.assert_window(windowed, data[max(0, position - 59):position + 1])
+
+    def test_invalid_window(self):
+        """Test that a window needs a positive size or duration."""
+        with self.assertRaises(ValueError):
+            WindowedStatistics()
+        with self.assertRaises(ValueError):
+            WindowedStatistics(size=0)
+
+
+class TestQuantileSketch(BaseTest):
+    """Unit tests for the approximate quantile sketch."""
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def test_error_bound(self):
+        """Test that sketch quantiles stay within the documented rank error."""
+        for path, data in self.test_data.items():
+            expected = sorted(data)
+            for seed in range(5):
+                sketch = KLLSketch(200, seed)
+                sketch.update(data)
+                for q in self.QUANTILES:
+                    error = exact_rank_error(expected, sketch.quantile(q), q)
+                    self.assertLessEqual(error, sketch.rank_error(), path)
+
+    def test_merge_error_bound(self):
+        """Test that merging sketches of two halves keeps the rank error bound."""
+        for path, data in self.test_data.items():
+            expected = sorted(data)
+            half = len(data) // 2
+            first, second = KLLSketch(200, 1), KLLSketch(200, 2)
+            first.update(data[:half])
+            second.update(data[half:])
+            first.merge(second)
+            self.assertEqual(first.count, len(data))
+            for q in self.QUANTILES:
+                error = exact_rank_error(expected, first.quantile(q), q)
+                self.assertLessEqual(error, first.rank_error(), path)
+
+    def test_serialization_round_trip(self):
+        """Test that a sketch rebuilt from to_dict answers the same quantiles."""
+        sketch = KLLSketch(100, 0)
+        sketch.update(self.test_data[TEST_CASES[2]])
+        restored = KLLSketch.from_dict(sketch.to_dict())
+        for q in (0, *self.QUANTILES, 1):
+            self.assertEqual(restored.quantile(q), sketch.quantile(q))
+
+    def test_empty_sketch(self):
+        """Test that an empty sketch refuses to answer quantiles."""
+        with self.assertRaises(ValueError):
+            KLLSketch().quantile(0.5)
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "NumPy is not installed")
+class TestNumpyBackend(BaseTest):
+    """Unit tests that compare the NumPy backend with the pure-Python reference."""
+
+    def test_same_statistics(self):
+        """Test that both backends report the same statistics on every test case."""
+        backend = load_backend("numpy")
+        for path, data in self.test_data.items():
+            expected = compute_statistics(data)
+            statistics = compute_statistics(data, backend)
+            self.assertEqual(statistics, expected, path)
+            self.assertEqual(format_results(*statistics, 0), format_results(*expected, 0))
+
+    def test_same_std_dev(self):
+        """Test that both backends agree on the standard deviation."""
+        backend = load_backend("numpy")
+        for data in self.test_data.values():
+            variance = compute_variance(data, compute_mean(data))
+            self.assertEqual(backend.compute_std_dev(variance), compute_std_dev(variance))
+
+    def test_small_inputs(self):
+        """Test the edge cases of empty, single-value and all-distinct data."""
+        backend = load_backend("numpy")
+        for data in ([], [4.0], [3.0, 1.0, 2.0], [2.0, 1.0, 1.0, 2.0, 3.0]):
+            self.assertEqual(backend.compute_mean(data), compute_mean(data))
+            self.assertEqual(backend.compute_median(data), compute_median(data))
+            if data:
+                self.assertEqual(backend.compute_mode(data), compute_mode(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
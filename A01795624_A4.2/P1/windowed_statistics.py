@@ -0,0 +1,203 @@
+"""
+Windowed Statistics Module
+
+This module keeps the mean, median, mode and variance of the last N values, or of the values
+received in the last T seconds, of a stream. Each new value updates the statistics instead
+of recomputing them: the moments in O(1), the median in O(log n) with two heaps, and the
+mode in O(1) with values grouped by their count. The results follow the semantics of the
+compute_* functions of computeStatistics.py applied to the values inside the window.
+"""
+
+import heapq
+import time
+from collections import deque
+
+
+class SlidingMedian:
+    """Median of a multiset that supports removals, kept in two lazily pruned heaps."""
+
+    def __init__(self):
+        self.low = []  # Max-heap (negated values) with the smaller half.
+        self.high = []  # Min-heap with the larger half.
+        self.low_size = 0
+        self.high_size = 0
+        self.delayed = {}
+
+    def _prune(self, heap, sign):
+        """Pops values from the top of a heap that were removed earlier."""
+        while heap:
+            num = sign * heap[0]
+            pending = self.delayed.get(num, 0)
+            if pending == 0:
+                break
+            if pending == 1:
+                del self.delayed[num]
+            else:
+                self.delayed[num] = pending - 1
+            heapq.heappop(heap)
+
+    def _balance(self):
+        """Keeps the smaller half equal to, or one value larger than, the larger half."""
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self._prune(self.low, -1)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+            self._prune(self.high, 1)
+
+    def add(self, num):
+        """Adds a value."""
+        if not self.low or num <= -self.low[0]:
+            heapq.heappush(self.low, -num)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, num)
+            self.high_size += 1
+        self._balance()
+
+    def remove(self, num):
+        """Removes a value that was added before; it leaves the heaps lazily."""
+        self.delayed[num] = self.delayed.get(num, 0) + 1
+        if num <= -self.low[0]:
+            self.low_size -= 1
+            if num == -self.low[0]:
+                self._prune(self.low, -1)
+        else:
+            self.high_size -= 1
+            if num == self.high[0]:
+                self._prune(self.high, 1)
+        self._balance()
+
+    def median(self):
+        """Returns the median, averaging the two middle values for even sizes."""
+        if self.low_size == 0:
+            return 0
+        if self.low_size > self.high_size:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+
+class SlidingMode:
+    """Mode of a sliding window, with values grouped by how many times they occur."""
+
+    def __init__(self):
+        self.counts = {}
+        self.buckets = {}  # count -> {value: None}, an ordered set of values.
+        self.last_seen = {}
+        self.max_count = 0
+
+    def _move(self, num, old_count, new_count):
+        """Moves a value from one count bucket to another."""
+        if old_count:
+            bucket = self.buckets[old_count]
+            del bucket[num]
+            if not bucket:
+                del self.buckets[old_count]
+        if new_count:
+            self.buckets.setdefault(new_count, {})[num] = None
+            self.counts[num] = new_count
+        else:
+            del self.counts[num]
+            del self.last_seen[num]
+
+    def add(self, num, position: int):
+        """Adds a value seen at the given position of the stream."""
+        count = self.counts.get(num, 0)
+        self._move(num, count, count + 1)
+        self.last_seen[num] = position
+        if count + 1 > self.max_count:
+            self.max_count = count + 1
+
+    def remove(self, num):
+        """Removes the oldest occurrence of a value."""
+        count = self.counts[num]
+        self._move(num, count, count - 1)
+        if count == self.max_count and count not in self.buckets:
+            self.max_count -= 1
+
+    def mode(self):
+        """Returns the mode, or "N/A" when no value repeats in the window."""
+        if self.max_count <= 1:
+            return "N/A"
+        # Like compute_mode, the winner is the first value to reach the highest
+        # count, which is the tied value whose last occurrence comes first.
+        bucket = self.buckets[self.max_count]
+        return min(bucket, key=self.last_seen.__getitem__)
+
+
+class WindowedStatistics:
+    """
+    Statistics over the last size values, or over the values of the last seconds.
+
+    Args:
+        size (int, optional): Number of values in the window.
+        seconds (float, optional): Age in seconds of the oldest value in the window.
+    """
+
+    def __init__(self, size: int = None, seconds: float = None):
+        if size is None and seconds is None:
+            raise ValueError("A window needs a size or a duration.")
+        if (size is not None and size < 1) or (seconds is not None and seconds <= 0):
+            raise ValueError("The window size and duration must be positive.")
+        self.size = size
+        self.seconds = seconds
+        self.window = deque()
+        self.position = 0
+        self.running_mean = 0.0
+        self.m2 = 0.0
+        self.sliding_median = SlidingMedian()
+        self.sliding_mode = SlidingMode()
+
+    def _evict(self):
+        """Removes the oldest value of the window."""
+        _, num = self.window.popleft()
+        count = len(self.window)
+        if count == 0:
+            self.running_mean = self.m2 = 0.0
+        else:
+            delta = num - self.running_mean
+            self.running_mean -= delta / count
+            self.m2 -= delta * (num - self.running_mean)
+        self.sliding_median.remove(num)
+        self.sliding_mode.remove(num)
+
+    def add(self, num, timestamp: float = None):
+        """
+        Adds a value to the window and drops the values that fall out of it.
+
+        Args:
+            num (float): The new value.
+            timestamp (float, optional): When the value arrived; defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self.seconds is not None:
+            self.expire(timestamp)
+        self.window.append((timestamp, num))
+        count = len(self.window)
+        delta = num - self.running_mean
+        self.running_mean += delta / count
+        self.m2 += delta * (num - self.running_mean)
+        self.sliding_median.add(num)
+        self.sliding_mode.add(num, self.position)
+        self.position += 1
+        if self.size is not None and count > self.size:
+            self._evict()
+
+    def expire(self, now: float):
+        """Drops the values older than the window duration."""
+        while self.window and self.window[0][0] <= now - self.seconds:
+            self._evict()
+
+    def statistics(self):
+        """Returns mean, median, mode and variance of the window, or None if it is empty."""
+        count = len(self.window)
+        if count == 0:
+            return None
+        variance = max(self.m2, 0.0) / count if count >= 2 else 0
+        return (self.running_mean, self.sliding_median.median(), self.sliding_mode.mode(),
+                variance)
@@ -0,0 +1,208 @@
+"""
+Benchmark Script
+
+This Python script measures how the conversions of convertNumbers.py scale with the
+size of the numbers, using randomly generated data.
+
+Usage:
+    python benchmark.py scaling [max_bits]
+    python benchmark.py width [count]
+    python benchmark.py codec [line_count]
+    python benchmark.py workers [line_count]
+    python benchmark.py decode [count]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+from convertNumbers import (  # pylint: disable=import-error
+    WIDTHS, from_base, process_file, to_base, to_binary, to_binary_and_hexadecimal,
+    to_hexadecimal, to_twos_complement
+)
+from reference import to_base_reference  # pylint: disable=import-error
+
+
+def time_conversion(convert, num: int, base: int):
+    """Repeats a conversion for at least a tenth of a second and returns seconds per call."""
+    repeats = 0
+    start_time = time.perf_counter()
+    while True:
+        digits = convert(num, base)
+        repeats += 1
+        elapsed_time = time.perf_counter() - start_time
+        if elapsed_time >= 0.1:
+            return digits, elapsed_time / repeats
+
+
+def bench_scaling(max_bits: int = 100_000):
+    """
+    Compares to_base with the reference loop on numbers from 8 bits to max_bits,
+    in bases 2, 10 and 16.
+
+    Args:
+        max_bits (int): Size in bits of the largest number.
+    """
+    rng = random.Random(42)
+    sizes = [8, 64, 512, 4096, 32_768, max_bits]
+    print(f"{'Bits':>8} {'Base':>5} {'Reference s':>12} {'Engine s':>12} {'Speedup':>8}")
+    for bits in sorted(set(size for size in sizes if size <= max_bits)):
+        num = rng.getrandbits(bits) | 1 << (bits - 1)
+        for base in (2, 10, 16):
+            digits, engine_time = time_conversion(to_base, num, base)
+            expected, reference_time = time_conversion(to_base_reference, num, base)
+            if digits != expected:
+                print(f"Error: wrong digits for {bits} bits in base {base}.")
+            print(f"{bits:>8} {base:>5} {reference_time:>12.6f} {engine_time:>12.6f} "
+                  f"{reference_time / engine_time:>8.2f}")
+
+
+def bench_width(count: int = 1_000_000):
+    """
+    Compares the batched two's-complement conversion with converting the masked
+    numbers one at a time with to_base, for every supported width.
+
+    Args:
+        count (int): Number of random signed integers per width.
+    """
+    rng = random.Random(42)
+    print(f"{'Width':>6} {'Per number s':>13} {'Batched s':>10} {'Speedup':>8}")
+    for width in WIDTHS:
+        numbers = [rng.randrange(-(1 << (width - 1)), 1 << (width - 1)) for _ in range(count)]
+        mask = (1 << width) - 1
+        start_time = time.perf_counter()
+        expected = [
+            (to_base(num & mask, 2).rjust(width, "0"),
+             to_base(num & mask, 16).rjust(width // 4, "0"))
+            for num in numbers
+        ]
+        single_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        conversions = to_twos_complement(numbers, width)
+        batched_time = time.perf_counter() - start_time
+        if conversions != expected:
+            print(f"Error: wrong conversions for width {width}.")
+        print(f"{width:>6} {single_time:>13.4f} {batched_time:>10.4f} "
+              f"{single_time / batched_time:>8.2f}")
+
+
+def bench_codec(line_count: int = 10_000_000):
+    """
+    Compares the byte-table codec with to_binary and to_hexadecimal on a generated
+    file of 32-bit counters, one per line.
+
+    Args:
+        line_count (int): Number of lines in the generated file.
+    """
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "counters.txt")
+        with open(file_path, "w", encoding="utf-8") as file:
+            for start in range(0, line_count, 100_000):
+                file.write("".join(f"{rng.getrandbits(32)}\n"
+                                   for _ in range(min(100_000, line_count - start))))
+        with open(file_path, "r", encoding="utf-8") as file:
+            numbers = array("Q", map(int, file))
+
+    start_time = time.perf_counter()
+    separate = [(to_binary(num), to_hexadecimal(num)) for num in numbers[:100_000]]
+    for num in numbers[100_000:]:
+        to_binary(num)
+        to_hexadecimal(num)
+    separate_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    shared = list(map(to_binary_and_hexadecimal, numbers[:100_000]))
+    for _ in map(to_binary_and_hexadecimal, numbers[100_000:]):
+        pass
+    codec_time = time.perf_counter() - start_time
+    if shared != separate:
+        print("Error: the codec and the separate conversions disagree.")
+    print(f"{'Converter':>10} {'Seconds':>10} {'Lines/s':>12}")
+    for name, elapsed_time in (("Separate", separate_time), ("Codec", codec_time)):
+        print(f"{name:>10} {elapsed_time:>10.2f} {line_count / elapsed_time:>12.0f}")
+    print(f"Speedup: {separate_time / codec_time:.2f}")
+
+
+def bench_workers(line_count: int = 5_000_000):
+    """
+    Times process_file on a generated file of 32-bit counters with a growing number
+    of workers, and checks that every run writes the same results file.
+
+    Args:
+        line_count (int): Number of lines in the generated file.
+    """
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "counters.txt")
+        with open(file_path, "w", encoding="utf-8") as file:
+            for start in range(0, line_count, 100_000):
+                file.write("".join(f"{rng.getrandbits(32)}\n"
+                                   for _ in range(min(100_000, line_count - start))))
+        results_path = os.path.join(directory, "ConvertionResults.txt")
+        working_directory = os.getcwd()
+        os.chdir(directory)
+        try:
+            print(f"{'Workers':>8} {'Seconds':>10} {'Speedup':>8}")
+            baseline = expected = None
+            workers = 1
+            while workers <= (os.cpu_count() or 1):
+                start_time = time.perf_counter()
+                process_file(file_path, echo=False, workers=workers)
+                elapsed_time = time.perf_counter() - start_time
+                with open(results_path, "rb") as results_file:
+                    results = results_file.read()
+                baseline = baseline or elapsed_time
+                expected = expected or results
+                if results != expected:
+                    print(f"Error: different results with {workers} workers.")
+                print(f"{workers:>8} {elapsed_time:>10.4f} {baseline / elapsed_time:>8.2f}")
+                workers *= 2
+        finally:
+            os.chdir(working_directory)
+
+
+def bench_decode(count: int = 1_000_000):
+    """
+    Times the encoder and from_base on the same random 32-bit numbers, with the
+    built-in int(s, base) as a reference for decoding.
+
+    Args:
+        count (int): Number of random numbers.
+    """
+    rng = random.Random(42)
+    numbers = [rng.getrandbits(32) for _ in range(count)]
+    start_time = time.perf_counter()
+    encoded = list(map(to_binary_and_hexadecimal, numbers))
+    timings = [("Encode both", time.perf_counter() - start_time)]
+    for name, decode, index, base in (("from_base 2", from_base, 0, 2),
+                                      ("from_base 16", from_base, 1, 16),
+                                      ("int 2", int, 0, 2),
+                                      ("int 16", int, 1, 16)):
+        start_time = time.perf_counter()
+        decoded = [decode(pair[index], base) for pair in encoded]
+        timings.append((name, time.perf_counter() - start_time))
+        if decoded != numbers:
+            print(f"Error: {name} does not give the numbers back.")
+    print(f"{'Converter':>13} {'Seconds':>10} {'Numbers/s':>12}")
+    for name, elapsed_time in timings:
+        print(f"{name:>13} {elapsed_time:>10.4f} {count / elapsed_time:>12.0f}")
+
+
+BENCHMARKS = {
+    "scaling": bench_scaling,
+    "width": bench_width,
+    "codec": bench_codec,
+    "workers": bench_workers,
+    "decode": bench_decode,
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmark.py <{'|'.join(BENCHMARKS)}> [size]")
+        sys.exit(1)
+
+    BENCHMARKS[sys.argv[1]](*(int(arg) for arg in sys.argv[2:]))
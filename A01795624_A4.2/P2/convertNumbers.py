@@ -3,95 +3,604 @@ Converter Program
 
 This Python code reads a file containing numbers, converts each number to binary and hexadecimal
 using basic algorithms (without built-in functions), and writes the results to a file.
+An extra base from 2 to 36 can be added to each line with --base. With --width, numbers
+are written as fixed-width two's complement, so negative numbers are converted too.
+With --from-base, lines of digits are decoded back to integers, and --verify checks that
+every number survives encoding and decoding.
 Errors are handled gracefully, and the execution time is recorded.
 
 Usage:
-    python convertNumbers.py fileWithData.txt
+    python convertNumbers.py fileWithData.txt [--base B] [--width {8,16,32,64}] [--quiet]
+                             [--workers N] [--from-base B | --verify]
+                             [--metrics metrics.jsonl] [--profile]
 """
 
+import argparse
+import os
+import re
 import sys
-import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial as partial_function
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from instrumentation import (  # pylint: disable=import-error,wrong-import-position
+    WorkerTask, add_worker_metrics, count_records, elapsed_time as run_elapsed_time, phase,
+    start_run
+)
 
-def to_binary(num: int) -> str:
-    """Converts a decimal number to binary using basic division-by-2 method."""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+SPLIT_BITS = 2048  # Above this size, numbers are split before taking digits out.
+
+
+def _leaf_digits(num: int, base: int, width: int = 0) -> list:
+    """Returns the digits of num, most significant first, zero-padded to width digits."""
+    digits = []
+    if base & (base - 1) == 0:  # Powers of two take digits out with masks and shifts.
+        shift = base.bit_length() - 1
+        while num > 0:
+            digits.append(DIGITS[num & (base - 1)])
+            num >>= shift
+    else:
+        while num > 0:
+            num, remainder = divmod(num, base)
+            digits.append(DIGITS[remainder])
+    if len(digits) < width:
+        digits.extend("0" * (width - len(digits)))
+    digits.reverse()
+    return digits
+
+
+def _split_powers(num: int, base: int) -> list:
+    """Returns pairs (base ** width, width), each the square of the previous one."""
+    width = max(1, SPLIT_BITS // base.bit_length())
+    powers = [(base ** width, width)]
+    while True:
+        power, width = powers[-1]
+        square = power * power
+        if square > num:
+            return powers
+        powers.append((square, 2 * width))
+
+
+def _split_digits(num: int, base: int, powers: list, level: int, width: int, digits: list):
+    """Appends the digits of num to digits, splitting it by powers[level] and below."""
+    if level < 0:
+        digits.extend(_leaf_digits(num, base, width))
+        return
+    power, low_width = powers[level]
+    if base & (base - 1) == 0:
+        high = num >> (low_width * (base.bit_length() - 1))
+        low = num & (power - 1)
+    else:
+        high, low = divmod(num, power)
+    if high == 0 and width == 0:
+        _split_digits(low, base, powers, level - 1, 0, digits)
+        return
+    _split_digits(high, base, powers, level - 1, max(0, width - low_width), digits)
+    _split_digits(low, base, powers, level - 1, low_width, digits)
+
+
+def to_base(num: int, base: int) -> str:
+    """
+    Converts a non-negative integer to any base from 2 to 36.
+
+    Digits are collected in a list and joined once. Numbers above SPLIT_BITS
+    bits are first split in halves by powers of the base (divide and conquer),
+    so the expensive divisions work on ever smaller numbers.
+    Negative numbers have no digits in this notation and give an empty string.
+    """
+    if not 2 <= base <= 36:
+        raise ValueError(f"Base {base} is not between 2 and 36.")
     if num == 0:
         return "0"
-    binary = ""
-    while num > 0:
-        binary = str(num % 2) + binary
-        num //= 2
-    return binary
+    if num < 0:
+        return ""
+    if num.bit_length() <= SPLIT_BITS:
+        return "".join(_leaf_digits(num, base))
+    powers = _split_powers(num, base)
+    digits = []
+    _split_digits(num, base, powers, len(powers) - 1, 0, digits)
+    return "".join(digits)
+
+
+def to_binary(num: int) -> str:
+    """Converts a decimal number to binary using the base conversion engine."""
+    return to_base(num, 2)
 
 
 def to_hexadecimal(num: int) -> str:
-    """Converts a decimal number to hexadecimal using basic division-by-16 method."""
-    if num == 0:
-        return "0"
-    hex_digits = "0123456789ABCDEF"
-    hexadecimal = ""
-    while num > 0:
-        remainder = num % 16
-        hexadecimal = hex_digits[remainder] + hexadecimal
-        num //= 16
-    return hexadecimal
+    """Converts a decimal number to hexadecimal using the base conversion engine."""
+    return to_base(num, 16)
+
+
+BYTE_BINARY = tuple("".join(_leaf_digits(byte, 2, 8)) for byte in range(256))
+BYTE_HEX = tuple("".join(_leaf_digits(byte, 16, 2)) for byte in range(256))
+WIDTHS = (8, 16, 32, 64)
+BATCH_SIZE = 1 << 16  # Numbers packed into one buffer by to_twos_complement.
+_UNSIGNED_TYPECODES = {array(code).itemsize * 8: code for code in "QLIHB"}
+
+
+def to_binary_and_hexadecimal(num: int) -> tuple:
+    """
+    Converts a decimal number to binary and hexadecimal in one pass over its bytes.
+
+    The number is turned into big-endian bytes once, and both strings are built
+    from the 256-entry BYTE_BINARY and BYTE_HEX tables, eight bits at a time.
+    The results are the same as to_binary and to_hexadecimal.
+
+    Returns:
+        tuple: The binary and hexadecimal digits.
+    """
+    if num <= 0:
+        return to_binary(num), to_hexadecimal(num)
+    data = num.to_bytes((num.bit_length() + 7) // 8, "big")
+    return ("".join(map(BYTE_BINARY.__getitem__, data)).lstrip("0"),
+            "".join(map(BYTE_HEX.__getitem__, data)).lstrip("0"))
+
+
+def fits_width(num: int, width: int) -> bool:
+    """Checks that a number fits in width bits, either as signed or as unsigned."""
+    return -(1 << (width - 1)) <= num < 1 << width
 
 
-def process_file(file_path: str):
+def to_twos_complement(numbers: list, width: int) -> list:
+    """
+    Converts integers to fixed-width two's-complement binary and hexadecimal.
+
+    Each batch of numbers is packed into one big-endian byte buffer, and every
+    byte is looked up in 256-entry tables instead of being divided bit by bit.
+
+    Args:
+        numbers (list): Integers for which fits_width is true.
+        width (int): Number of bits, one of WIDTHS.
+
+    Returns:
+        list: A (binary, hexadecimal) pair for each number.
+    """
+    mask = (1 << width) - 1
+    hex_width = width // 4
+    conversions = []
+    for start in range(0, len(numbers), BATCH_SIZE):
+        packed = array(_UNSIGNED_TYPECODES[width],
+                       [num & mask for num in numbers[start:start + BATCH_SIZE]])
+        if sys.byteorder == "little":
+            packed.byteswap()
+        data = packed.tobytes()
+        binary = "".join(map(BYTE_BINARY.__getitem__, data))
+        hexadecimal = "".join(map(BYTE_HEX.__getitem__, data))
+        conversions.extend(
+            (binary[index * width:(index + 1) * width],
+             hexadecimal[index * hex_width:(index + 1) * hex_width])
+            for index in range(len(packed)))
+    return conversions
+
+
+INVALID_DIGIT = 0xFF
+DIGIT_VALUES = {}  # base -> bytes.translate table from ASCII digits to their values.
+for _base in range(2, 37):
+    _table = bytearray([INVALID_DIGIT]) * 256
+    for _value, _digit in enumerate(DIGITS[:_base]):
+        _table[ord(_digit)] = _table[ord(_digit.lower())] = _value
+    DIGIT_VALUES[_base] = bytes(_table)
+BASE_PREFIXES = {2: "0B", 8: "0O", 16: "0X"}
+SPLIT_DIGITS = 512  # Longer digit strings are split in halves before being read.
+_lane_masks = {}
+
+
+def _packing_steps(lanes: int, bits: int) -> list:
+    """
+    Returns the (shift, mask) steps that pack lanes of 8 bits holding bits-bit
+    digits into one number, merging neighbouring lanes in pairs at each step.
+    """
+    steps = _lane_masks.get((lanes, bits))
+    if steps is None:
+        steps = _lane_masks[(lanes, bits)] = []
+        lane_bits = 8
+        while lanes > 1:
+            lanes //= 2
+            repeat = ((1 << (2 * lane_bits * lanes)) - 1) // ((1 << (2 * lane_bits)) - 1)
+            steps.append((lane_bits - bits, ((1 << (2 * bits)) - 1) * repeat))
+            lane_bits *= 2
+            bits *= 2
+    return steps
+
+
+def _from_values(values: bytes, base: int) -> int:
+    """Reads digit values in any base, splitting long strings in halves (divide and conquer)."""
+    if len(values) > SPLIT_DIGITS:
+        half = len(values) // 2
+        return (_from_values(values[:-half], base) * base ** half
+                + _from_values(values[-half:], base))
+    number = 0
+    for value in values:
+        number = number * base + value
+    return number
+
+
+def from_base(text: str, base: int) -> int:
+    """
+    Converts digits in any base from 2 to 36 back to an integer.
+
+    Letters may be in either case, and a sign and a 0b, 0o or 0x prefix
+    matching the base are accepted. Every digit is turned into its value by a
+    single bytes.translate call. In bases 2, 4, 8 and 16 the values are then
+    read as one big-endian number with a value per byte, and neighbouring
+    bytes are packed together with shifts and masks, halving their count at
+    each step, instead of multiplying digit by digit.
+
+    Args:
+        text (str): The digits, like '0x1F', '1011' or 'FF'.
+        base (int): The base of the digits.
+
+    Returns:
+        int: The value of the digits.
+
+    Raises:
+        ValueError: If text has no digits or a digit that is not valid in the base.
+    """
+    if not 2 <= base <= 36:
+        raise ValueError(f"Base {base} is not between 2 and 36.")
+    digits = text.strip()
+    negative = digits.startswith("-")
+    if negative or digits.startswith("+"):
+        digits = digits[1:]
+    if base in BASE_PREFIXES and digits[:2].upper() == BASE_PREFIXES[base]:
+        digits = digits[2:]
+    values = digits.encode("ascii", "replace").translate(DIGIT_VALUES[base])
+    if not values or INVALID_DIGIT in values:
+        raise ValueError(f"Invalid base {base} digits in '{text}'.")
+    if base in (2, 4, 8, 16):
+        number = int.from_bytes(values, "big")
+        lanes = 1 << (len(values) - 1).bit_length()
+        for shift, mask in _packing_steps(lanes, base.bit_length() - 1):
+            number = (number | number >> shift) & mask
+    else:
+        number = _from_values(values, base)
+    return -number if negative else number
+
+
+def format_result(number: int, binary: str, hexadecimal: str, base: int = None) -> str:
+    """Formats the conversions of one number as a line of the results."""
+    result = f"{number} -> Binary: {binary}, Hex: {hexadecimal}"
+    if base is not None:
+        result += f", Base {base}: {to_base(number, base)}"
+    return result
+
+
+INVALID_NUMBER = "Error: Invalid number on line {line_num}: '{line}'"
+NUMBER_TOO_WIDE = "Error: Number on line {line_num} does not fit in {width} bits: '{line}'"
+INVALID_DIGITS = "Error: Invalid base {base} number on line {line_num}: '{line}'"
+ROUND_TRIP_FAILED = "Error: Round trip failed on line {line_num}: '{line}'"
+CHUNK_SIZE = 1 << 20  # Bytes of input converted at a time.
+LINE_END = re.compile(rb"\r\n?|\n")  # Line ends of universal newlines.
+
+
+def parse_lines(lines: list, first_line: int = 1, width: int = None,
+                line_numbers: list = None) -> tuple:
+    """
+    Parses one integer per line, collecting the invalid lines as errors.
+
+    Args:
+        lines (list): Lines read from the input file.
+        first_line (int): Line number of the first line.
+        width (int, optional): Also reject numbers that do not fit in this many bits.
+        line_numbers (list, optional): Receives the line number of each integer.
+
+    Returns:
+        tuple: The parsed integers, and a (message, line number, line) tuple for
+            each invalid line, where message is INVALID_NUMBER or NUMBER_TOO_WIDE.
+    """
+    numbers = []
+    errors = []
+    for line_num, line in enumerate(lines, start=first_line):
+        line = line.strip()
+        if not line:
+            continue  # Skip empty lines
+        try:
+            number = int(line)
+        except ValueError:
+            errors.append((INVALID_NUMBER, line_num, line))
+            continue
+        if width and not fits_width(number, width):
+            errors.append((NUMBER_TOO_WIDE, line_num, line))
+            continue
+        numbers.append(number)
+        if line_numbers is not None:
+            line_numbers.append(line_num)
+    return numbers, errors
+
+
+def convert_numbers(numbers: list, base: int = None, width: int = None) -> list:
+    """Converts a list of integers to the lines of the results."""
+    if width:
+        conversions = to_twos_complement(numbers, width)
+    else:
+        conversions = map(to_binary_and_hexadecimal, numbers)
+    return [
+        format_result(number, binary, hexadecimal, base)
+        for number, (binary, hexadecimal) in zip(numbers, conversions)
+    ]
+
+
+def encode_lines(lines: list, base: int = None, width: int = None) -> tuple:
+    """
+    Parses and converts lines of integers.
+
+    Returns:
+        tuple: The errors, the result lines and the number of numbers converted.
+    """
+    with phase("parse"):
+        numbers, errors = parse_lines(lines, 1, width)
+    with phase("compute"):
+        results = convert_numbers(numbers, base, width)
+    return errors, results, len(results)
+
+
+def decode_lines(lines: list, base: int, width: int = None) -> tuple:
+    """
+    Converts lines of digits in a base from 2 to 36 back to integers.
+
+    With a width, the digits are read as two's complement of that many bits.
+
+    Returns:
+        tuple: The errors, the result lines and the number of numbers decoded.
+    """
+    errors = []
+    results = []
+    with phase("compute"):
+        for line_num, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue  # Skip empty lines
+            try:
+                number = from_base(line, base)
+            except ValueError:
+                errors.append((INVALID_DIGITS, line_num, line))
+                continue
+            if width:
+                if not 0 <= number < 1 << width:
+                    errors.append((NUMBER_TOO_WIDE, line_num, line))
+                    continue
+                if number >> (width - 1):
+                    number -= 1 << width
+            results.append(f"{line} -> Decimal: {number}")
+    return errors, results, len(results)
+
+
+def verify_lines(lines: list, width: int = None) -> tuple:
+    """
+    Encodes lines of integers, decodes the binary and hexadecimal digits again,
+    and reports every number that does not come back unchanged as an error.
+
+    Returns:
+        tuple: The errors, an empty list of result lines and the number of
+            numbers checked.
+    """
+    line_numbers = []
+    with phase("parse"):
+        numbers, errors = parse_lines(lines, 1, width, line_numbers)
+    with phase("compute"):
+        if width:
+            conversions = to_twos_complement(numbers, width)
+        else:
+            conversions = map(to_binary_and_hexadecimal, numbers)
+        mask = (1 << width) - 1 if width else -1
+        for line_num, number, (binary, hexadecimal) in zip(line_numbers, numbers, conversions):
+            try:
+                matches = from_base(binary, 2) == from_base(hexadecimal, 16) == number & mask
+            except ValueError:
+                matches = False
+            if not matches:
+                errors.append((ROUND_TRIP_FAILED, line_num,
+                               format_result(number, binary, hexadecimal)))
+    errors.sort(key=lambda error: error[1])
+    return errors, [], len(numbers)
+
+
+def _next_line_end(file, position: int) -> int:
+    """
+    Returns the offset after the first line end at or after position, which
+    is "\n", "\r\n" or a lone "\r", or the size of the file if there is none.
+    """
+    file.seek(position)
+    while True:
+        block = file.read(1 << 16)
+        if not block:
+            return position
+        match = LINE_END.search(block)
+        if match:
+            end = position + match.end()
+            # A "\r" that ends the block may be the first half of "\r\n".
+            if match.group() == b"\r" and match.end() == len(block) and file.read(1) == b"\n":
+                end += 1
+            return end
+        position += len(block)
+
+
+def chunk_ranges(file_path: str, chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Splits a file into byte ranges of about chunk_size bytes that end at line ends.
+
+    Returns:
+        list: (start, end) byte offsets covering the whole file.
+    """
+    ranges = []
+    with open(file_path, "rb") as file:
+        file_size = file.seek(0, os.SEEK_END)
+        start = 0
+        while start < file_size:
+            # Extends the chunk to the end of its last line.
+            end = _next_line_end(file, min(start + chunk_size, file_size) - 1)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def convert_range(file_path: str, start: int, end: int, convert_lines) -> tuple:
+    """
+    Converts the lines between two byte offsets of a file.
+
+    Lines end like in str.splitlines, so files with "\r\n" or "\r" line ends
+    are numbered the same as with "\n". Line numbers start at 1 in every
+    range; the caller shifts them by the lines of the ranges before it.
+
+    Args:
+        file_path (str): The input file.
+        start (int): Offset of the first byte.
+        end (int): Offset after the last byte.
+        convert_lines: encode_lines, decode_lines or verify_lines, with their
+            options bound.
+
+    Returns:
+        tuple: The number of lines, the errors, the result text and the
+            number of numbers converted.
+    """
+    with phase("read"):
+        with open(file_path, "rb") as file:
+            file.seek(start)
+            data = file.read(end - start)
+    with phase("parse"):
+        lines = data.decode("utf-8").splitlines()
+    errors, results, count = convert_lines(lines)
+    with phase("compute"):
+        text = "\n".join(results) + "\n" if results else ""
+    return len(lines), errors, text, count
+
+
+def map_chunks(function, ranges: list, workers: int = 1):
+    """
+    Yields function(start, end) for every range, in order.
+
+    With more than one worker the ranges are converted in a process pool, and
+    at most two per worker are in flight so memory stays bounded. The phase
+    times of the workers are added to the active run.
+    """
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield function(start, end)
+        return
+    task = WorkerTask(function)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(task, start, end))
+            if len(pending) >= 2 * workers:
+                with phase("compute"):
+                    result, metrics = pending.popleft().result()
+                add_worker_metrics(metrics)
+                yield result
+        while pending:
+            with phase("compute"):
+                result, metrics = pending.popleft().result()
+            add_worker_metrics(metrics)
+            yield result
+
+
+def process_file(file_path: str, base: int = None, width: int = None, echo: bool = True,
+                 workers: int = 1, from_base: int = None, verify: bool = False) -> tuple:
     """
     Reads numbers from a file, converts them to binary and hexadecimal,
     and writes the results to 'ConvertionResults.txt'.
     Invalid data is logged as an error and skipped.
+
+    With from_base, the lines are digits in that base and are decoded back to
+    integers instead. With verify, every number is encoded and decoded again,
+    and only the numbers that do not come back unchanged are reported.
+
+    The file is converted one chunk of lines at a time, so memory use does not
+    grow with its size. The chunks can be converted by several processes; they
+    are written back in order, so the output is the same for any worker count.
+
+    Args:
+        file_path (str): File with one integer per line.
+        base (int, optional): Extra base from 2 to 36 added to each result.
+        width (int, optional): Convert to two's complement of this many bits;
+            numbers that do not fit are logged as errors and skipped.
+        echo (bool): Also print the results to the console.
+        workers (int): Number of worker processes.
+        from_base (int, optional): Decode digits in this base from 2 to 36.
+        verify (bool): Check the round trip instead of writing results.
+
+    Returns:
+        tuple: The number of results, or of numbers checked with verify, and
+            the number of errors.
     """
-    results = []
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            for line_num, line in enumerate(file, start=1):
-                line = line.strip()
-                if not line:
-                    continue  # Skip empty lines
-                try:
-                    number = int(line)
-                    binary = to_binary(number)
-                    hexadecimal = to_hexadecimal(number)
-                    results.append(f"{number} -> Binary: {binary}, Hex: {hexadecimal}")
-                except ValueError:
-                    print(f"Error: Invalid number on line {line_num}: '{line}'")
+        ranges = chunk_ranges(file_path)
     except OSError as error:
         print(f"Error reading file: {error}")
-        return []
+        return 0, 0
 
-    # Write results to file
+    if verify:
+        convert_lines = partial_function(verify_lines, width=width)
+    elif from_base:
+        convert_lines = partial_function(decode_lines, base=from_base, width=width)
+    else:
+        convert_lines = partial_function(encode_lines, base=base, width=width)
+    convert = partial_function(convert_range, file_path, convert_lines=convert_lines)
+    count = error_count = 0
+    first_line = 1
     try:
         with open("ConvertionResults.txt", "w", encoding="utf-8") as result_file:
-            for result in results:
-                result_file.write(result + "\n")
+            for line_count, errors, text, result_count in map_chunks(convert, ranges, workers):
+                with phase("write"):
+                    for message, line_num, line in errors:
+                        print(message.format(line_num=first_line + line_num - 1, line=line,
+                                             width=width, base=from_base))
+                    result_file.write(text)
+                    if echo:
+                        sys.stdout.write(text)
+                first_line += line_count
+                count += result_count
+                error_count += len(errors)
+                count_records(result_count)
     except OSError as error:
         print(f"Error writing results: {error}")
-        return []
-
-    return results
+    return count, error_count
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python convertNumbers.py <file_with_data.txt>")
-        sys.exit(1)
-
-    input_file = sys.argv[1]
+    parser = argparse.ArgumentParser(
+        description="Converts the numbers of a file to binary and hexadecimal.")
+    parser.add_argument("input_file", help="file with one integer per line")
+    parser.add_argument("--base", type=int, choices=range(2, 37), metavar="B",
+                        help="also convert every number to base B (2 to 36)")
+    parser.add_argument("--width", type=int, choices=WIDTHS,
+                        help="write fixed-width two's complement, negative numbers included")
+    parser.add_argument("--quiet", action="store_true",
+                        help="do not print the results to the console")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="number of processes converting chunks of the file "
+                             "(default: 1)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--from-base", type=int, choices=range(2, 37), metavar="B",
+                      help="decode lines of digits in base B (2 to 36) back to integers")
+    mode.add_argument("--verify", action="store_true",
+                      help="encode and decode every number and report the mismatches")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append the timings of the run to a JSON lines file")
+    parser.add_argument("--profile", action="store_true",
+                        help="run under cProfile and print the hot spots")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
-    start_time = time.time()
-    output_results = process_file(input_file)
-    elapsed_time = time.time() - start_time
+    start_run("convertNumbers", args.metrics, args.profile)
+    checked, error_total = process_file(args.input_file, args.base, args.width,
+                                        echo=not args.quiet, workers=args.workers,
+                                        from_base=args.from_base, verify=args.verify)
+    elapsed_time = run_elapsed_time()
 
-    if output_results:
-        for output in output_results:
-            print(output)
+    with phase("write"):
+        if args.verify:
+            print(f"Verified {checked} numbers: {error_total} errors.")
+        print(f"\nExecution Time: {elapsed_time:.4f} seconds")
 
-    print(f"\nExecution Time: {elapsed_time:.4f} seconds")
-
-    try:
-        with open("ConvertionResults.txt", "a", encoding="utf-8") as log_result_file:
-            log_result_file.write(f"\nExecution Time: {elapsed_time:.4f} seconds\n")
-    except OSError as error:
-        print(f"Error appending execution time: {error}")
+        try:
+            with open("ConvertionResults.txt", "a", encoding="utf-8") as log_result_file:
+                log_result_file.write(f"\nExecution Time: {elapsed_time:.4f} seconds\n")
+        except OSError as error:
+            print(f"Error appending execution time: {error}")
@@ -0,0 +1,17 @@
+"""
+Reference Module
+
+This module keeps the straightforward conversion that convertNumbers.py used to run, as
+the oracle of the unit tests and the baseline of the benchmarks.
+"""
+
+
+def to_base_reference(num: int, base: int) -> str:
+    """Reference conversion: the string-prepending loop that to_binary used to run."""
+    if num == 0:
+        return "0"
+    digits = ""
+    while num > 0:
+        digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"[num % base] + digits
+        num //= base
+    return digits
@@ -0,0 +1,327 @@
+"""
+Unit tests for the Number Conversion Script.
+
+This module checks the conversions of convertNumbers.py against the
+string-prepending loop they replaced.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from functools import partial as partial_function
+from unittest import mock
+import convertNumbers  # pylint: disable=import-error
+from convertNumbers import (  # pylint: disable=import-error
+    BATCH_SIZE, INVALID_NUMBER, SPLIT_BITS, SPLIT_DIGITS, WIDTHS, chunk_ranges, encode_lines,
+    fits_width, from_base, process_file, to_base, to_binary_and_hexadecimal, to_twos_complement
+)
+from reference import to_base_reference  # pylint: disable=import-error
+
+BASES = range(2, 37)
+TEST_CASES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), f"TC{i}.txt")
+    for i in range(1, 5)
+]
+
+
+def baseline_results(lines: list) -> tuple:
+    """
+    Converts lines the way the original script did, one prepending loop per digit.
+
+    Returns:
+        tuple: The result lines and the error messages it printed.
+    """
+    results = []
+    errors = []
+    for line_num, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            number = int(line)
+        except ValueError:
+            errors.append(f"Error: Invalid number on line {line_num}: '{line}'")
+            continue
+        results.append(f"{number} -> Binary: {to_base_reference(number, 2)}, "
+                       f"Hex: {to_base_reference(number, 16)}")
+    return results, errors
+
+
+class BaseTest(unittest.TestCase):
+    """Base test class that converts every test case file with the original loops once."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Reads the lines and the baseline results of every test case file."""
+        cls.test_lines = {}
+        cls.baseline = {}
+        for path in TEST_CASES:
+            with open(path, "r", encoding="utf-8") as file:
+                cls.test_lines[path] = file.read().splitlines()
+            cls.baseline[path] = baseline_results(cls.test_lines[path])
+
+
+class TestToBase(unittest.TestCase):
+    """Unit tests for the base 2-36 conversion engine."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Lets int() read the digits of the largest numbers in any base."""
+        cls.max_str_digits = getattr(sys, "get_int_max_str_digits", lambda: None)()
+        if cls.max_str_digits is not None:
+            sys.set_int_max_str_digits(0)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restores the digit limit of int()."""
+        if cls.max_str_digits is not None:
+            sys.set_int_max_str_digits(cls.max_str_digits)
+
+    def test_matches_reference(self):
+        """Test small numbers in every base against the prepending loop."""
+        numbers = list(range(300)) + [random.getrandbits(bits) for bits in range(8, 200, 7)]
+        for base in BASES:
+            for num in numbers:
+                self.assertEqual(to_base(num, base), to_base_reference(num, base), (num, base))
+
+    def test_round_trip_sizes(self):
+        """Test numbers below and well above SPLIT_BITS against int()."""
+        for bits in (8, 64, SPLIT_BITS - 1, SPLIT_BITS, SPLIT_BITS * 3 + 5, 100_000):
+            num = random.getrandbits(bits) | 1 << (bits - 1)
+            for base in BASES:
+                digits = to_base(num, base)
+                self.assertNotEqual(digits[0], "0", (bits, base))
+                self.assertEqual(int(digits, base), num, (bits, base))
+
+    def test_powers_of_base(self):
+        """Test the numbers just around a power of the base, where digits are padded."""
+        for base in (2, 3, 10, 16, 36):
+            power = base ** 2000
+            for num in (power - 1, power, power + 1):
+                self.assertEqual(int(to_base(num, base), base), num, base)
+            self.assertEqual(to_base(power, base), "1" + "0" * 2000)
+
+    def test_zero_and_negative(self):
+        """Test that zero gives one digit and negative numbers give none."""
+        for base in BASES:
+            self.assertEqual(to_base(0, base), "0")
+            self.assertEqual(to_base(-1, base), "")
+            self.assertEqual(to_base(-(1 << (SPLIT_BITS * 2)), base), "")
+
+    def test_invalid_base(self):
+        """Test that bases outside 2-36 are rejected."""
+        for base in (0, 1, 37):
+            with self.assertRaises(ValueError):
+                to_base(10, base)
+
+
+class TestTwosComplement(unittest.TestCase):
+    """Unit tests for the fixed-width two's-complement conversion."""
+
+    def test_matches_format(self):
+        """Test every width against format() of the masked number, limits included."""
+        for width in WIDTHS:
+            mask = (1 << width) - 1
+            low, high = -(1 << (width - 1)), mask
+            numbers = [low, low + 1, -1, 0, 1, high - 1, high]
+            numbers += [random.randint(low, high) for _ in range(1000)]
+            expected = [(format(num & mask, f"0{width}b"), format(num & mask, f"0{width // 4}X"))
+                        for num in numbers]
+            self.assertEqual(to_twos_complement(numbers, width), expected, width)
+
+    def test_batches(self):
+        """Test lists longer than one packed batch."""
+        numbers = [random.randint(-128, 255) for _ in range(BATCH_SIZE + 3)]
+        expected = [(format(num & 0xFF, "08b"), format(num & 0xFF, "02X")) for num in numbers]
+        self.assertEqual(to_twos_complement(numbers, 8), expected)
+        self.assertEqual(to_twos_complement([], 8), [])
+
+    def test_fits_width(self):
+        """Test the signed and unsigned limits of every width."""
+        for width in WIDTHS:
+            self.assertTrue(fits_width(-(1 << (width - 1)), width))
+            self.assertTrue(fits_width((1 << width) - 1, width))
+            self.assertFalse(fits_width(-(1 << (width - 1)) - 1, width))
+            self.assertFalse(fits_width(1 << width, width))
+
+
+class TestLookupTables(BaseTest):
+    """Unit tests for the one-pass binary and hexadecimal conversion."""
+
+    def test_matches_reference(self):
+        """Test byte-table conversions against the prepending loops."""
+        numbers = [-(1 << 70), -1, 0, 1, 15, 16, 255, 256, 1 << 64]
+        numbers += [random.getrandbits(bits) for bits in range(1, 600, 3)]
+        for num in numbers:
+            self.assertEqual(to_binary_and_hexadecimal(num),
+                             (to_base_reference(num, 2), to_base_reference(num, 16)), num)
+
+    def test_test_cases(self):
+        """Test that the test case files convert to the baseline results and errors."""
+        for path, (expected, expected_errors) in self.baseline.items():
+            errors, results, count = encode_lines(self.test_lines[path])
+            self.assertEqual(results, expected, path)
+            self.assertEqual(count, len(expected), path)
+            self.assertEqual([message.format(line_num=line_num, line=line)
+                              for message, line_num, line in errors], expected_errors, path)
+            self.assertTrue(all(error[0] == INVALID_NUMBER for error in errors), path)
+
+
+class TestFromBase(unittest.TestCase):
+    """Unit tests for decoding digits in a base from 2 to 36."""
+
+    def test_round_trip(self):
+        """Test from_base(to_base(n, b), b) == n across bases and digit counts."""
+        for base in BASES:
+            numbers = [0, 1, base - 1, base, base ** SPLIT_DIGITS, base ** (SPLIT_DIGITS * 3) + 1]
+            numbers += [random.randrange(base ** digits) for digits in range(1, 70)]
+            for num in numbers:
+                self.assertEqual(from_base(to_base(num, base), base), num, (num, base))
+
+    def test_round_trip_sizes(self):
+        """Test numbers below and well above SPLIT_BITS in the packed and the split bases."""
+        for bits in (SPLIT_BITS - 1, SPLIT_BITS * 3 + 5, 100_000):
+            num = random.getrandbits(bits)
+            for base in (2, 3, 4, 8, 10, 16, 36):
+                self.assertEqual(from_base(to_base(num, base), base), num, (bits, base))
+
+    def test_signs_prefixes_and_case(self):
+        """Test signs, prefixes matching the base and lowercase digits."""
+        self.assertEqual(from_base("-0x1f", 16), -31)
+        self.assertEqual(from_base("+0B101", 2), 5)
+        self.assertEqual(from_base(" 0o17\n", 8), 15)
+        self.assertEqual(from_base("zz", 36), 36 * 36 - 1)
+        self.assertEqual(from_base("0b1", 16), 0xB1)
+
+    def test_invalid_digits(self):
+        """Test that digits outside the base, empty text and bad bases are rejected."""
+        for text, base in (("2", 2), ("19A", 10), ("0x", 16), ("", 10), ("-", 8),
+                           ("1 0", 10), ("ñ", 36), ("0b12", 2)):
+            with self.assertRaises(ValueError, msg=(text, base)):
+                from_base(text, base)
+        for base in (1, 37):
+            with self.assertRaises(ValueError):
+                from_base("1", base)
+
+
+class TestProcessFile(BaseTest):
+    """Unit tests for converting whole files one chunk at a time."""
+
+    def setUp(self):
+        """Runs every test in its own directory, where the results file is written."""
+        self.previous_directory = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        """Goes back to the original directory and removes the results."""
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def convert(self, path, chunk_size=None, **options):
+        """
+        Runs process_file, with chunks of chunk_size bytes if given.
+
+        Returns:
+            tuple: The counts it returned, the results file and the printed lines.
+        """
+        printed = io.StringIO()
+        with contextlib.ExitStack() as stack:
+            if chunk_size is not None:
+                stack.enter_context(mock.patch.object(
+                    convertNumbers, "chunk_ranges",
+                    partial_function(chunk_ranges, chunk_size=chunk_size)))
+            stack.enter_context(contextlib.redirect_stdout(printed))
+            counts = process_file(path, echo=False, **options)
+        with open("ConvertionResults.txt", "r", encoding="utf-8") as result_file:
+            return counts, result_file.read(), printed.getvalue().splitlines()
+
+    def test_matches_baseline(self):
+        """Test the results file and errors of every test case against the baseline."""
+        for path, (expected, expected_errors) in self.baseline.items():
+            for chunk_size in (None, 1, 7, 64):
+                counts, output, printed = self.convert(path, chunk_size)
+                self.assertEqual(output, "".join(line + "\n" for line in expected), path)
+                self.assertEqual(printed, expected_errors, (path, chunk_size))
+                self.assertEqual(counts, (len(expected), len(expected_errors)), path)
+
+    def test_workers_match_serial(self):
+        """Test that converting chunks in a process pool gives the serial output."""
+        for options in ({}, {"width": 8}, {"base": 7}):
+            for path in TEST_CASES:
+                serial = self.convert(path, 64, **options)
+                for workers in (2, 3):
+                    self.assertEqual(self.convert(path, 64, workers=workers, **options), serial,
+                                     (path, workers, options))
+
+    def test_decode(self):
+        """Test that digits written by to_base decode back to their numbers."""
+        numbers = [0, 1, 35, 1 << 64] + [random.getrandbits(bits) for bits in range(1, 300, 7)]
+        for base in (2, 10, 16, 36):
+            lines = [to_base(num, base) for num in numbers] + ["", "not digits"]
+            with open("digits.txt", "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            counts, output, printed = self.convert("digits.txt", 16, from_base=base)
+            self.assertEqual(output.splitlines(), [
+                f"{digits} -> Decimal: {num}" for digits, num in zip(lines, numbers)])
+            self.assertEqual(printed, [
+                f"Error: Invalid base {base} number on line {len(lines)}: 'not digits'"])
+            self.assertEqual(counts, (len(numbers), 1))
+
+    def test_verify(self):
+        """
+        Test that every number of the test cases survives the round trip with a
+        width, and that only the negative ones, which have no digits, fail without.
+        """
+        for path, (expected, expected_errors) in self.baseline.items():
+            counts, output, printed = self.convert(path, 64, verify=True, width=64)
+            self.assertEqual(output, "")
+            self.assertEqual(printed, expected_errors, path)
+            self.assertEqual(counts, (len(expected), len(expected_errors)), path)
+            _, _, printed = self.convert(path, 64, verify=True)
+            failed = [line for line in printed if "Round trip failed" in line]
+            self.assertEqual(len(failed), sum(line.startswith("-") for line in expected), path)
+            self.assertEqual(len(printed) - len(failed), len(expected_errors), path)
+
+    def test_line_ends(self):
+        """Test that "\r\n" and lone "\r" line ends number the lines like "\n"."""
+        for line_end in ("\r", "\r\n", "\n"):
+            with open("line_ends.txt", "wb") as file:
+                file.write(line_end.join(["5", "6", "x", "8"]).encode())
+            for chunk_size in (None, 1, 3):
+                for workers in (1, 2):
+                    counts, output, printed = self.convert("line_ends.txt", chunk_size,
+                                                           workers=workers)
+                    self.assertEqual(counts, (3, 1), (line_end, chunk_size))
+                    self.assertEqual(len(output.splitlines()), 3)
+                    self.assertEqual(printed, ["Error: Invalid number on line 3: 'x'"])
+
+    def test_chunks_end_at_lines(self):
+        """Test that chunk ranges cover the file and end at line ends."""
+        mixed = "mixed.txt"
+        with open(mixed, "wb") as file:
+            file.write(b"1\r\n2\r3\n\r\n4\r\r5" + b"\r\n" * 3)
+        for path in TEST_CASES + [mixed]:
+            with open(path, "rb") as file:
+                data = file.read()
+            for chunk_size in (1, 2, 5, 64, len(data) * 2):
+                ranges = chunk_ranges(path, chunk_size)
+                self.assertEqual(b"".join(data[start:end] for start, end in ranges), data)
+                self.assertTrue(all(data[end - 1:end] in (b"\r", b"\n")
+                                    and data[end - 1:end + 1] != b"\r\n"
+                                    for _, end in ranges[:-1]), (path, chunk_size))
+
+    def test_missing_file(self):
+        """Test that a missing input file is reported and nothing is converted."""
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            self.assertEqual(process_file("missing.txt"), (0, 0))
+        self.assertTrue(printed.getvalue().startswith("Error reading file:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Benchmark Script
+
+This Python script measures how the word counting of wordCount.py scales with the
+size of the corpus, using randomly generated text.
+
+Usage:
+    python benchmark.py tokenize [megabytes]
+    python benchmark.py workers [megabytes]
+"""
+
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+from reference import count_words_by_char  # pylint: disable=import-error
+from wordCount import count_files, count_words  # pylint: disable=import-error
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TC5.txt")
+
+
+def generate_corpus(file_path: str, megabytes: int, seed: int = 42):
+    """
+    Writes a text file of about the given size with words of the TC files,
+    mixed case, punctuation and numbers, like real text.
+    """
+    with open(WORDS_FILE, 'r', encoding="utf-8") as file:
+        vocabulary = file.read().split()
+    rng = random.Random(seed)
+    decorated = [word.capitalize() for word in vocabulary] + [word + "," for word in vocabulary]
+    decorated += vocabulary * 4 + ["1999", "--", "don't", "e-mail", "(see", "it.\n"]
+    with open(file_path, 'w', encoding="utf-8") as file:
+        while file.tell() < megabytes * 1_000_000:
+            file.write(" ".join(rng.choices(decorated, k=100_000)) + "\n")
+
+
+def time_counter(counter, file_path: str):
+    """Runs a word counter with its console output discarded; returns counts and seconds."""
+    with open(os.devnull, 'w', encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start_time = time.perf_counter()
+            counts = counter(file_path)
+            elapsed_time = time.perf_counter() - start_time
+    return counts, elapsed_time
+
+
+def bench_tokenize(megabytes: int = 1000):
+    """
+    Compares count_words with the per-character reference on a generated corpus.
+
+    Args:
+        megabytes (int): Approximate size of the corpus.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "corpus.txt")
+        generate_corpus(file_path, megabytes)
+        expected, reference_time = time_counter(count_words_by_char, file_path)
+        counts, elapsed_time = time_counter(count_words, file_path)
+        if counts != expected or list(counts) != list(expected):
+            print("Error: count_words and the reference disagree.")
+        print(f"{'Counter':>10} {'Seconds':>10} {'MB/s':>8}")
+        for name, seconds in (("Reference", reference_time), ("Bulk", elapsed_time)):
+            print(f"{name:>10} {seconds:>10.2f} {megabytes / seconds:>8.1f}")
+        print(f"Speedup: {reference_time / elapsed_time:.2f}")
+
+
+def bench_workers(megabytes: int = 2000):
+    """
+    Times count_files on a generated corpus with a growing number of workers,
+    and checks that every run gives the serial counts in the same order.
+
+    Args:
+        megabytes (int): Approximate size of the corpus.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "corpus.txt")
+        generate_corpus(file_path, megabytes)
+        print(f"{'Workers':>8} {'Seconds':>10} {'MB/s':>8} {'Speedup':>8}")
+        baseline = expected = None
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            counts, elapsed_time = time_counter(
+                lambda path, workers=workers: count_files([path], workers), file_path)
+            baseline = baseline or elapsed_time
+            expected = expected or counts
+            if counts != expected or list(counts) != list(expected):
+                print(f"Error: different counts with {workers} workers.")
+            print(f"{workers:>8} {elapsed_time:>10.2f} {megabytes / elapsed_time:>8.1f} "
+                  f"{baseline / elapsed_time:>8.2f}")
+            workers *= 2
+
+
+BENCHMARKS = {
+    "tokenize": bench_tokenize,
+    "workers": bench_workers,
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmark.py <{'|'.join(BENCHMARKS)}> [size]")
+        sys.exit(1)
+
+    BENCHMARKS[sys.argv[1]](*(int(arg) for arg in sys.argv[2:]))
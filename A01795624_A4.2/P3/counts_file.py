@@ -0,0 +1,223 @@
+"""
+Counts File Module
+
+This module saves word counts in a compact binary file, sorted by word, that can be
+memory-mapped: the count of one word is found with a binary search over the mapped file,
+without loading it, and saved files are merged as sorted streams, without building a
+dictionary of their words.
+
+File layout (little-endian):
+    header   magic, number of words n, total count, and the offsets of the sections
+    words    the words, concatenated in sorted order
+    offsets  n + 1 unsigned 64-bit offsets of the words inside the words section
+    counts   n unsigned 64-bit counts, in the same order
+
+Usage:
+    python counts_file.py lookup counts.bin word [word ...]
+    python counts_file.py dump counts.bin
+    python counts_file.py merge output.bin first.bin second.bin [more.bin ...]
+"""
+
+import heapq
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import groupby
+from operator import itemgetter
+
+MAGIC = b"WCOUNTS1"
+HEADER = struct.Struct("<8sQQQQQ")  # magic, words, total, words, offsets and counts offsets
+BUFFER_SIZE = 1 << 16  # Offsets and counts buffered before being written.
+
+
+def _check_byte_order():
+    """Refuses to map the 64-bit sections on machines that are not little-endian."""
+    if sys.byteorder != "little":
+        raise ValueError("Counts files can only be used on little-endian machines.")
+
+
+class CountsFileWriter:
+    """
+    Writes a counts file from words given in increasing order, one at a time.
+
+    The offsets and counts go through temporary files until the words are
+    known, so memory use does not depend on the number of words.
+    """
+
+    def __init__(self, file_path: str):
+        _check_byte_order()
+        self.file = open(file_path, "wb")  # pylint: disable=consider-using-with
+        self.file.write(bytes(HEADER.size))
+        self.offsets_file = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        self.counts_file = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        self.offsets = array("Q")
+        self.counts = array("Q")
+        self.size = 0
+        self.words = 0
+        self.total = 0
+        self.last_word = None
+
+    def _flush(self):
+        """Moves the buffered offsets and counts to their temporary files."""
+        self.offsets.tofile(self.offsets_file)
+        self.counts.tofile(self.counts_file)
+        self.offsets = array("Q")
+        self.counts = array("Q")
+
+    def add(self, word: bytes, count: int):
+        """Adds a word, which must come after every word added before."""
+        if self.last_word is not None and word <= self.last_word:
+            raise ValueError("Words must be added in increasing order.")
+        self.last_word = word
+        self.file.write(word)
+        self.offsets.append(self.size)
+        self.counts.append(count)
+        self.size += len(word)
+        self.words += 1
+        self.total += count
+        if len(self.counts) >= BUFFER_SIZE:
+            self._flush()
+
+    def close(self):
+        """Appends the offsets and counts after the words and writes the header."""
+        self.offsets.append(self.size)
+        self._flush()
+        self.file.write(bytes(-self.size % 8))  # Aligns the 64-bit sections.
+        offsets_start = self.file.tell()
+        for section in (self.offsets_file, self.counts_file):
+            section.seek(0)
+            shutil.copyfileobj(section, self.file)
+            section.close()
+        counts_start = offsets_start + (self.words + 1) * 8
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.words, self.total, HEADER.size,
+                                    offsets_start, counts_start))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class CountsFile:
+    """A counts file mapped in memory, answering the count of a word without loading it."""
+
+    def __init__(self, file_path: str):
+        _check_byte_order()
+        with open(file_path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            self.map.close()
+            raise ValueError(f"'{file_path}' is not a counts file.")
+        magic, self.words, self.total, words_start, offsets_start, counts_start = \
+            HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"'{file_path}' is not a counts file.")
+        self.words_start = words_start
+        view = memoryview(self.map)
+        self.offsets = view[offsets_start:counts_start].cast("Q")
+        self.counts = view[counts_start:counts_start + self.words * 8].cast("Q")
+        view.release()
+
+    def word(self, index: int) -> bytes:
+        """Returns the word at a position of the sorted order."""
+        start = self.words_start
+        return self.map[start + self.offsets[index]:start + self.offsets[index + 1]]
+
+    def get(self, word: bytes, default: int = 0) -> int:
+        """Returns the count of a word with a binary search, or default if it is missing."""
+        low, high = 0, self.words
+        while low < high:
+            mid = (low + high) // 2
+            if self.word(mid) < word:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.words and self.word(low) == word:
+            return self.counts[low]
+        return default
+
+    def __len__(self):
+        return self.words
+
+    def __iter__(self):
+        """Yields (word, count) pairs in increasing order of word."""
+        for index in range(self.words):
+            yield self.word(index), self.counts[index]
+
+    def close(self):
+        """Releases the views and unmaps the file."""
+        self.offsets.release()
+        self.counts.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def save_counts(file_path: str, word_frequencies: dict):
+    """
+    Saves word counts as a counts file.
+
+    Args:
+        file_path (str): The file to write.
+        word_frequencies (dict): Counts of words, as str or ASCII bytes.
+    """
+    with CountsFileWriter(file_path) as writer:
+        for word, count in sorted(
+                (word if isinstance(word, bytes) else word.encode("ascii"), count)
+                for word, count in word_frequencies.items()):
+            writer.add(word, count)
+
+
+def merge_counts_files(output_path: str, file_paths: list):
+    """
+    Merges counts files into a new one, adding the counts of equal words.
+
+    The files are read as sorted streams and merged k ways, so memory use does
+    not depend on the number of words.
+    """
+    counts_files = [CountsFile(file_path) for file_path in file_paths]
+    try:
+        with CountsFileWriter(output_path) as writer:
+            merged = heapq.merge(*counts_files, key=itemgetter(0))
+            for word, pairs in groupby(merged, key=itemgetter(0)):
+                writer.add(word, sum(count for _, count in pairs))
+    finally:
+        for counts_file in counts_files:
+            counts_file.close()
+
+
+if __name__ == "__main__":
+    COMMANDS = ("lookup", "dump", "merge")
+    if len(sys.argv) < 3 or sys.argv[1] not in COMMANDS:
+        print(f"Usage: python counts_file.py <{'|'.join(COMMANDS)}> file [args ...]")
+        sys.exit(1)
+
+    command, counts_path, *arguments = sys.argv[1:]
+    try:
+        if command == "merge":
+            merge_counts_files(counts_path, arguments)
+        else:
+            with CountsFile(counts_path) as saved_counts:
+                if command == "lookup":
+                    for lookup_word in arguments:
+                        print(f"{lookup_word}: {saved_counts.get(lookup_word.encode('ascii'))}")
+                else:
+                    for saved_word, saved_count in saved_counts:
+                        print(f"{saved_word.decode('ascii')}: {saved_count}")
+                    print(f"\nGrand Total: {saved_counts.total}")
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}")
+        sys.exit(1)
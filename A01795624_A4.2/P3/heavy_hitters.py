@@ -0,0 +1,118 @@
+"""
+Heavy Hitters Module
+
+This module provides a Space-Saving summary (Metwally, Agrawal and El Abbadi), which finds
+the most frequent words of an unbounded stream while keeping a fixed number of counters.
+
+Error bound:
+    With capacity m the summary keeps at most m words. After n words, the estimated
+    count of every kept word overestimates its true count by at most its recorded
+    error, and every error is at most n / m. Every word that occurs more than n / m
+    times is kept. The bound still holds after merging summaries, with n the total
+    number of words of all of them.
+"""
+
+import heapq
+from operator import itemgetter
+
+
+class SpaceSaving:
+    """Approximate word counts over a stream, using at most capacity counters."""
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("The summary needs at least one counter.")
+        self.capacity = capacity
+        self.count = 0
+        self.counts = {}
+        self.errors = {}
+        self.heap = []  # (count, word) entries; outdated ones are dropped lazily.
+
+    def _minimum(self):
+        """Returns the smallest kept count and its word."""
+        heap = self.heap
+        while True:
+            count, word = heap[0]
+            if self.counts.get(word) == count:
+                return count, word
+            heapq.heappop(heap)
+
+    def _rebuild_heap(self):
+        """Rebuilds the heap from the current counts, dropping outdated entries."""
+        self.heap = [(count, word) for word, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def floor(self) -> int:
+        """Returns the most times a word that is not kept may have occurred."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return self._minimum()[0]
+
+    def update(self, word_counts):
+        """
+        Adds words to the summary.
+
+        Args:
+            word_counts (dict): Number of occurrences of each word, such as the
+                Counter of one block of text.
+        """
+        counts = self.counts
+        errors = self.errors
+        heap = self.heap
+        for word, occurrences in word_counts.items():
+            self.count += occurrences
+            if word in counts:
+                counts[word] += occurrences
+            elif len(counts) < self.capacity:
+                counts[word] = occurrences
+                errors[word] = 0
+            else:
+                # The new word takes the place of the word with the smallest count,
+                # inheriting that count as its possible overestimation.
+                minimum, evicted = self._minimum()
+                heapq.heappop(heap)
+                del counts[evicted]
+                del errors[evicted]
+                counts[word] = minimum + occurrences
+                errors[word] = minimum
+            heapq.heappush(heap, (counts[word], word))
+            if len(heap) > 4 * self.capacity:
+                self._rebuild_heap()
+                heap = self.heap
+
+    def merge(self, other: "SpaceSaving"):
+        """
+        Merges another summary into this one.
+
+        A word missing from a full summary may have occurred up to its smallest
+        count, so that count is added to both its estimate and its error.
+        """
+        own_floor, other_floor = self.floor(), other.floor()
+        merged = {}
+        for word in {**self.counts, **other.counts}:
+            merged[word] = (
+                self.counts.get(word, own_floor) + other.counts.get(word, other_floor),
+                self.errors.get(word, own_floor) + other.errors.get(word, other_floor)
+            )
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0])
+        self.counts = {word: count for word, (count, _) in kept}
+        self.errors = {word: error for word, (_, error) in kept}
+        self.count += other.count
+        self._rebuild_heap()
+
+    def error_bound(self) -> float:
+        """Returns the largest possible overestimation of any count, n / capacity."""
+        return self.count / self.capacity
+
+    def top(self, k: int) -> list:
+        """
+        Returns the k words with the highest estimated counts.
+
+        Returns:
+            list: (word, estimated count, error) tuples, highest count first; the
+                true count of each word is between count - error and count.
+        """
+        return [
+            (word, count, self.errors[word])
+            for word, count in heapq.nlargest(k, self.counts.items(), key=itemgetter(1))
+        ]
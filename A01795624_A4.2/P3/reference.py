@@ -0,0 +1,21 @@
+"""
+Reference Module
+
+This module keeps the straightforward word counter that wordCount.py used to run, as the
+oracle of the unit tests and the baseline of the benchmarks.
+"""
+
+
+def count_words_by_char(file_path: str):
+    """Reference counter: the per-character loop that count_words used to run."""
+    word_frequencies = {}
+    with open(file_path, 'r', encoding="utf-8") as file:
+        for line in file:
+            for raw_word in line.split():
+                cleaned_word = ''.join(
+                    char.lower() if 'A' <= char <= 'Z' or 'a' <= char <= 'z' else ''
+                    for char in raw_word
+                )
+                if cleaned_word:
+                    word_frequencies[cleaned_word] = word_frequencies.get(cleaned_word, 0) + 1
+    return word_frequencies
@@ -0,0 +1,238 @@
+"""
+Unit tests for the Word Count Script.
+
+This module checks the top-K word engines and the binary counts files against the
+TC1-TC5 test case files.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from collections import Counter
+from functools import partial as partial_function
+from unittest import mock
+import wordCount  # pylint: disable=import-error
+from counts_file import CountsFile, merge_counts_files, save_counts  # pylint: disable=import-error
+from heavy_hitters import SpaceSaving  # pylint: disable=import-error
+from reference import count_words_by_char  # pylint: disable=import-error
+from wordCount import (  # pylint: disable=import-error
+    chunk_ranges, count_files, count_words, read_blocks, sort_words, summarize_files, tokenize,
+    top_words
+)
+
+TEST_CASES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), f"TC{i}.txt")
+    for i in range(1, 6)
+]
+
+
+class BaseTest(unittest.TestCase):
+    """Base test class that counts the words of every test case file once."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Reads the words and the exact counts of every test case file."""
+        cls.test_words = {}
+        cls.test_counts = {}
+        for path in TEST_CASES:
+            with open(path, "r", encoding="utf-8") as file:
+                cls.test_words[path] = tokenize(file.read())
+            cls.test_counts[path] = {
+                word.encode("ascii"): count for word, count in count_words(path).items()
+            }
+
+
+class TestTokenize(BaseTest):
+    """Unit tests for the bulk tokenizer against the per-character loop it replaced."""
+
+    def setUp(self):
+        """Creates a directory for the text files of one test."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+
+    def test_test_cases(self):
+        """Test the counts and the first-seen order of every test case file."""
+        for path in TEST_CASES:
+            self.assertEqual(list(count_words(path).items()),
+                             list(count_words_by_char(path).items()), path)
+
+    def test_unusual_text(self):
+        """Test punctuation, digits, non-ASCII letters and every kind of whitespace."""
+        text = ("Hello, WORLD! it's 42 -- e-mail café naïve ÀÉ ünï x\ty\x0bz\x0cw\ru\n"
+                "a\x1cb\x1dc\x1ed\x1fe f\x85g h\xa0i j\u2003k l\u2028m 123 ... Hello\n")
+        file_path = os.path.join(self.directory.name, "unusual.txt")
+        with open(file_path, "w", encoding="utf-8", newline="") as file:
+            file.write(text * 3)
+        self.assertEqual(list(count_words(file_path).items()),
+                         list(count_words_by_char(file_path).items()))
+
+    def test_small_blocks(self):
+        """Test that blocks cut at whitespace give the words of the whole text."""
+        for path, words in self.test_words.items():
+            for block_size in (1, 7, 100):
+                with open(path, "r", encoding="utf-8") as file:
+                    blocks = [tokenize(text) for text in read_blocks(file, block_size)]
+                self.assertEqual([word for block in blocks for word in block], words, path)
+
+
+class TestCountFiles(BaseTest):
+    """Unit tests for counting several files in a process pool."""
+
+    def test_workers_match_serial(self):
+        """Test that the counts and their order do not depend on the workers or chunks."""
+        serial = list(count_files(TEST_CASES).items())
+        expected = Counter()
+        for path in TEST_CASES:
+            expected.update(count_words_by_char(path))
+        self.assertEqual(serial, list(expected.items()))
+        for chunk_size in (64, 4096, 1 << 22):
+            with mock.patch.object(wordCount, "chunk_ranges",
+                                   partial_function(chunk_ranges, chunk_size=chunk_size)):
+                for workers in (2, 3):
+                    self.assertEqual(list(count_files(TEST_CASES, workers).items()), serial,
+                                     (chunk_size, workers))
+
+    def test_chunks_end_at_whitespace(self):
+        """Test that chunk ranges cover every file and never split a word."""
+        for path in TEST_CASES:
+            with open(path, "rb") as file:
+                data = file.read()
+            for chunk_size in (1, 64, len(data) * 2):
+                ranges = chunk_ranges(path, chunk_size)
+                self.assertEqual(b"".join(data[start:end] for start, end in ranges), data)
+                self.assertTrue(all(data[end - 1:end].isspace() for _, end in ranges[:-1]))
+
+    def test_missing_file(self):
+        """Test that a missing file is skipped by the workers like by a serial run."""
+        paths = [TEST_CASES[0], "missing.txt"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(count_files(paths, 2), count_files(paths))
+
+
+class TestTopWords(BaseTest):
+    """Unit tests for the exact top-K words."""
+
+    def test_matches_sorted_counts(self):
+        """Test the heap selection against sorting every count."""
+        for path, counts in self.test_counts.items():
+            expected = sorted(counts.items(), key=lambda item: -item[1])
+            for k in (1, 10, 100, len(counts) + 1):
+                self.assertEqual(list(top_words(counts, k).items()), expected[:k], path)
+
+
+class TestSpaceSaving(BaseTest):
+    """Unit tests for the approximate top-K words and their error bound."""
+
+    def summarize(self, words, capacity, block_size=7):
+        """Feeds words to a summary in small blocks, like a stream."""
+        summary = SpaceSaving(capacity)
+        for start in range(0, len(words), block_size):
+            summary.update(Counter(words[start:start + block_size]))
+        return summary
+
+    def assert_bounds(self, summary, counts, path):
+        """Checks the estimates and errors of a summary against the exact counts."""
+        self.assertEqual(summary.count, sum(counts.values()))
+        self.assertLessEqual(len(summary.counts), summary.capacity)
+        for word, count, error in summary.top(summary.capacity):
+            self.assertLessEqual(count - error, counts[word], path)
+            self.assertLessEqual(counts[word], count, path)
+            self.assertLessEqual(error, summary.error_bound(), path)
+        for word, count in counts.items():
+            if count > summary.error_bound():
+                self.assertIn(word, summary.counts, path)
+
+    def test_error_bound(self):
+        """Test that every estimate is within the documented bound."""
+        for path, words in self.test_words.items():
+            for capacity in (10, 50, 200):
+                summary = self.summarize(words, capacity)
+                self.assert_bounds(summary, self.test_counts[path], path)
+
+    def test_merge_error_bound(self):
+        """Test that merging summaries of two halves keeps the error bound."""
+        for path, words in self.test_words.items():
+            half = len(words) // 2
+            first = self.summarize(words[:half], 50)
+            first.merge(self.summarize(words[half:], 50))
+            self.assert_bounds(first, self.test_counts[path], path)
+
+    def test_exact_with_room(self):
+        """Test that a summary with a counter per distinct word is exact."""
+        for path, words in self.test_words.items():
+            counts = self.test_counts[path]
+            summary = self.summarize(words, len(counts))
+            self.assertEqual(summary.counts, counts, path)
+            self.assertFalse(any(summary.errors.values()), path)
+
+    def test_top_words_of_files(self):
+        """Test that the file summary finds the exact top words when it has room."""
+        for path, counts in self.test_counts.items():
+            summary = summarize_files([path], len(counts))
+            expected = top_words(counts, 5)
+            top = {word: count for word, count, _ in summary.top(5)}
+            self.assertEqual(top, expected, path)
+
+    def test_invalid_capacity(self):
+        """Test that a summary needs at least one counter."""
+        with self.assertRaises(ValueError):
+            SpaceSaving(0)
+
+
+class TestCountsFile(BaseTest):
+    """Unit tests for sorting the counts and saving them as counts files."""
+
+    def setUp(self):
+        """Creates a directory for the counts files of one test."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+
+    def save(self, name, counts):
+        """Saves counts in the test directory and returns the path of the file."""
+        file_path = os.path.join(self.directory.name, name)
+        save_counts(file_path, counts)
+        return file_path
+
+    def test_sort_words(self):
+        """Test the count and alphabetical orders of the results."""
+        counts = {"b": 1, "c": 2, "a": 1}
+        self.assertEqual(list(sort_words(counts)), ["b", "c", "a"])
+        self.assertEqual(list(sort_words(counts, "count")), ["c", "a", "b"])
+        self.assertEqual(list(sort_words(counts, "word")), ["a", "b", "c"])
+
+    def test_lookup(self):
+        """Test that every saved word is found with its count, and missing words are not."""
+        for path, counts in self.test_counts.items():
+            with CountsFile(self.save("counts.bin", counts)) as saved:
+                self.assertEqual(len(saved), len(counts), path)
+                self.assertEqual(saved.total, sum(counts.values()), path)
+                self.assertEqual(list(saved), sorted(counts.items()), path)
+                for word, count in counts.items():
+                    self.assertEqual(saved.get(word), count, path)
+                for missing in (b"", b"0", b"zzzzzzzz", b"aa" * 40):
+                    self.assertEqual(saved.get(missing, -1), -1, path)
+
+    def test_merge(self):
+        """Test that merging counts files adds the counts of every word."""
+        paths = [self.save(f"TC{i}.bin", counts)
+                 for i, counts in enumerate(self.test_counts.values())]
+        paths.append(self.save("empty.bin", {}))
+        merged_path = os.path.join(self.directory.name, "merged.bin")
+        merge_counts_files(merged_path, paths)
+        expected = Counter()
+        for counts in self.test_counts.values():
+            expected.update(counts)
+        with CountsFile(merged_path) as merged:
+            self.assertEqual(dict(merged), dict(expected))
+            self.assertEqual(merged.total, sum(expected.values()))
+
+    def test_not_a_counts_file(self):
+        """Test that text files are refused."""
+        with self.assertRaises(ValueError):
+            CountsFile(TEST_CASES[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,55 +2,329 @@
 Word Count Script
 
 This Python script reads a file, counts word occurrences, and saves the results to a file.
+Several files are counted together as one corpus, and large inputs can be split into
+chunks counted by a pool of worker processes. With --top K only the K most frequent
+words are reported; --approximate finds them with a fixed-size Space-Saving summary
+instead of counting every distinct word. The results can be sorted by count or by word,
+shown on the console one page at a time, and saved as a binary counts file that other
+jobs can memory-map (see counts_file.py).
+
+Usage:
+    python wordCount.py fileWithData.txt [more.txt ...] [--workers N]
+                        [--top K [--approximate] [--capacity M]] [--sort {first,count,word}]
+                        [--page P [--page-size S]] [--save-counts counts.bin]
 """
 
+import argparse
+import heapq
+import os
 import sys
-import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial as partial_function
+from itertools import islice
+from operator import itemgetter
+
+from counts_file import save_counts  # pylint: disable=import-error
+from heavy_hitters import SpaceSaving  # pylint: disable=import-error
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from instrumentation import (  # pylint: disable=import-error,wrong-import-position
+    WorkerTask, count_records, elapsed_time, phase, start_run, worker_results
+)
+
+
+LOWER_CASE = b"abcdefghijklmnopqrstuvwxyz"
+UPPER_CASE = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# ASCII bytes that str.split() treats as whitespace, and the other ASCII separators
+# it knows, which bytes.split() does not and are turned into spaces.
+WHITESPACE = b" \t\n\r\x0b\x0c"
+SEPARATORS = b"\x1c\x1d\x1e\x1f"
+FOLD_TABLE = bytes.maketrans(UPPER_CASE + SEPARATORS, LOWER_CASE + b" " * len(SEPARATORS))
+NON_WORD_BYTES = bytes(
+    byte for byte in range(256)
+    if byte not in LOWER_CASE + UPPER_CASE + WHITESPACE + SEPARATORS
+)
+SORT_ORDERS = ("first", "count", "word")
+BLOCK_SIZE = 1 << 20  # Characters of text tokenized at a time.
+CHUNK_SIZE = 1 << 22  # Bytes of a file counted by one worker task.
+
+
+def tokenize(text):
+    """
+    Splits text into words made only of lower case ASCII letters.
+
+    Like splitting on whitespace and then keeping the ASCII letters of every
+    word in lower case, but done in bulk: one bytes.translate call folds the
+    case and deletes every other byte, and bytes.split cuts the words.
+    Non-ASCII text has its whitespace normalized to spaces first, and its
+    other non-ASCII characters are dropped when it is encoded.
+
+    Args:
+        text (str): A block of text.
+
+    Returns:
+        list: The cleaned words, as bytes.
+    """
+    if text.isascii():
+        data = text.encode("ascii")
+    else:
+        data = " ".join(text.split()).encode("ascii", "ignore")
+    return data.translate(FOLD_TABLE, NON_WORD_BYTES).split()
+
+
+def read_blocks(file, block_size=BLOCK_SIZE):
+    """
+    Yields the text of a file in blocks of about block_size characters that end
+    at whitespace, so that no word is split between two blocks.
+    """
+    tail = ""
+    while True:
+        with phase("read"):
+            text = file.read(block_size)
+        if not text:
+            break
+        text = tail + text
+        cut = max(text.rfind(" "), text.rfind("\n"), text.rfind("\t")) + 1
+        if cut == 0 and not text.isspace():
+            tail = text  # No whitespace yet: the block is one unfinished word.
+            continue
+        tail = text[cut:]
+        yield text[:cut]
+    if tail:
+        yield tail
+
 
 def count_words(file_path):
     """
-    Counts occurrences of words in a given text file without using built-in string functions.
+    Counts occurrences of words in a given text file.
+
+    Words are the whitespace-separated tokens of the file, keeping only their
+    ASCII letters in lower case; tokens without letters are ignored.
 
     Args:
         file_path (str): The path to the file to be read.
 
     Returns:
-        dict: A dictionary containing words as keys and their frequencies as values.
+        dict: A dictionary containing words as keys and their frequencies as values,
+            in the order in which the words first appear.
     """
-    word_frequencies = {}
+    word_frequencies = Counter()
 
     try:
         with open(file_path, 'r', encoding="utf-8") as file:
-            for line in file:
-                words = line.split()
-                for raw_word in words:
-                    cleaned_word = ''.join(
-                        char.lower() if 'A' <= char <= 'Z' or 'a' <= char <= 'z' else ''
-                        for char in raw_word
-                    )
-
-                    if cleaned_word:
-                        word_frequencies[cleaned_word] = word_frequencies.get(cleaned_word, 0) + 1
+            for text in read_blocks(file):
+                with phase("parse"):
+                    cleaned_words = tokenize(text)
+                count_records(len(cleaned_words))
+                with phase("compute"):
+                    word_frequencies.update(cleaned_words)
     except OSError as error:
         print(f"Error reading file: {error}")
 
+    return {word.decode("ascii"): count for word, count in word_frequencies.items()}
+
+
+def chunk_ranges(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Splits a file into byte ranges of about chunk_size bytes that end at ASCII
+    whitespace, so that no word is split between two ranges. UTF-8 never uses
+    ASCII bytes inside a multi-byte character, so the cuts are also valid text
+    boundaries.
+
+    Returns:
+        list: (start, end) byte offsets covering the whole file.
+    """
+    ranges = []
+    with open(file_path, 'rb') as file:
+        file_size = file.seek(0, os.SEEK_END)
+        start = 0
+        while start < file_size:
+            end = min(start + chunk_size, file_size)
+            file.seek(end)
+            while end < file_size:
+                block = file.read(1 << 16)
+                cuts = [block.find(space) for space in WHITESPACE]
+                cuts = [cut for cut in cuts if cut >= 0]
+                if cuts:
+                    end += min(cuts) + 1
+                    break
+                end += len(block)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def count_range(file_path, start, end):
+    """
+    Counts the words between two byte offsets of a file.
+
+    Returns:
+        dict: Word frequencies in the order in which the words first appear.
+    """
+    with phase("read"), open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    with phase("parse"):
+        words = tokenize(data.decode("utf-8"))
+    with phase("compute"):
+        word_frequencies = Counter(words)
+        return {word.decode("ascii"): count for word, count in word_frequencies.items()}
+
+
+def count_files(file_paths, workers=1):
+    """
+    Counts the words of several files as one corpus (map-reduce).
+
+    Every file is split into chunks at whitespace; the chunks are counted in a
+    process pool and the partial counts merged back in file order, so the words
+    keep the order in which they first appear, like in a serial run.
+
+    Args:
+        file_paths (list): The paths to the files to be read.
+        workers (int): Number of worker processes; 1 counts the files one by one.
+
+    Returns:
+        dict: A dictionary containing words as keys and their frequencies as values.
+    """
+    if workers <= 1:
+        word_frequencies = Counter()
+        for file_path in file_paths:
+            word_frequencies.update(count_words(file_path))
+        return dict(word_frequencies)
+
+    tasks = _task_ranges(file_paths)
+    word_frequencies = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = worker_results(executor.map(WorkerTask(count_range), *zip(*tasks))) \
+            if tasks else ()
+        with phase("compute"):
+            for partial in partials:
+                word_frequencies.update(partial)
+    count_records(sum(word_frequencies.values()))
+    return dict(word_frequencies)
+
+
+def top_words(word_frequencies, k):
+    """
+    Returns the k most frequent words, keeping the first-seen order among ties.
+
+    Returns:
+        dict: The words and their frequencies, highest first.
+    """
+    return dict(heapq.nlargest(k, word_frequencies.items(), key=itemgetter(1)))
+
+
+def _task_ranges(file_paths):
+    """Returns a (file path, start, end) task for every chunk of the files that can be read."""
+    tasks = []
+    with phase("read"):
+        for file_path in file_paths:
+            try:
+                tasks.extend((file_path, start, end) for start, end in chunk_ranges(file_path))
+            except OSError as error:
+                print(f"Error reading file: {error}")
+    return tasks
+
+
+def summarize_range(file_path, start, end, capacity):
+    """Returns a Space-Saving summary of the words between two byte offsets of a file."""
+    with phase("read"), open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    with phase("parse"):
+        block_counts = Counter(tokenize(data.decode("utf-8")))
+    with phase("compute"):
+        summary = SpaceSaving(capacity)
+        summary.update(block_counts)
+    return summary
+
+
+def summarize_files(file_paths, capacity, workers=1):
+    """
+    Finds the most frequent words of several files with a Space-Saving summary.
+
+    Memory stays bounded by the capacity of the summary and the size of one block,
+    whatever the number of distinct words. Each block is counted first and added
+    to the summary as a whole; with workers, the chunks are summarized in a
+    process pool and the summaries merged.
+
+    Args:
+        file_paths (list): The paths to the files to be read.
+        capacity (int): Number of words the summary keeps.
+        workers (int): Number of worker processes.
+
+    Returns:
+        SpaceSaving: The summary of all the words, as bytes.
+    """
+    summary = SpaceSaving(capacity)
+    if workers <= 1:
+        for file_path in file_paths:
+            try:
+                with open(file_path, 'r', encoding="utf-8") as file:
+                    for text in read_blocks(file):
+                        with phase("parse"):
+                            block_counts = Counter(tokenize(text))
+                        with phase("compute"):
+                            summary.update(block_counts)
+            except OSError as error:
+                print(f"Error reading file: {error}")
+        count_records(summary.count)
+        return summary
+
+    tasks = _task_ranges(file_paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summarize = WorkerTask(partial_function(summarize_range, capacity=capacity))
+        partials = worker_results(executor.map(summarize, *zip(*tasks))) if tasks else ()
+        with phase("compute"):
+            for partial in partials:
+                summary.merge(partial)
+    count_records(summary.count)
+    return summary
+
+
+def sort_words(word_frequencies, order="first"):
+    """
+    Orders word counts for the output.
+
+    Args:
+        word_frequencies (dict): Word counts in the order in which the words first appear.
+        order (str): "first" keeps that order, "count" sorts by decreasing count and then
+            alphabetically, and "word" sorts alphabetically.
+
+    Returns:
+        dict: The word counts in the requested order.
+    """
+    if order == "count":
+        return dict(sorted(word_frequencies.items(), key=lambda item: (-item[1], item[0])))
+    if order == "word":
+        return dict(sorted(word_frequencies.items()))
     return word_frequencies
 
 
-def write_results(results, elapsed_time):
+def format_count(word, count, errors=None):
+    """Formats one word count as a line of the results, with its lower bound if approximate."""
+    if errors is None:
+        return f"{word}: {count}"
+    return f"{word}: {count} (at least {count - errors[word]})"
+
+
+def write_results(results, elapsed_time, total_count=None, errors=None):
     """
     Writes word count results and execution time to a file.
 
     Args:
         results (dict): A dictionary containing word frequencies.
         elapsed_time (float): Execution time.
+        total_count (int, optional): Grand total, when results only hold some of the words.
+        errors (dict, optional): Overestimation of each approximate count.
     """
     try:
         with open('WordCountResults.txt', 'w', encoding="utf-8") as result_file:
-            total_count = 0
             for word, count in results.items():
-                result_file.write(f"{word}: {count}\n")
-                total_count += count
+                result_file.write(format_count(word, count, errors) + "\n")
+            if total_count is None:
+                total_count = sum(results.values())
             result_file.write(f"\nGrand Total: {total_count}\n")
             result_file.write(f"\nTime elapsed: {elapsed_time:.2f} seconds\n")
     except OSError as error:
@@ -58,18 +332,75 @@ def write_results(results, elapsed_time):
 
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python wordCount.py <file_with_data.txt>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Counts the words of a text file.")
+    parser.add_argument("input_files", nargs="+", help="text files to count as one corpus")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="number of processes counting chunks of the files "
+                             "(default: 1)")
+    parser.add_argument("--top", type=int, metavar="K",
+                        help="only report the K most frequent words")
+    parser.add_argument("--approximate", action="store_true",
+                        help="find the top words with a fixed-size summary instead of "
+                             "counting every word")
+    parser.add_argument("--capacity", type=int, metavar="M",
+                        help="words kept by the approximate summary (default: max(1000, 10 K)); "
+                             "counts are overestimated by at most total / M")
+    parser.add_argument("--sort", choices=SORT_ORDERS, default="first",
+                        help="order of the results: first appearance (default), "
+                             "decreasing count, or alphabetical")
+    parser.add_argument("--page", type=int, metavar="P",
+                        help="only print page P of the results on the console")
+    parser.add_argument("--page-size", type=int, default=50, metavar="S",
+                        help="results per console page (default: 50)")
+    parser.add_argument("--save-counts", metavar="FILE",
+                        help="also save the counts as a binary, memory-mappable counts file")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append the timings of the run to a JSON lines file")
+    parser.add_argument("--profile", action="store_true",
+                        help="run under cProfile and print the hot spots")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
+    if (args.approximate or args.capacity) and args.top is None:
+        parser.error("--approximate needs --top")
+    if args.capacity is not None and args.capacity < args.top:
+        parser.error("--capacity must be at least --top")
+    if (args.page is not None and args.page < 1) or args.page_size < 1:
+        parser.error("--page and --page-size must be at least 1")
 
-    input_file = sys.argv[1]
-    start_time = time.time()
-    word_counts = count_words(input_file)
-    log_elapsed_time = time.time() - start_time
+    start_run("wordCount", args.metrics, args.profile)
+    word_errors = None
+    if args.approximate or args.capacity:
+        word_summary = summarize_files(args.input_files, args.capacity or max(1000, 10 * args.top),
+                                       args.workers)
+        top_summary = word_summary.top(args.top)
+        word_counts = {word.decode("ascii"): count for word, count, _ in top_summary}
+        word_errors = {word.decode("ascii"): error for word, _, error in top_summary}
+        grand_total = word_summary.count
+    else:
+        word_counts = count_files(args.input_files, args.workers)
+        grand_total = sum(word_counts.values())
+        if args.top:
+            word_counts = top_words(word_counts, args.top)
+    word_counts = sort_words(word_counts, args.sort)
+    log_elapsed_time = elapsed_time()
 
-    for log_word, log_count in word_counts.items():
-        print(f"{log_word}: {log_count}")
-    print(f"\nGrand Total: {sum(word_counts.values())}")
-    print(f"\nElapsed time: {log_elapsed_time:.4f} seconds")
+    with phase("write"):
+        page_start = 0 if args.page is None else (args.page - 1) * args.page_size
+        page_stop = None if args.page is None else page_start + args.page_size
+        for log_word, log_count in islice(word_counts.items(), page_start, page_stop):
+            print(format_count(log_word, log_count, word_errors))
+        if args.page is not None:
+            page_count = max(1, -(-len(word_counts) // args.page_size))
+            print(f"\nPage {args.page} of {page_count}")
+        print(f"\nGrand Total: {grand_total}")
+        print(f"\nElapsed time: {log_elapsed_time:.4f} seconds")
 
-    write_results(word_counts, log_elapsed_time)
+        write_results(word_counts, log_elapsed_time, grand_total, word_errors)
+        if args.save_counts:
+            try:
+                save_counts(args.save_counts, word_counts)
+            except OSError as error:
+                print(f"Error writing counts: {error}")
@@ -0,0 +1,90 @@
+"""
+Benchmark Script
+
+This Python script measures how the sales engines of computeSales.py scale with the
+number of sales, using randomly generated sales of the products of the catalogue.
+
+Usage:
+    python benchmark.py engines [rows]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from itertools import cycle, islice
+
+import columnar_sales  # pylint: disable=import-error
+from computeSales import (  # pylint: disable=import-error
+    build_price_catalogue, compute_total_sales, compute_total_sales_columnar
+)
+
+PRODUCTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "A5.2 Archivos de Apoyo", "ProductList.json")
+POOL_SIZE = 100_000  # Distinct sale records, repeated to reach the number of rows.
+
+
+def generate_sales(titles: list, seed: int = 42):
+    """Returns a pool of random sale records of the given products, like TC1-TC3."""
+    rng = random.Random(seed)
+    return [
+        {"SALE_ID": index // 3, "SALE_Date": "01/12/23", "Product": rng.choice(titles),
+         "Quantity": rng.randint(1, 9)}
+        for index in range(POOL_SIZE)
+    ]
+
+
+def time_engine(engine, price_catalogue, pool: list, rows: int):
+    """Runs an engine over rows sales taken from the pool; returns its result and seconds."""
+    start_time = time.perf_counter()
+    result = engine(price_catalogue, islice(cycle(pool), rows))
+    return result, time.perf_counter() - start_time
+
+
+def bench_engines(rows: int = 1_000_000):
+    """
+    Compares the per-sale loop with the columnar engine, with NumPy when it is
+    installed and with the array fallback, and checks that they agree.
+
+    Args:
+        rows (int): Number of sales, from 10**6 to 10**8.
+    """
+    with open(PRODUCTS_FILE, 'r', encoding='utf-8') as file:
+        catalog_data = json.load(file)
+    price_catalogue = build_price_catalogue(catalog_data)
+    pool = generate_sales([item['title'] for item in catalog_data])
+
+    expected, loop_time = time_engine(compute_total_sales, price_catalogue, pool, rows)
+    timings = [("Loop", loop_time)]
+    numpy_module = columnar_sales.np
+    backends = [("Columnar numpy", numpy_module)] if numpy_module is not None else []
+    try:
+        for name, backend in backends + [("Columnar array", None)]:
+            columnar_sales.np = backend
+            result, elapsed_time = time_engine(compute_total_sales_columnar, price_catalogue,
+                                               pool, rows)
+            if result != expected:
+                print(f"Error: {name} and the loop disagree.")
+            timings.append((name, elapsed_time))
+    finally:
+        columnar_sales.np = numpy_module
+
+    print(f"Total: ${expected[0]:.2f}")
+    print(f"{'Engine':>15} {'Seconds':>10} {'Rows/s':>12} {'Speedup':>8}")
+    for name, elapsed_time in timings:
+        print(f"{name:>15} {elapsed_time:>10.2f} {rows / elapsed_time:>12.0f} "
+              f"{loop_time / elapsed_time:>8.2f}")
+
+
+BENCHMARKS = {
+    "engines": bench_engines,
+}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python benchmark.py <{'|'.join(BENCHMARKS)}> [size]")
+        sys.exit(1)
+
+    BENCHMARKS[sys.argv[1]](*(int(arg) for arg in sys.argv[2:]))
@@ -0,0 +1,106 @@
+"""
+Columnar Sales Module
+
+This module provides the kernels of the columnar sales engine of computeSales.py: the
+products of a batch of sales become a typed column of integer codes into a table of prices
+in units of the catalogue, the quantities become a typed column of 64-bit integers, and the
+cost of the batch is one gather-multiply-sum over the two columns.
+
+NumPy is used when it is installed; otherwise the columns are arrays from the array
+module and the gather-multiply-sum runs with map. A batch that could overflow 64-bit
+integers is added up in exact Python integers instead.
+"""
+
+from array import array
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # The array fallback is used instead.
+    np = None
+
+INT64_LIMIT = 1 << 63
+
+
+class ProductCodes:
+    """Integer codes of the products that are sold, and the table of their prices in units."""
+
+    def __init__(self, price_catalogue):
+        self.price_catalogue = price_catalogue
+        self.codes = {}
+        self.unpriced = set()  # Products missing from the catalogue or without a valid price.
+        self.prices = array("q")
+        self.largest_price = 0
+        self.price_column = None  # NumPy copy of prices, rebuilt when products are added.
+
+    def _add_products(self, products: list):
+        """Looks up the products not seen before and gives a code to those with a price."""
+        for product in set(products).difference(self.codes, self.unpriced):
+            price = self.price_catalogue.get(product)
+            if isinstance(price, int) and -INT64_LIMIT < price < INT64_LIMIT:
+                self.codes[product] = len(self.prices)
+                self.prices.append(price)
+                self.largest_price = max(self.largest_price, abs(price))
+            else:
+                self.unpriced.add(product)
+
+    def _encode(self, products: list):
+        """Returns the typed column of the product codes; raises KeyError if one has none."""
+        codes = map(self.codes.__getitem__, products)
+        if np is not None:
+            return np.fromiter(codes, dtype=np.intp, count=len(products))
+        return array("q", codes)
+
+    def code_column(self, products: list):
+        """
+        Returns the codes of the products as a typed column, or None if any
+        product has no price. Each product is looked up in the catalogue only
+        the first time it is seen.
+        """
+        try:
+            return self._encode(products)
+        except (KeyError, TypeError):
+            pass
+        try:
+            self._add_products(products)
+            return self._encode(products)
+        except (KeyError, TypeError):
+            return None
+
+    def sum_costs(self, codes, quantities) -> int:
+        """
+        Returns the exact total in units of price times quantity over a batch.
+
+        Args:
+            codes: Column returned by code_column.
+            quantities: Column returned by quantity_column.
+        """
+        if not len(codes):  # pylint: disable=use-implicit-booleaness-not-len
+            return 0
+        if np is not None:
+            largest_quantity = max(int(quantities.max()), -int(quantities.min()))
+            if largest_quantity * self.largest_price * len(codes) < INT64_LIMIT:
+                if self.price_column is None or len(self.price_column) != len(self.prices):
+                    self.price_column = np.array(self.prices, dtype=np.int64)
+                return int(self.price_column[codes] @ quantities)
+            codes, quantities = codes.tolist(), quantities.tolist()
+        return sum(map(mul, map(self.prices.__getitem__, codes), quantities))
+
+
+def quantity_column(quantities: list):
+    """
+    Returns the quantities as a typed column of 64-bit integers, or None if any
+    of them is not an integer that fits (booleans count as 0 and 1, as int() does).
+    """
+    if np is not None:
+        try:
+            column = np.array(quantities)
+        except ValueError:  # Quantities that are sequences of different lengths.
+            return None
+        if column.dtype.kind not in "bi" or column.ndim != 1:
+            return None
+        return column.astype(np.int64, copy=False)
+    try:
+        return array("q", quantities)
+    except (TypeError, OverflowError):
+        return None
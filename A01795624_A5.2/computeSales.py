@@ -1,9 +1,41 @@
 """
 Computes the total cost of sales based on a price catalogue and sales record.
+
+The sales record is streamed: it may be a JSON array of sales or NDJSON (one sale per
+line), and it is decoded in buffered blocks, so memory use does not depend on its size.
+Prices are converted once, when the catalogue is built, to whole units of the smallest
+decimal place any price uses. The totals are added up in those integer units and rounded
+to the cent only when they are reported, so they are exact however many sales there are.
+The product list may be JSON or CSV, and can be compiled once into an indexed cache that
+later runs reuse (see price_catalogue.py).
+
+Many sales files, or directories of them, are added up in a process pool that receives the
+catalogue once per worker, with optional totals by sale, date, product and product type.
+The totals can also be computed by a columnar engine, a batch of sales at a time (see
+columnar_sales.py).
 """
+import argparse
+import csv
 import json
+import os
+import re
+import sqlite3
 import sys
-import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, ROUND_HALF_UP, Context, Decimal
+from functools import partial as partial_function
+from itertools import islice
+from operator import itemgetter
+
+from columnar_sales import ProductCodes, quantity_column  # pylint: disable=import-error
+from price_catalogue import (  # pylint: disable=import-error
+    CompiledCatalogue, ProductTypes, compile_catalogue, open_compiled_catalogue
+)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from instrumentation import (  # pylint: disable=import-error,wrong-import-position
+    WorkerTask, count_records, elapsed_time, phase, start_run, worker_results
+)
 
 
 def load_json_file(file_path):
@@ -12,8 +44,11 @@ def load_json_file(file_path):
     Handles file not found and JSON decoding errors.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        with phase("read"):
+            with open(file_path, 'r', encoding='utf-8') as file:
+                text = file.read()
+        with phase("parse"):
+            return json.loads(text)
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
     except json.JSONDecodeError:
@@ -21,19 +56,257 @@ def load_json_file(file_path):
     return None
 
 
+def load_csv_file(file_path):
+    """
+    Loads the rows of a CSV product list, with a header naming at least the
+    title and price columns.
+    Handles file not found and CSV errors.
+    """
+    try:
+        with phase("read"):
+            with open(file_path, 'r', encoding='utf-8', newline='') as file:
+                reader = csv.DictReader(file)
+                rows = list(reader)
+        if rows and not {'title', 'price'} <= set(reader.fieldnames):
+            print(f"Error: File '{file_path}' has no title and price columns.")
+            return None
+        return rows
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+    except csv.Error:
+        print(f"Error: File '{file_path}' contains invalid CSV.")
+    return None
+
+
+def load_catalogue_file(file_path):
+    """
+    Loads a product list from a JSON file, or from a CSV file if it ends in .csv.
+    """
+    if file_path.lower().endswith('.csv'):
+        return load_csv_file(file_path)
+    return load_json_file(file_path)
+
+
+CHUNK_SIZE = 1 << 20  # Characters read per block of the sales record.
+DELIMITER = re.compile(r"[ \t\n\r]*(?:(,)[ \t\n\r]*)?")  # Whitespace and an optional comma.
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")  # Characters that may continue a number.
+
+
+def iter_json_records(file, chunk_size=CHUNK_SIZE):
+    """
+    Decodes the records of a top-level JSON array, or of NDJSON, one block at a time.
+
+    Each block is decoded with raw_decode; a record cut by the end of the block
+    is completed with the next block before it is decoded. That block is at least
+    as long as the incomplete record, so a record of any length is retried only a
+    logarithmic number of times. Inside an array, the records up to the last "}"
+    of the block are first decoded together as one array: the text before that
+    "}" lexes the same way in the file, so if it decodes, it holds exactly the
+    whole records; if not, raw_decode takes over.
+
+    Args:
+        file: Text file positioned at the start of the JSON.
+        chunk_size (int): Number of characters read per block.
+
+    Yields:
+        The records, in the order of the file.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a JSON array or NDJSON, or holds
+            no value at all.
+    """
+    raw_decode = json.JSONDecoder().raw_decode
+    match_delimiter = DELIMITER.match
+    match_number_tail = NUMBER_TAIL.match
+    buffer = ""
+    position = 0
+    in_array = None  # Unknown until the first value is found.
+    after_record = after_comma = closed = at_end = False
+    read_size = chunk_size
+    while not at_end:
+        with phase("read"):
+            block = file.read(read_size)
+        at_end = not block
+        buffer = buffer[position:] + block
+        size = len(buffer)
+        position = 0
+        records = []
+        batched = False
+        with phase("parse"):
+            while True:
+                delimiter = match_delimiter(buffer, position)
+                position = delimiter.end()
+                if delimiter.group(1):
+                    if not (in_array and after_record):
+                        raise json.JSONDecodeError("Expecting value", buffer, delimiter.start(1))
+                    after_record, after_comma = False, True
+                if position == size:
+                    break
+                if not after_comma:  # After a comma, only a record may follow.
+                    char = buffer[position]
+                    if closed:
+                        raise json.JSONDecodeError("Extra data", buffer, position)
+                    if in_array is None:
+                        in_array = char == "["
+                        if in_array:
+                            position += 1
+                            continue
+                    if in_array and char == "]":
+                        closed, after_record = True, False
+                        position += 1
+                        continue
+                    if in_array and after_record:
+                        raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+                cut = buffer.rfind("}", position) + 1 if in_array and not batched else 0
+                if cut:
+                    batched = True
+                    try:
+                        records.extend(json.loads("[" + buffer[position:cut] + "]"))
+                        position, after_record, after_comma = cut, True, False
+                        continue
+                    except json.JSONDecodeError:
+                        pass
+                try:
+                    record, end = raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if at_end:
+                        raise
+                    break
+                if not at_end and match_number_tail(buffer, end).end() == size:
+                    break  # A number may continue in the next block, like "2." or "1e".
+                records.append(record)
+                position = end
+                after_record, after_comma = in_array, False
+        read_size = max(chunk_size, size - position)
+        count_records(len(records))
+        yield from records
+    if in_array is None:
+        raise json.JSONDecodeError("Expecting value", buffer, position)
+    if in_array and not closed:
+        raise json.JSONDecodeError("Expecting ']'", buffer, position)
+
+
+def load_json_records(file_path):
+    """
+    Streams the records of a JSON array or NDJSON file.
+    A missing file or invalid JSON raises FileNotFoundError or json.JSONDecodeError.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        yield from iter_json_records(file)
+
+
+def parse_price(price):
+    """
+    Converts a price to an exact Decimal, with the digits it was written with.
+    Returns None if the price is not a finite number.
+    """
+    try:
+        amount = Decimal(str(price))
+    except (ArithmeticError, ValueError):
+        return None
+    return amount if amount.is_finite() else None
+
+
+EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)  # Moves the point without rounding.
+CENT = Decimal("0.01")
+MISSING = object()  # Default of price lookups, told apart from a product without a price.
+
+
+def units_to_amount(units, decimals):
+    """Returns a whole number of units of 10**-decimals as an exact Decimal."""
+    return Decimal(units).scaleb(-decimals, EXACT)
+
+
+def amount_to_units(amount, decimals):
+    """Returns the whole number of units of an amount returned by units_to_amount."""
+    return int(amount.scaleb(decimals, EXACT))
+
+
+def round_to_cents(amount):
+    """Rounds an exact amount to whole cents, half a cent up."""
+    return amount.quantize(CENT, ROUND_HALF_UP, EXACT)
+
+
+class PriceList(dict):
+    """Prices of the products by title, in whole units of 10**-decimals."""
+
+    def __init__(self, prices, decimals):
+        super().__init__(prices)
+        self.decimals = decimals
+
+
 def build_price_catalogue(catalog_data):
     """
-    Builds a price dictionary from catalog data.
+    Builds a dictionary of prices from catalog data.
+
+    The unit is the smallest decimal place used by any price, and never more
+    than a cent, so every price is a whole number of units and the costs can be
+    multiplied and added up exactly in integers.
+    """
+    prices = {item['title']: parse_price(item['price']) for item in catalog_data}
+    decimals = max([2, *(-price.as_tuple().exponent for price in prices.values()
+                         if price is not None)])
+    return PriceList(((title, None if price is None else amount_to_units(price, decimals))
+                      for title, price in prices.items()), decimals)
+
+
+def build_type_catalogue(catalog_data):
+    """
+    Builds a dictionary of product types from catalog data.
     """
-    return {item['title']: item['price'] for item in catalog_data}
+    return {item['title']: item.get('type') for item in catalog_data}
 
 
-def compute_total_sales(price_catalogue, sales_record):
+def load_price_catalogue(file_path, cache_path=None):
+    """
+    Loads the prices and the types of the products of a product list.
+
+    With a cache path, the product list is compiled into that file when it is
+    missing or outdated, and the products are then looked up in it as needed.
+    Returns a (prices, types) tuple, or None if the product list cannot be loaded.
+    """
+    if cache_path:
+        compiled = open_compiled_catalogue(file_path, cache_path)
+        if compiled is not None:
+            return compiled, ProductTypes(compiled)
+    catalog_data = load_catalogue_file(file_path)
+    if catalog_data is None:
+        return None
+    prices = build_price_catalogue(catalog_data)
+    if cache_path:
+        try:
+            compile_catalogue(file_path, cache_path, prices.decimals, (
+                (item['title'], prices[item['title']], row, item.get('type'))
+                for row, item in enumerate(catalog_data, 1)
+            ))
+            compiled = CompiledCatalogue(cache_path)
+            return compiled, ProductTypes(compiled)
+        except (OSError, sqlite3.Error) as error:
+            print(f"Error: Cannot compile the catalogue into '{cache_path}': {error}")
+    return prices, build_type_catalogue(catalog_data)
+
+
+GROUPS = {  # Sale field of each breakdown; the product type comes from the catalogue.
+    "sale": "SALE_ID",
+    "date": "SALE_Date",
+    "product": "Product",
+    "type": None,
+}
+
+
+def compute_total_sales(price_catalogue, sales_record, groups=None, product_types=None):
     """
     Computes total cost of all sales based on price catalogue.
+    The cost is added up in units of the catalogue and returned as an exact Decimal.
+
+    With groups, a dictionary mapping names of GROUPS to dictionaries, the cost
+    in units of each valid sale is also added to the total of its group key;
+    grouping by type takes the product types from product_types.
     """
-    total_cost = 0
+    get_price = price_catalogue.get  # Indexing a dict subclass is slower than a bound get.
+    total_units = 0
     errors = []
+    breakdown = [(GROUPS[name], totals) for name, totals in (groups or {}).items()]
 
     for sale in sales_record:
         product = sale.get('Product')
@@ -43,29 +316,180 @@ def compute_total_sales(price_catalogue, sales_record):
             errors.append("Invalid record: Missing product or quantity.")
             continue
 
-        if product not in price_catalogue:
+        price = get_price(product, MISSING)
+        if price is MISSING:
             errors.append(f"Error: Product '{product}' not found in list.")
             continue
 
         try:
-            price = float(price_catalogue[product])
-            total_cost += price * int(quantity)
-        except ValueError:
+            cost = price * int(quantity)
+        except (TypeError, ValueError):
             errors.append(f"Error: Invalid price or quantity for '{product}'.")
+            continue
+
+        total_units += cost
+        for field, totals in breakdown:
+            key = sale.get(field) if field else product_types.get(product)
+            totals[key] = totals.get(key, 0) + cost
+
+    return units_to_amount(total_units, price_catalogue.decimals), errors
+
 
-    return total_cost, errors
+ENGINES = ("loop", "columnar")
+COLUMN_BATCH_SIZE = 1 << 16  # Sales per batch of columns.
+GET_PRODUCT = itemgetter('Product')
+GET_QUANTITY = itemgetter('Quantity')
+
+
+def compute_total_sales_columnar(price_catalogue, sales_record, batch_size=COLUMN_BATCH_SIZE):
+    """
+    Computes the same total and errors as compute_total_sales, a batch at a time.
+
+    The products and quantities of each batch are taken out as columns, the
+    products are encoded as integers once per distinct product, and the total
+    is a gather-multiply-sum over the columns. A batch with any sale that
+    compute_total_sales would report goes through compute_total_sales, so the
+    errors are the same and come in the same order.
+    """
+    product_codes = ProductCodes(price_catalogue)
+    total_units = 0
+    errors = []
+    sales_record = iter(sales_record)
+    while True:
+        batch = list(islice(sales_record, batch_size))
+        if not batch:
+            break
+        try:
+            codes = product_codes.code_column(list(map(GET_PRODUCT, batch)))
+            quantities = quantity_column(list(map(GET_QUANTITY, batch)))
+        except KeyError:  # A sale without a product or a quantity.
+            codes = quantities = None
+        if codes is None or quantities is None:
+            batch_cost, batch_errors = compute_total_sales(price_catalogue, batch)
+            total_units += amount_to_units(batch_cost, price_catalogue.decimals)
+            errors.extend(batch_errors)
+        else:
+            total_units += product_codes.sum_costs(codes, quantities)
+    return units_to_amount(total_units, price_catalogue.decimals), errors
+
+
+SALES_SUFFIXES = ('.json', '.ndjson', '.jsonl')
+_worker_catalogue = None  # (prices, types) of the catalogue shared with a worker process.
+
+
+def expand_sales_inputs(paths):
+    """
+    Expands directories into the JSON and NDJSON files they contain, sorted by
+    name; other paths are kept as given.
+    """
+    file_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths.extend(sorted(
+                entry.path for entry in os.scandir(path)
+                if entry.is_file() and entry.name.lower().endswith(SALES_SUFFIXES)
+            ))
+        else:
+            file_paths.append(path)
+    return file_paths
 
 
-def save_results(total_cost, errors, execution_time):
+def share_catalogue(prices, types, cache_path=None):
+    """
+    Sets the catalogue used by aggregate_file in this process.
+
+    A compiled catalogue is opened again by its path, since each process needs
+    its own connection to the file.
+    """
+    global _worker_catalogue  # pylint: disable=global-statement
+    if cache_path:
+        prices = CompiledCatalogue(cache_path)
+        types = ProductTypes(prices)
+    _worker_catalogue = prices, types
+
+
+def aggregate_file(file_path, group_names=(), engine="loop"):
+    """
+    Computes the total cost of one sales file with the shared catalogue.
+    The columnar engine does not compute group totals. A file that is missing
+    or holds invalid JSON adds nothing to the totals; its error is returned
+    instead, so the other files are still added up.
+
+    Returns:
+        tuple: The total cost, the errors, and the totals in units of each group.
+    """
+    prices, types = _worker_catalogue
+    groups = {name: {} for name in group_names}
+    try:
+        if engine == "columnar":
+            total_cost, errors = compute_total_sales_columnar(prices,
+                                                              load_json_records(file_path))
+            return total_cost, errors, {}
+        total_cost, errors = compute_total_sales(prices, load_json_records(file_path), groups,
+                                                 types)
+    except FileNotFoundError:
+        return units_to_amount(0, prices.decimals), ["Error: File not found."], {}
+    except json.JSONDecodeError:
+        return units_to_amount(0, prices.decimals), ["Error: File contains invalid JSON."], {}
+    return total_cost, errors, groups
+
+
+def aggregate_files(price_catalogue, file_paths, group_names=(), workers=1, engine="loop"):
+    """
+    Computes the total cost of many sales files, in a process pool when there is
+    more than one worker and more than one file.
+
+    The totals are merged in integer units, in the order of file_paths, so the
+    result does not depend on the number of workers. With more than one file,
+    each error names the file it was found in.
+
+    Returns:
+        tuple: The total cost, the errors, and the exact total of each group.
+    """
+    prices, types = price_catalogue
+    function = partial_function(aggregate_file, group_names=tuple(group_names), engine=engine)
+    if workers > 1 and len(file_paths) > 1:
+        shared = (None, None, prices.path) if isinstance(prices, CompiledCatalogue) \
+            else (prices, types)
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths)),
+                                 initializer=share_catalogue, initargs=shared) as executor:
+            partials = list(worker_results(executor.map(WorkerTask(function), file_paths)))
+    else:
+        share_catalogue(prices, types)
+        partials = [function(file_path) for file_path in file_paths]
+
+    total_units = 0
+    errors = []
+    groups = {name: {} for name in group_names}
+    for file_path, (file_cost, file_errors, file_groups) in zip(file_paths, partials):
+        total_units += amount_to_units(file_cost, prices.decimals)
+        if len(file_paths) > 1:
+            file_errors = [f"{file_path}: {error}" for error in file_errors]
+        errors.extend(file_errors)
+        for name, file_totals in file_groups.items():
+            totals = groups[name]
+            for key, units in file_totals.items():
+                totals[key] = totals.get(key, 0) + units
+    for totals in groups.values():
+        for key, units in totals.items():
+            totals[key] = units_to_amount(units, prices.decimals)
+    return units_to_amount(total_units, prices.decimals), errors, groups
+
+
+def save_results(total_cost, errors, execution_time, groups=None):
     """
     Save results to SalesResults.txt and print output.
+    The totals of each group follow the errors; every amount is rounded to the cent.
     """
     output = [
-        f"Total Sales Cost: ${total_cost:.2f}",
+        f"Total Sales Cost: ${round_to_cents(total_cost):.2f}",
         f"Execution Time: {execution_time:.4f} seconds",
         "Errors:"
     ]
     output.extend(errors if errors else ["None"])
+    for name, totals in (groups or {}).items():
+        output.append(f"Totals by {GROUPS[name] or 'type'}:")
+        output.extend(f"{key}: ${round_to_cents(amount):.2f}" for key, amount in totals.items())
 
     # Print results to console
     print("\n".join(output))
@@ -76,32 +500,55 @@ def save_results(total_cost, errors, execution_time):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Computes the total cost of sales based on a price catalogue.")
+    parser.add_argument("price_catalogue_file", help="JSON or CSV file with the product list")
+    parser.add_argument("sales_record_files", nargs="+", metavar="sales_record_file",
+                        help="JSON array or NDJSON files with the sales records, or "
+                             "directories of them")
+    parser.add_argument("--catalogue-cache", metavar="FILE",
+                        help="compile the product list into FILE and reuse it while "
+                             "the product list is unchanged")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="worker processes used when there are several sales files "
+                             "(default: 1)")
+    parser.add_argument("--group-by", nargs="+", choices=GROUPS, default=[], metavar="GROUP",
+                        help=f"also report the totals by {', '.join(GROUPS)}")
+    parser.add_argument("--engine", choices=ENGINES, default="loop",
+                        help="compute the totals sale by sale (default) or in batches of columns")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append the timings of the run to a JSON lines file")
+    parser.add_argument("--profile", action="store_true",
+                        help="run under cProfile and print the hot spots")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.engine == "columnar" and args.group_by:
+        parser.error("--group-by needs the loop engine")
 
-    if len(sys.argv) != 3:
-        print("""Usage:
-            python computeSales.py priceCatalogue.json salesRecord.json""")
-        sys.exit(1)
-
-    price_catalogue_file = sys.argv[1]
-    sales_record_file = sys.argv[2]
-
-    # We first load the two JSON's files
-    log_catalog_data = load_json_file(price_catalogue_file)
-    sales_data = load_json_file(sales_record_file)
-
-    if log_catalog_data is None or sales_data is None:
+    start_run("computeSales", args.metrics, args.profile)
+    sales_files = expand_sales_inputs(args.sales_record_files)
+    if not sales_files:
+        print("Error: No sales files found.")
         sys.exit(1)
 
-    # Then we build price catalogue from catalog data
-    log_price_catalogue = build_price_catalogue(log_catalog_data)
+    with phase("compute"):
+        # We first load the price catalogue; the sales are streamed later
+        log_price_catalogue = load_price_catalogue(args.price_catalogue_file,
+                                                   args.catalogue_cache)
+        if log_price_catalogue is None:
+            sys.exit(1)
 
-    # After, we compute the total sales
-    start_time = time.time()
-    log_total_cost, log_errors = compute_total_sales(
-        log_price_catalogue,
-        sales_data
-    )
-    log_execution_time = time.time() - start_time
+        # Then we compute the total sales as the records are read
+        log_total_cost, log_errors, log_groups = aggregate_files(
+            log_price_catalogue,
+            sales_files,
+            dict.fromkeys(args.group_by),
+            args.workers,
+            args.engine
+        )
+    log_execution_time = elapsed_time()
 
     # Lastly, we save and display results
-    save_results(log_total_cost, log_errors, log_execution_time)
+    with phase("write"):
+        save_results(log_total_cost, log_errors, log_execution_time, log_groups)
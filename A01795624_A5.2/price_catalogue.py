@@ -0,0 +1,184 @@
+"""
+Price Catalogue Module
+
+This module compiles a product list into an indexed SQLite file, so repeated sales runs
+look prices up in it instead of parsing the whole product list every time. The compiled
+file records the path, modification time, size and SHA-256 hash of its source: it is
+reused while they match, and a source that was only touched is recognised by its hash.
+
+Only the products that are sold are read from the compiled file, and each only once,
+so opening it does not depend on the size of the catalogue.
+"""
+
+import hashlib
+import os
+import sqlite3
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE source (path TEXT, mtime_ns INTEGER, size INTEGER, sha256 TEXT, decimals INTEGER);
+CREATE TABLE products (
+    title TEXT PRIMARY KEY,
+    price_units TEXT,
+    row INTEGER,
+    type TEXT
+) WITHOUT ROWID;
+"""
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(file_path: str) -> str:
+    """Returns the SHA-256 hash of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_tag(file_path: str) -> tuple:
+    """Returns the path, modification time and size that identify a source file."""
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+def compile_catalogue(source_path: str, cache_path: str, decimals: int, products):
+    """
+    Writes the compiled catalogue of a source file.
+
+    The file is written under a temporary name and then renamed, so a run that
+    stops halfway never leaves a partial catalogue behind. Prices are stored as
+    text, so they are not limited to 64-bit integers.
+
+    Args:
+        source_path (str): The product list the products were read from.
+        cache_path (str): The compiled catalogue to write.
+        decimals (int): Decimal places of the unit the prices are counted in.
+        products: (title, price in units, row, type) tuples; a later product
+            replaces an earlier one with the same title.
+    """
+    temporary_path = cache_path + ".tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    with closing(sqlite3.connect(temporary_path)) as connection:
+        connection.executescript(SCHEMA)
+        connection.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)", (
+            (title, None if price is None else str(price), row, product_type)
+            for title, price, row, product_type in products
+        ))
+        connection.execute("INSERT INTO source VALUES (?, ?, ?, ?, ?)",
+                           (*source_tag(source_path), file_digest(source_path), decimals))
+        connection.commit()
+    os.replace(temporary_path, cache_path)
+
+
+class CompiledCatalogue:
+    """
+    Prices of a compiled catalogue, read from its file as products are looked up.
+
+    It behaves like the price list built from the product list: prices are whole
+    numbers of units of 10**-decimals.
+    """
+
+    _MISSING = (None, None, None)
+
+    def __init__(self, cache_path: str):
+        self.path = cache_path
+        self.connection = sqlite3.connect(cache_path)
+        self.products = {}  # Products already looked up, including missing ones.
+        self.decimals = self.connection.execute("SELECT decimals FROM source").fetchone()[0]
+
+    def _product(self, title):
+        """Returns the price, row and type of a product, from memory after the first time."""
+        product = self.products.get(title)
+        if product is None:
+            product = self.connection.execute(
+                "SELECT price_units, row, type FROM products WHERE title = ?", (title,)
+            ).fetchone() or self._MISSING
+            if product[0] is not None:
+                product = (int(product[0]), *product[1:])
+            self.products[title] = product
+        return product
+
+    def __contains__(self, title):
+        return self._product(title)[1] is not None
+
+    def __getitem__(self, title):
+        price, row, _ = self._product(title)
+        if row is None:
+            raise KeyError(title)
+        return price
+
+    def get(self, title, default=None):
+        """Returns the price in units of a product, or default if it is not in the catalogue."""
+        price, row, _ = self._product(title)
+        return default if row is None else price
+
+    def row(self, title):
+        """Returns the position of a product in its product list, counting from 1."""
+        return self._product(title)[1]
+
+    def product_type(self, title, default=None):
+        """Returns the type of a product, or default if it has none or is not in the catalogue."""
+        product_type = self._product(title)[2]
+        return default if product_type is None else product_type
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def is_compiled_from(self, source_path: str) -> bool:
+        """
+        Checks that the catalogue was compiled from the current content of a file.
+
+        A file with the recorded path, time and size is trusted without reading it;
+        otherwise its hash decides, and the new time is recorded when the hash matches.
+        """
+        path, mtime_ns, size = source_tag(source_path)
+        recorded = self.connection.execute(
+            "SELECT path, mtime_ns, size, sha256 FROM source").fetchone()
+        if recorded is None or recorded[0] != path or recorded[2] != size:
+            return False
+        if recorded[1] == mtime_ns:
+            return True
+        if recorded[3] != file_digest(source_path):
+            return False
+        with self.connection:
+            self.connection.execute("UPDATE source SET mtime_ns = ?", (mtime_ns,))
+        return True
+
+    def close(self):
+        """Closes the compiled file."""
+        self.connection.close()
+
+
+class ProductTypes:
+    """The types of the products of a compiled catalogue, looked up like a dictionary."""
+
+    def __init__(self, catalogue: CompiledCatalogue):
+        self.catalogue = catalogue
+
+    def get(self, title, default=None):
+        """Returns the type of a product, or default if it has none or is not in the catalogue."""
+        return self.catalogue.product_type(title, default)
+
+
+def open_compiled_catalogue(source_path: str, cache_path: str):
+    """
+    Opens the compiled catalogue of a source file if it is up to date.
+
+    Returns:
+        CompiledCatalogue: The catalogue, or None if it is missing, outdated or
+            unreadable, or the source file cannot be read.
+    """
+    if not os.path.exists(cache_path):
+        return None
+    catalogue = None
+    try:
+        catalogue = CompiledCatalogue(cache_path)
+        if catalogue.is_compiled_from(source_path):
+            return catalogue
+    except (OSError, sqlite3.Error):
+        pass
+    if catalogue is not None:
+        catalogue.close()
+    return None
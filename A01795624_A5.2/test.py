@@ -0,0 +1,380 @@
+"""
+Unit tests for the Compute Sales Script.
+
+This module checks the totals and errors of the TC1-TC3 sales records against
+Results.txt, whatever the format the records are read from.
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+import columnar_sales  # pylint: disable=import-error
+import computeSales  # pylint: disable=import-error
+from computeSales import (  # pylint: disable=import-error
+    GROUPS, aggregate_files, build_price_catalogue, compute_total_sales,
+    compute_total_sales_columnar, expand_sales_inputs, iter_json_records, load_price_catalogue,
+    round_to_cents, units_to_amount
+)
+from price_catalogue import CompiledCatalogue  # pylint: disable=import-error
+
+SUPPORT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "A5.2 Archivos de Apoyo")
+PRODUCT_LIST = os.path.join(SUPPORT_DIRECTORY, "ProductList.json")
+TEST_CASES = {
+    f"TC{i}": os.path.join(SUPPORT_DIRECTORY, f"TC{i}", f"TC{i}.Sales.json") for i in range(1, 4)
+}
+
+
+def read_expected_totals():
+    """Reads the expected total of every test case from Results.txt."""
+    totals = {}
+    with open(os.path.join(SUPPORT_DIRECTORY, "Results.txt"), "r", encoding="utf-8") as file:
+        for line in file:
+            fields = line.split()
+            if len(fields) == 2 and fields[0] in TEST_CASES:
+                totals[fields[0]] = Decimal(fields[1])
+    return totals
+
+
+class BaseTest(unittest.TestCase):
+    """Base test class that loads the catalogue, the sales and the expected results once."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Reads the product list, every sales record and Results.txt."""
+        cls.prices, cls.types = load_price_catalogue(PRODUCT_LIST)
+        cls.expected_totals = read_expected_totals()
+        cls.test_sales = {}
+        cls.expected_errors = {}
+        for name, path in TEST_CASES.items():
+            with open(path, "r", encoding="utf-8") as file:
+                cls.test_sales[name] = json.load(file)
+            cls.expected_errors[name] = [
+                f"Error: Product '{sale['Product']}' not found in list."
+                for sale in cls.test_sales[name] if sale["Product"] not in cls.prices
+            ]
+
+    def setUp(self):
+        """Creates a directory for the files of one test."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, text):
+        """Writes a file in the test directory and returns its path."""
+        file_path = os.path.join(self.directory.name, name)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return file_path
+
+    def assert_results(self, name, total_cost, errors):
+        """Checks a total and its errors against the expected results of a test case."""
+        self.assertEqual(round_to_cents(total_cost), self.expected_totals[name], name)
+        self.assertEqual(errors, self.expected_errors[name], name)
+
+
+class TestStreamRecords(BaseTest):
+    """Unit tests for streaming the sales records from JSON arrays or NDJSON."""
+
+    def test_json_and_ndjson(self):
+        """Test the totals and errors of every test case, read as a JSON array and as NDJSON."""
+        for name, path in TEST_CASES.items():
+            ndjson_path = self.write(f"{name}.ndjson", "".join(
+                json.dumps(sale) + "\n" for sale in self.test_sales[name]))
+            for file_path in (path, ndjson_path):
+                with open(file_path, "r", encoding="utf-8") as file:
+                    self.assert_results(name, *compute_total_sales(
+                        self.prices, iter_json_records(file), None, self.types))
+
+    def test_small_chunks(self):
+        """Test that blocks smaller than a record decode the same records."""
+        for name, sales in self.test_sales.items():
+            texts = (json.dumps(sales, indent=2), json.dumps(sales, separators=(",", ":")),
+                     "\n".join(map(json.dumps, sales)), " ".join(map(json.dumps, sales)))
+            for text in texts:
+                for chunk_size in (1, 2, 7, 64, 1000):
+                    records = list(iter_json_records(io.StringIO(text), chunk_size))
+                    self.assertEqual(records, sales, (name, chunk_size))
+
+    def test_values(self):
+        """Test arrays and sequences of values other than records."""
+        for text, values in (("[]", []), (" [ ] ", []), ("[1, 2.5e3,\n-3]", [1, 2500.0, -3]),
+                             ('["]", "}", {"a": [1, {}]}]', ["]", "}", {"a": [1, {}]}]),
+                             ("1 2\n3", [1, 2, 3]), ('{"a": 1}', [{"a": 1}])):
+            for chunk_size in (1, 3, 1000):
+                self.assertEqual(list(iter_json_records(io.StringIO(text), chunk_size)), values,
+                                 (text, chunk_size))
+
+    def test_invalid_json(self):
+        """Test that empty files and malformed arrays or NDJSON are rejected."""
+        for text in ("", "  \n", "[", "[1,]", "[,1]", "[1 2]", "[1] 2", "[1]]", '{"a": 1',
+                     "1,2", "[1,,2]", '[{"a": 1}}]'):
+            for chunk_size in (1, 3, 1000):
+                with self.assertRaises(json.JSONDecodeError, msg=(text, chunk_size)):
+                    list(iter_json_records(io.StringIO(text), chunk_size))
+
+
+class TestExactTotals(BaseTest):
+    """Unit tests for adding up the sales in integer units of the catalogue."""
+
+    def test_csv_catalogue(self):
+        """Test that the product list gives the same totals as CSV and as JSON."""
+        with open(PRODUCT_LIST, "r", encoding="utf-8") as file:
+            products = json.load(file)
+        csv_path = self.write("ProductList.csv", "title,price,type\n" + "".join(
+            f'"{product["title"]}",{product["price"]},{product["type"]}\n'
+            for product in products))
+        prices, types = load_price_catalogue(csv_path)
+        for name, sales in self.test_sales.items():
+            self.assert_results(name, *compute_total_sales(prices, sales, None, types))
+
+    def test_many_small_prices(self):
+        """Test exact sums of many small and sub-cent prices, which floats would round."""
+        prices = build_price_catalogue([{"title": "dime", "price": 0.1},
+                                        {"title": "mill", "price": "0.001"},
+                                        {"title": "big", "price": 1e15}])
+        self.assertEqual(prices.decimals, 3)
+        sales = [{"Product": "dime", "Quantity": 1}] * 100_000
+        sales += [{"Product": "mill", "Quantity": 3}] * 1001
+        sales += [{"Product": "big", "Quantity": 3}, {"Product": "dime", "Quantity": -7}]
+        total_cost, errors = compute_total_sales(prices, sales)
+        self.assertEqual(total_cost, Decimal("3000000000010002.303"))
+        self.assertEqual(errors, [])
+        self.assertEqual(round_to_cents(total_cost), Decimal("3000000000010002.30"))
+
+    def test_round_half_up(self):
+        """Test that totals are rounded to the cent only when they are reported, half up."""
+        prices = build_price_catalogue([{"title": "half", "price": "0.005"},
+                                        {"title": "third", "price": "0.335"}])
+        for quantity, expected in ((1, "0.01"), (2, "0.01"), (3, "0.02"), (-1, "-0.01")):
+            total_cost, _ = compute_total_sales(prices, [{"Product": "half", "Quantity": quantity}])
+            self.assertEqual(round_to_cents(total_cost), Decimal(expected), quantity)
+        total_cost, _ = compute_total_sales(prices, [{"Product": "third", "Quantity": 3}])
+        self.assertEqual(total_cost, Decimal("1.005"))
+        self.assertEqual(round_to_cents(total_cost), Decimal("1.01"))
+
+    def test_invalid_records(self):
+        """Test the errors of sales without a product, a price or a valid quantity."""
+        prices = build_price_catalogue([{"title": "a", "price": 2.5},
+                                        {"title": "free", "price": "not a price"}])
+        sales = [{"Product": "a", "Quantity": 2}, {"Quantity": 1}, {"Product": "a"},
+                 {"Product": "b", "Quantity": 1}, {"Product": "a", "Quantity": "x"},
+                 {"Product": "free", "Quantity": 1}, {"Product": "a", "Quantity": "3"}]
+        total_cost, errors = compute_total_sales(prices, sales)
+        self.assertEqual(total_cost, Decimal("12.5"))
+        self.assertEqual(errors, [
+            "Invalid record: Missing product or quantity.",
+            "Invalid record: Missing product or quantity.",
+            "Error: Product 'b' not found in list.",
+            "Error: Invalid price or quantity for 'a'.",
+            "Error: Invalid price or quantity for 'free'.",
+        ])
+
+
+class TestCatalogueCache(BaseTest):
+    """Unit tests for compiling the product list and reusing the compiled file."""
+
+    def setUp(self):
+        """Copies the product list to the test directory, next to its cache."""
+        super().setUp()
+        self.source_path = os.path.join(self.directory.name, "ProductList.json")
+        shutil.copyfile(PRODUCT_LIST, self.source_path)
+        self.cache_path = os.path.join(self.directory.name, "catalogue.db")
+
+    def load(self):
+        """
+        Loads the product list through the cache.
+
+        Returns:
+            tuple: The prices, the types, and whether the cache was compiled again.
+        """
+        with mock.patch.object(computeSales, "compile_catalogue",
+                               wraps=computeSales.compile_catalogue) as compile_catalogue:
+            prices, types = load_price_catalogue(self.source_path, self.cache_path)
+        self.addCleanup(prices.close)
+        return prices, types, compile_catalogue.called
+
+    def test_totals(self):
+        """Test that the compiled catalogue gives the expected totals and product lookups."""
+        prices, types, compiled = self.load()
+        self.assertTrue(compiled)
+        self.assertIsInstance(prices, CompiledCatalogue)
+        for name, sales in self.test_sales.items():
+            self.assert_results(name, *compute_total_sales(prices, sales, None, types))
+        self.assertEqual(len(prices), len(self.prices))
+        for title, price in self.prices.items():
+            self.assertEqual(prices.get(title), price, title)
+            self.assertEqual(types.get(title), self.types[title], title)
+        self.assertIsNone(prices.get("Elotes"))
+        self.assertNotIn("Elotes", prices)
+        with self.assertRaises(KeyError):
+            prices["Elotes"]  # pylint: disable=pointless-statement
+
+    def test_reuse(self):
+        """Test that the cache is reused while the product list is unchanged, even if touched."""
+        self.load()
+        _, _, compiled = self.load()
+        self.assertFalse(compiled)
+        stat = os.stat(self.source_path)
+        os.utime(self.source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        prices, _, compiled = self.load()
+        self.assertFalse(compiled)
+        self.assertTrue(prices.is_compiled_from(self.source_path))
+
+    def test_rebuild_when_changed(self):
+        """Test that a changed product list, or an unreadable cache, is compiled again."""
+        self.load()
+        with open(self.source_path, "r", encoding="utf-8") as file:
+            products = json.load(file)
+        products[0]["price"] = 1000.005
+        self.write("ProductList.json", json.dumps(products))
+        prices, _, compiled = self.load()
+        self.assertTrue(compiled)
+        self.assertEqual(prices.decimals, 3)
+        self.assertEqual(prices.get(products[0]["title"]), 1000005)
+        prices.close()
+        self.write("catalogue.db", "not a database")
+        prices, _, compiled = self.load()
+        self.assertTrue(compiled)
+        self.assertEqual(prices.get(products[0]["title"]), 1000005)
+
+
+class TestAggregateFiles(BaseTest):
+    """Unit tests for adding up many sales files in a process pool."""
+
+    def expected_groups(self):
+        """Adds up the cost of every valid sale of the test cases by each group."""
+        groups = {name: {} for name in GROUPS}
+        for sales in self.test_sales.values():
+            for sale in sales:
+                if sale["Product"] not in self.prices:
+                    continue
+                cost = self.prices[sale["Product"]] * sale["Quantity"]
+                for name, field in GROUPS.items():
+                    key = sale.get(field) if field else self.types[sale["Product"]]
+                    groups[name][key] = groups[name].get(key, 0) + cost
+        return {name: {key: units_to_amount(units, self.prices.decimals)
+                       for key, units in totals.items()}
+                for name, totals in groups.items()}
+
+    def test_directories(self):
+        """Test that directories are expanded into their sales files, sorted by name."""
+        self.write("b.ndjson", "")
+        self.write("a.JSON", "")
+        self.write("notes.txt", "")
+        os.mkdir(os.path.join(self.directory.name, "c.json"))
+        inputs = [self.directory.name, "missing.json"]
+        self.assertEqual(expand_sales_inputs(inputs), [
+            os.path.join(self.directory.name, "a.JSON"),
+            os.path.join(self.directory.name, "b.ndjson"),
+            "missing.json"])
+        folders = [os.path.dirname(path) for path in TEST_CASES.values()]
+        self.assertEqual(expand_sales_inputs(folders), list(TEST_CASES.values()))
+
+    def test_workers_match_serial(self):
+        """Test that the totals, errors and groups do not depend on the workers."""
+        file_paths = list(TEST_CASES.values())
+        expected_total = sum(self.expected_totals.values())
+        expected_errors = [f"{TEST_CASES[name]}: {error}"
+                           for name, errors in self.expected_errors.items() for error in errors]
+        serial = aggregate_files((self.prices, self.types), file_paths, GROUPS)
+        self.assertEqual(round_to_cents(serial[0]), expected_total)
+        self.assertEqual(serial[1], expected_errors)
+        self.assertEqual(serial[2], self.expected_groups())
+        for totals in serial[2].values():
+            self.assertEqual(sum(totals.values()), serial[0])
+        for workers in (2, 3, 8):
+            self.assertEqual(aggregate_files((self.prices, self.types), file_paths, GROUPS,
+                                             workers), serial, workers)
+
+    def test_compiled_catalogue(self):
+        """Test that workers open the compiled catalogue by its path."""
+        file_paths = list(TEST_CASES.values())
+        serial = aggregate_files((self.prices, self.types), file_paths, GROUPS)
+        prices, types = load_price_catalogue(PRODUCT_LIST,
+                                             os.path.join(self.directory.name, "catalogue.db"))
+        self.addCleanup(prices.close)
+        self.assertIsInstance(prices, CompiledCatalogue)
+        self.assertEqual(aggregate_files((prices, types), file_paths, GROUPS, 2), serial)
+
+    def test_unreadable_files(self):
+        """Test that a missing or malformed file is reported while the others are added up."""
+        missing = os.path.join(self.directory.name, "missing.json")
+        malformed = self.write("malformed.json", '[{"Product": "Elotes", "Quantity": 1},')
+        file_paths = [TEST_CASES["TC1"], missing, malformed, TEST_CASES["TC3"]]
+        expected_errors = (
+            [f"{TEST_CASES['TC1']}: {error}" for error in self.expected_errors["TC1"]]
+            + [f"{missing}: Error: File not found.",
+               f"{malformed}: Error: File contains invalid JSON."]
+            + [f"{TEST_CASES['TC3']}: {error}" for error in self.expected_errors["TC3"]])
+        for workers in (1, 2):
+            for engine in ("loop", "columnar"):
+                total_cost, errors, _ = aggregate_files((self.prices, self.types), file_paths,
+                                                        workers=workers, engine=engine)
+                self.assertEqual(round_to_cents(total_cost),
+                                 self.expected_totals["TC1"] + self.expected_totals["TC3"])
+                self.assertEqual(errors, expected_errors)
+
+    def test_single_file(self):
+        """Test that the errors of a single file do not name it."""
+        total_cost, errors, groups = aggregate_files((self.prices, self.types),
+                                                     [TEST_CASES["TC3"]], workers=2)
+        self.assertEqual(round_to_cents(total_cost), self.expected_totals["TC3"])
+        self.assertEqual(errors, self.expected_errors["TC3"])
+        self.assertEqual(groups, {})
+
+
+class TestColumnarEngine(BaseTest):
+    """Unit tests for the columnar engine against the sale-by-sale loop."""
+
+    def assert_engines_agree(self, prices, sales, batch_sizes=(1, 3, 16, 1 << 16)):
+        """Checks the columnar totals and errors against the loop, with and without NumPy."""
+        expected = compute_total_sales(prices, sales)
+        for numpy in (columnar_sales.np, None):
+            with mock.patch.object(columnar_sales, "np", numpy):
+                for batch_size in batch_sizes:
+                    self.assertEqual(compute_total_sales_columnar(prices, sales, batch_size),
+                                     expected, (batch_size, numpy is None))
+        return expected
+
+    def test_test_cases(self):
+        """Test the totals and errors of every test case."""
+        for name, sales in self.test_sales.items():
+            self.assert_results(name, *self.assert_engines_agree(self.prices, sales))
+
+    def test_invalid_records(self):
+        """Test batches mixing valid sales with every kind of invalid one."""
+        prices = build_price_catalogue([{"title": "a", "price": 2.5}, {"title": "b", "price": 0.1},
+                                        {"title": "free", "price": None},
+                                        {"title": "huge", "price": 1e30}])
+        invalid = [{"Quantity": 1}, {"Product": "a"}, {"Product": "c", "Quantity": 1},
+                   {"Product": "a", "Quantity": "x"}, {"Product": "free", "Quantity": 1},
+                   {"Product": "a", "Quantity": "4"}, {"Product": "a", "Quantity": 2.5},
+                   {"Product": "b", "Quantity": True}, {"Product": "a", "Quantity": [1, 2]},
+                   {"Product": "a", "Quantity": 1 << 70}, {"Product": "huge", "Quantity": 3},
+                   {"Product": "b", "Quantity": None}]
+        valid = [{"Product": "a", "Quantity": 3}, {"Product": "b", "Quantity": -2}]
+        for sale in invalid:
+            self.assert_engines_agree(prices, valid * 5 + [sale] + valid * 5, (1, 4, 11, 64))
+        sales = [sale for pair in zip(valid * len(invalid), invalid) for sale in pair]
+        total_cost, errors = self.assert_engines_agree(prices, sales)
+        self.assertTrue(errors)
+        self.assertEqual(self.assert_engines_agree(prices, [])[0], 0)
+        self.assertIsInstance(total_cost, Decimal)
+
+    def test_overflow(self):
+        """Test that batches whose cost would overflow 64-bit integers stay exact."""
+        prices = build_price_catalogue([{"title": "a", "price": 9e15}, {"title": "b", "price": 1}])
+        sales = [{"Product": "a", "Quantity": (1 << 62) // 10 ** 18}] * 1000
+        sales += [{"Product": "b", "Quantity": (1 << 63) - 1}, {"Product": "b", "Quantity": -5}]
+        total_cost, errors = self.assert_engines_agree(prices, sales)
+        self.assertEqual(errors, [])
+        self.assertEqual(total_cost, Decimal(9 * 10 ** 15 * 4 * 1000 + (1 << 63) - 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Instrumentation Module
+
+This module provides the timing and profiling hooks shared by the assignment scripts.
+A run is split into read, parse, compute and write phases timed with perf_counter_ns;
+time spent in a phase nested inside another is only counted once, in the inner phase.
+Each run reports the records processed per second and the peak resident memory of the
+process and of its finished worker processes, and can be appended to a JSON lines file.
+The whole run can also be wrapped in cProfile.
+
+Functions run in a process pool are wrapped in WorkerTask, which returns the phase times
+and records of the worker with each result so the parent adds them to its own run. The
+phase times then add up the time spent in every process and can exceed the total.
+
+When no run is started the hooks do nothing, so scripts can call them unconditionally.
+"""
+
+import atexit
+import contextlib
+import cProfile
+import json
+import pstats
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+PHASES = ("read", "parse", "compute", "write")
+
+_active_run = None
+_no_phase = contextlib.nullcontext()
+
+
+def peak_rss_kb(children: bool = False):
+    """
+    Returns the peak resident memory of the process in KiB, or None if unknown.
+
+    With children, returns instead the largest peak of the child processes that
+    have finished and were waited for, such as the workers of a closed pool.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class Run:
+    """Timings and counters of one run of a script."""
+
+    def __init__(self, script: str, metrics_path: str = None):
+        self.script = script
+        self.metrics_path = metrics_path
+        self.start_ns = time.perf_counter_ns()
+        self.phases = dict.fromkeys(PHASES, 0)
+        self.records = 0
+        self.nested = []
+
+    def elapsed_time(self) -> float:
+        """Returns the seconds since the run started."""
+        return (time.perf_counter_ns() - self.start_ns) / 1e9
+
+    def to_dict(self) -> dict:
+        """Converts the run metrics to a JSON-serializable dictionary."""
+        total_ns = time.perf_counter_ns() - self.start_ns
+        return {
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "phases_ns": self.phases,
+            "total_ns": total_ns,
+            "records": self.records,
+            "records_per_second": self.records * 1e9 / total_ns if total_ns else 0,
+            "peak_rss_kb": peak_rss_kb(),
+            "peak_children_rss_kb": peak_rss_kb(children=True)
+        }
+
+    def save(self):
+        """Appends the run metrics as one line of the metrics file."""
+        try:
+            with open(self.metrics_path, "a", encoding="utf-8") as metrics_file:
+                metrics_file.write(json.dumps(self.to_dict()) + "\n")
+        except OSError as error:
+            print(f"Error writing metrics: {error}", file=sys.stderr)
+
+
+class Phase:
+    """Context manager that adds its duration to one phase of a run."""
+
+    __slots__ = ("run", "name", "start_ns")
+
+    def __init__(self, run: Run, name: str):
+        self.run = run
+        self.name = name
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.run.nested.append(0)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter_ns() - self.start_ns
+        nested = self.run.nested.pop()
+        self.run.phases[self.name] = self.run.phases.get(self.name, 0) + elapsed - nested
+        if self.run.nested:
+            self.run.nested[-1] += elapsed
+        return False
+
+
+def start_run(script: str, metrics_path: str = None, profile: bool = False) -> Run:
+    """
+    Starts timing a run of a script.
+
+    Args:
+        script (str): Name of the script, recorded in the metrics.
+        metrics_path (str, optional): JSON lines file that receives the metrics at exit.
+        profile (bool): Wrap the rest of the run in cProfile and print the hot spots at exit.
+
+    Returns:
+        Run: The active run.
+    """
+    global _active_run  # pylint: disable=global-statement
+    _active_run = Run(script, metrics_path)
+    if metrics_path:
+        atexit.register(_active_run.save)
+    if profile:
+        profiler = cProfile.Profile()
+        atexit.register(print_profile, profiler)
+        profiler.enable()
+    return _active_run
+
+
+def print_profile(profiler: cProfile.Profile, limit: int = 25):
+    """Stops a profiler and prints the functions with the highest cumulative time."""
+    profiler.disable()
+    stats = pstats.Stats(profiler, stream=sys.stderr)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+
+
+def phase(name: str):
+    """Returns a context manager that times a phase of the active run, if any."""
+    if _active_run is None:
+        return _no_phase
+    return Phase(_active_run, name)
+
+
+def count_records(count: int):
+    """Adds processed records to the active run, if any."""
+    if _active_run is not None:
+        _active_run.records += count
+
+
+class WorkerTask:
+    """
+    Picklable wrapper that runs a function under a run of its own, in a worker process.
+
+    Calling it returns the result of the function and the phase times and records
+    measured during the call, or None when the parent had no active run; pass the
+    pairs to worker_results or add_worker_metrics in the parent.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.measure = _active_run is not None
+
+    def __call__(self, *args, **kwargs):
+        global _active_run  # pylint: disable=global-statement
+        if not self.measure:
+            return self.function(*args, **kwargs), None
+        outer_run = _active_run  # A forked worker inherits a copy of the parent's run.
+        _active_run = Run("worker")
+        try:
+            result = self.function(*args, **kwargs)
+            return result, (_active_run.phases, _active_run.records)
+        finally:
+            _active_run = outer_run
+
+
+def add_worker_metrics(metrics):
+    """Adds the phase times and records returned by a WorkerTask to the active run, if any."""
+    if _active_run is None or metrics is None:
+        return
+    phases, records = metrics
+    for name, elapsed in phases.items():
+        _active_run.phases[name] = _active_run.phases.get(name, 0) + elapsed
+    _active_run.records += records
+
+
+def worker_results(results):
+    """Yields the results of WorkerTask calls, adding their metrics to the active run."""
+    for result, metrics in results:
+        add_worker_metrics(metrics)
+        yield result
+
+
+def elapsed_time() -> float:
+    """Returns the seconds since the active run started, or 0 without a run."""
+    return 0.0 if _active_run is None else _active_run.elapsed_time()
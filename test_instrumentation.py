@@ -0,0 +1,160 @@
+"""
+Unit tests for the Instrumentation Module.
+
+This module checks the phase accounting, the metrics gathered from pool workers and the
+JSON lines record written at the end of a run.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import instrumentation
+
+
+def parse_records(count: int) -> int:
+    """Counts records inside a parse phase, like the readers of the scripts."""
+    with instrumentation.phase("parse"):
+        instrumentation.count_records(count)
+    return count * 2
+
+
+class InstrumentationTest(unittest.TestCase):
+    """Base test class that restores the active run after each test."""
+
+    def setUp(self):
+        """Starts every test without an active run."""
+        patcher = mock.patch.object(instrumentation, "_active_run", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def clock(self, *times):
+        """Makes perf_counter_ns return the given times, one per call."""
+        patcher = mock.patch.object(instrumentation.time, "perf_counter_ns", side_effect=times)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestPhases(InstrumentationTest):
+    """Unit tests for the phase timers."""
+
+    def test_nested_phase_is_counted_once(self):
+        """Test that the time of an inner phase is subtracted from the outer one."""
+        self.clock(0, 10, 20, 50, 60, 65, 100)
+        run = instrumentation.start_run("script")
+        with instrumentation.phase("read"):
+            with instrumentation.phase("parse"):
+                pass
+            with instrumentation.phase("parse"):
+                pass
+        self.assertEqual(run.phases, {"read": 90 - 30 - 5, "parse": 35, "compute": 0,
+                                      "write": 0})
+        self.assertEqual(run.nested, [])
+
+    def test_deeply_nested_phases(self):
+        """Test that each level only keeps the time not spent in its own inner phase."""
+        self.clock(0, 0, 10, 20, 30, 40, 100)
+        run = instrumentation.start_run("script")
+        with instrumentation.phase("write"):
+            with instrumentation.phase("compute"):
+                with instrumentation.phase("parse"):
+                    pass
+        self.assertEqual(run.phases, {"read": 0, "parse": 10, "compute": 20, "write": 70})
+
+    def test_hooks_without_run(self):
+        """Test that the hooks do nothing when no run was started."""
+        with instrumentation.phase("read") as timer:
+            instrumentation.count_records(5)
+        self.assertIsNone(timer)
+        self.assertEqual(instrumentation.elapsed_time(), 0.0)
+
+
+class TestWorkers(InstrumentationTest):
+    """Unit tests for the metrics returned by pool workers."""
+
+    def test_worker_metrics_added_to_run(self):
+        """Test that the records and phase times of the workers reach the parent run."""
+        run = instrumentation.start_run("script")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(instrumentation.worker_results(executor.map(
+                instrumentation.WorkerTask(parse_records), [3, 4, 5])))
+        self.assertEqual(results, [6, 8, 10])
+        self.assertEqual(run.records, 12)
+        self.assertGreater(run.phases["parse"], 0)
+
+    def test_worker_restores_run(self):
+        """Test that a task run in the same process keeps its metrics apart from the run."""
+        run = instrumentation.start_run("script")
+        task = instrumentation.WorkerTask(parse_records)
+        result, metrics = task(7)
+        self.assertEqual(result, 14)
+        self.assertEqual(metrics[1], 7)
+        self.assertIs(instrumentation._active_run, run)  # pylint: disable=protected-access
+        self.assertEqual(run.records, 0)
+        instrumentation.add_worker_metrics(metrics)
+        self.assertEqual(run.records, 7)
+        self.assertEqual(run.phases["parse"], metrics[0]["parse"])
+
+    def test_worker_without_run(self):
+        """Test that tasks created without an active run return no metrics."""
+        task = instrumentation.WorkerTask(parse_records)
+        self.assertEqual(task(2), (4, None))
+        self.assertEqual(list(instrumentation.worker_results([task(1), task(3)])), [2, 6])
+
+
+class TestSave(InstrumentationTest):
+    """Unit tests for the JSON lines record of a run."""
+
+    def setUp(self):
+        """Creates a temporary directory for the metrics file."""
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.metrics_path = os.path.join(directory.name, "metrics.jsonl")
+
+    def test_saved_record(self):
+        """Test that every save appends one JSON line with the metrics of the run."""
+        self.clock(0, 4_000_000_000, 8_000_000_000)
+        run = instrumentation.Run("script", self.metrics_path)
+        run.phases["read"] = 1000
+        run.records = 6
+        with mock.patch.object(sys, "argv", ["script.py", "input.txt"]):
+            run.save()
+            run.save()
+        with open(self.metrics_path, encoding="utf-8") as metrics_file:
+            records = [json.loads(line) for line in metrics_file]
+        self.assertEqual(len(records), 2)
+        record = records[0]
+        self.assertEqual(record["script"], "script")
+        self.assertEqual(record["argv"], ["input.txt"])
+        self.assertEqual(record["phases_ns"], {"read": 1000, "parse": 0, "compute": 0,
+                                               "write": 0})
+        self.assertEqual(record["total_ns"], 4_000_000_000)
+        self.assertEqual(record["records"], 6)
+        self.assertEqual(record["records_per_second"], 1.5)
+        self.assertIn("peak_rss_kb", record)
+        self.assertIn("peak_children_rss_kb", record)
+        self.assertEqual(records[1]["total_ns"], 8_000_000_000)
+
+    def test_save_error(self):
+        """Test that a metrics file that cannot be written gives an error, not an exception."""
+        run = instrumentation.Run("script", os.path.join(self.metrics_path, "missing.jsonl"))
+        with mock.patch("builtins.print") as printed:
+            run.save()
+        self.assertIn("Error writing metrics", printed.call_args.args[0])
+
+    @unittest.skipIf(instrumentation.resource is None, "resource is not available")
+    def test_children_peak(self):
+        """Test that the peak of a finished child process is reported apart from the parent."""
+        subprocess.run([sys.executable, "-c", "bytearray(64 << 20)"], check=True)
+        self.assertGreaterEqual(instrumentation.peak_rss_kb(children=True), 64 << 10)
+        self.assertGreater(instrumentation.peak_rss_kb(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()